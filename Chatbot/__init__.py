@@ -1 +1,2 @@
-from .chatbot import ChatBot
\ No newline at end of file
+from .chatbot import ChatBot
+from .response_cache import ResponseCache
\ No newline at end of file
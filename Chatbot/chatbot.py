@@ -1,58 +1,160 @@
-import openai
 import os
+import time
 from dotenv import load_dotenv
+from Metrics.instruments import OPENAI_SECONDS, RESPONSE_CACHE_LOOKUPS
+from .history import ConversationHistory
 
 load_dotenv()
 
+openai = None  # 처음 API를 부를 때 import (시작 시간 단축)
+
+def load_openai():
+    global openai
+    if openai is None:
+        import openai as module
+        openai = module
+    return openai
+
 class ChatBot:
-    def __init__(self, stt, tts, model="gpt-3.5-turbo"):
+    def __init__(self, stt, tts, model="gpt-3.5-turbo", response_cache=None, stream_responses=True,
+                 command_handler=None):
         self.stt = stt
         self.tts = tts
         self.model = model
-        self.message_history = []
+        self.stream_responses = stream_responses
+        self.response_cache = response_cache
+        # 발화 텍스트 -> 대답 문장 또는 None. 처리했으면 LLM을 부르지 않는다 (예: 식물 변경)
+        self.command_handler = command_handler
+        # 음성 대화와 모니터링 알림은 서로 다른 대화 기록을 쓴다
+        self.histories = {
+            "chat": ConversationHistory(max_tokens=1500),
+            "monitor": ConversationHistory(max_tokens=800, min_recent=2),
+        }
 
         api_key = os.getenv("OPENAI_API_KEY")
         if not api_key:
             raise ValueError("API key not found. Please check your .env file")
         
-        openai.api_key = api_key
+        self.api_key = api_key
+
+    def _client(self):
+        client = load_openai()
+        client.api_key = self.api_key
+        return client
 
-    def ask_openai(self, question):
-        if len(self.message_history) == 0:
-            self.message_history.append({
-                "role": "system",
-                "content": "You are a helpful assistant. You must answer in Korean.",
-            })
+    @property
+    def message_history(self):
+        return self.histories["chat"].messages()
 
-        self.message_history.append({"role": "user", "content": question})
+    def ask_openai(self, question, cache_key=None, channel="chat"):
+        # 같은 상태에 대한 답이 캐시에 있으면 API를 호출하지 않는다
+        if cache_key is not None and self.response_cache is not None:
+            cached = self.response_cache.get(cache_key)
+            RESPONSE_CACHE_LOOKUPS.labels("miss" if cached is None else "hit").inc()
+            if cached is not None:
+                return cached
+
+        history = self.histories[channel]
+        history.add_user(question)
 
         try:
-            completion = openai.ChatCompletion.create(
-                model=self.model,
-                messages=self.message_history,
-            )
+            with OPENAI_SECONDS.labels(channel, "complete").time():
+                completion = self._client().ChatCompletion.create(
+                    model=self.model,
+                    messages=history.messages(),
+                )
 
             answer = completion.choices[0].message.content
-            self.message_history.append({"role": "assistant", "content": answer})
+            history.add_assistant(answer)
+
+            if cache_key is not None and self.response_cache is not None:
+                self.response_cache.put(cache_key, answer)
 
             return answer
         except Exception as e:
             print(f"OpenAI API error: {e}")
+            history.discard_last("user")
             return "죄송합니다. 응답을 받는 중에 오류가 발생했습니다."
 
+    def stream_openai(self, question, channel="chat"):
+        """응답을 토큰 조각 단위로 yield. 끝나면 전체 답을 대화 기록에 남긴다.
+
+        중간에 닫혀도(barge-in, TTS 쪽 예외) 받은 만큼을 답으로 남기고, 하나도 못 받았으면
+        질문을 되돌린다. 사용자 턴이 답 없이 두 번 이어지지 않도록.
+        """
+        history = self.histories[channel]
+        history.add_user(question)
+        parts = []
+        answered = False
+        start = time.perf_counter()
+
+        try:
+            completion = self._client().ChatCompletion.create(
+                model=self.model,
+                messages=history.messages(),
+                stream=True,
+            )
+            for chunk in completion:
+                content = chunk.choices[0].delta.get("content")
+                if content:
+                    if not parts:
+                        # 스트리밍은 전체 시간이 소비 쪽(TTS)에 좌우되므로 첫 토큰까지를 잰다
+                        OPENAI_SECONDS.labels(channel, "stream_first_token").observe(
+                            time.perf_counter() - start
+                        )
+                    parts.append(content)
+                    yield content
+        except Exception as e:
+            print(f"OpenAI API error: {e}")
+            if not parts:
+                history.discard_last("user")
+                answered = True
+                yield "죄송합니다. 응답을 받는 중에 오류가 발생했습니다."
+        finally:
+            if not answered:
+                if parts:
+                    history.add_assistant("".join(parts))
+                else:
+                    history.discard_last("user")
+
     def chat(self):
+        user_text = self.listen()
+        if user_text:
+            self.respond(user_text)
+
+    def listen(self):
+        """사용자 발화 하나를 받아 텍스트로"""
+        # 이전 대화 응답이 아직 재생 중이면 끊고 듣기 시작 (barge-in)
+        if hasattr(self.tts, "barge_in"):
+            self.tts.barge_in()
         print("Listening...")
-        user_text = self.stt.transcribe_audio()
-        if not user_text:
-            return
+        return self.stt.transcribe_audio()
 
+    def respond(self, user_text):
+        """답을 받아 말한다. 스트리밍이면 첫 문장이 나오는 대로 재생"""
         print("User:", user_text)
+        if self.command_handler is not None:
+            response_text = self.command_handler(user_text)
+            if response_text:
+                print("Assistant:", response_text)
+                self.tts.speak(response_text)
+                return response_text
+
         print("Asking OpenAI API...")
+        if self.stream_responses and hasattr(self.tts, "speak_stream"):
+            # 문장이 완성되는 대로 합성/재생해 첫 음성까지의 시간을 줄인다
+            response_text = self.tts.speak_stream(self.stream_openai(user_text))
+            print("Assistant:", response_text)
+            return response_text
+
         response_text = self.ask_openai(user_text)
         print("Assistant:", response_text)
 
         print("Converting response to speech...")
         self.tts.speak(response_text)
+        return response_text
 
-    def reset_message_history(self):
-        self.message_history.clear()
+    def reset_message_history(self, channel=None):
+        for name, history in self.histories.items():
+            if channel is None or name == channel:
+                history.clear()
@@ -0,0 +1,111 @@
+import functools
+import re
+from collections import deque
+
+SYSTEM_PROMPT = "You are a helpful assistant. You must answer in Korean."
+
+MESSAGE_OVERHEAD_TOKENS = 4
+
+@functools.lru_cache(maxsize=None)
+def load_encoding():
+    """처음 토큰을 셀 때 tiktoken을 읽는다 (BPE 파일을 내려받느라 시작이 막힐 수 있으므로)"""
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        return None
+
+def estimate_tokens(text):
+    """토큰 수 추정. tiktoken이 없으면 한글 1자 ~ 1토큰, 영문 4자 ~ 1토큰으로 계산"""
+    if not text:
+        return 0
+    encoding = load_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    return (ascii_chars + 3) // 4 + (len(text) - ascii_chars)
+
+def _first_sentence(text, limit=80):
+    text = " ".join(text.split())
+    match = re.search(r"[.!?。]|다\.|요\.", text)
+    if match:
+        text = text[:match.end()]
+    return text if len(text) <= limit else text[:limit] + "…"
+
+def extractive_summary(summary, message):
+    """오래된 메시지를 첫 문장만 남겨 요약에 덧붙인다 (LLM 호출 없음)"""
+    speaker = "사용자" if message["role"] == "user" else "도우미"
+    line = f"{speaker}: {_first_sentence(message['content'])}"
+    return f"{summary}\n{line}" if summary else line
+
+class ConversationHistory:
+    """토큰 예산 안에서 최근 대화만 유지하고 오래된 대화는 요약으로 접는다"""
+
+    def __init__(self, system_prompt=SYSTEM_PROMPT, max_tokens=1500, min_recent=2,
+                 summary_max_tokens=300, summarizer=None):
+        self.system_prompt = system_prompt
+        self.max_tokens = max_tokens
+        self.min_recent = min_recent
+        self.summary_max_tokens = summary_max_tokens
+        self.summarizer = summarizer or extractive_summary
+        self.turns = deque()
+        self.summary = ""
+        self._turn_tokens = 0
+
+    def _message_tokens(self, message):
+        return estimate_tokens(message["content"]) + MESSAGE_OVERHEAD_TOKENS
+
+    def _fixed_tokens(self):
+        tokens = estimate_tokens(self.system_prompt) + MESSAGE_OVERHEAD_TOKENS
+        if self.summary:
+            tokens += estimate_tokens(self.summary) + MESSAGE_OVERHEAD_TOKENS
+        return tokens
+
+    @property
+    def token_count(self):
+        return self._fixed_tokens() + self._turn_tokens
+
+    def add(self, role, content):
+        message = {"role": role, "content": content}
+        self.turns.append(message)
+        self._turn_tokens += self._message_tokens(message)
+        self._compact()
+
+    def add_user(self, content):
+        self.add("user", content)
+
+    def add_assistant(self, content):
+        self.add("assistant", content)
+
+    def discard_last(self, role=None):
+        """API 호출 실패 시 답이 없는 마지막 메시지를 되돌린다"""
+        if self.turns and (role is None or self.turns[-1]["role"] == role):
+            self._turn_tokens -= self._message_tokens(self.turns.pop())
+
+    def _compact(self):
+        while self.token_count > self.max_tokens and len(self.turns) > self.min_recent:
+            oldest = self.turns.popleft()
+            self._turn_tokens -= self._message_tokens(oldest)
+            self.summary = self.summarizer(self.summary, oldest)
+            self._trim_summary()
+
+    def _trim_summary(self):
+        lines = self.summary.split("\n")
+        while len(lines) > 1 and estimate_tokens("\n".join(lines)) > self.summary_max_tokens:
+            lines.pop(0)
+        self.summary = "\n".join(lines)
+
+    def messages(self):
+        messages = [{"role": "system", "content": self.system_prompt}]
+        if self.summary:
+            messages.append({"role": "system", "content": f"이전 대화 요약:\n{self.summary}"})
+        messages.extend(self.turns)
+        return messages
+
+    def clear(self):
+        self.turns.clear()
+        self.summary = ""
+        self._turn_tokens = 0
+
+    def __len__(self):
+        return len(self.turns)
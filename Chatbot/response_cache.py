@@ -0,0 +1,104 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# 센서별 양자화 단위: 이 폭 안의 변화는 같은 상황으로 본다
+DEFAULT_STEPS = {
+    'temperature': 2.0,
+    'humidity': 5.0,
+    'soil_moisture': 5.0,
+    'light': 5.0,
+}
+
+class ResponseCache:
+    """식물 상태 키로 LLM 응답을 재사용하는 TTL + LRU 캐시 (디스크에 저장)"""
+
+    def __init__(self, path="response_cache.json", max_entries=256, ttl=6 * 3600, steps=None):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.steps = dict(DEFAULT_STEPS, **(steps or {}))
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.load()
+
+    def make_key(self, plant_name, comparisons, values):
+        """종 + 센서별 상태 + 양자화한 값으로 정규화된 상태 키를 만든다"""
+        parts = [plant_name]
+        for sensor in sorted(comparisons):
+            status = comparisons[sensor]
+            if status == "no_data":
+                continue
+            value = values.get(sensor)
+            step = self.steps.get(sensor, 1.0)
+            bucket = "-" if value is None else int(value // step)
+            parts.append(f"{sensor}:{status}:{bucket}")
+        return "|".join(parts)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            answer, created = entry
+            if self.ttl is not None and time.time() - created > self.ttl:
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return answer
+
+    def put(self, key, answer):
+        with self._lock:
+            self._entries[key] = (answer, time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        self.save()
+
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+            now = time.time()
+            with self._lock:
+                for key, (answer, created) in data.items():
+                    if self.ttl is None or now - created <= self.ttl:
+                        self._entries[key] = (answer, created)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        except Exception as e:
+            print(f"Error loading response cache: {e}")
+
+    def save(self):
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.tmp"
+        with self._lock:
+            data = {key: list(entry) for key, entry in self._entries.items()}
+            try:
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(data, f, ensure_ascii=False)
+                os.replace(tmp_path, self.path)
+            except Exception as e:
+                print(f"Error saving response cache: {e}")
+
+    def answers(self):
+        with self._lock:
+            return [answer for answer, _ in self._entries.values()]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        self.save()
+
+    def __len__(self):
+        return len(self._entries)
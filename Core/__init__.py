@@ -1 +1,2 @@
-from .system_manager import IoTPlantSystem
\ No newline at end of file
+from .system_manager import IoTPlantSystem
+from .startup import StartupTimer
\ No newline at end of file
@@ -0,0 +1,287 @@
+import asyncio
+import concurrent.futures
+import queue
+import signal
+import threading
+import time
+from Metrics.instruments import MONITOR_CYCLE_SECONDS
+
+class StageExecutor(concurrent.futures.Executor):
+    """단계 하나의 블로킹 작업을 돌리는 작은 스레드 풀 (데몬 스레드).
+
+    ThreadPoolExecutor는 인터프리터가 끝날 때 실행 중인 작업을 끝까지 기다리므로, 녹음이나
+    LLM 요청처럼 오래 막히는 작업이 종료를 붙잡는다. 여기서는 shutdown() 때 대기 중인 작업을
+    취소하고, 실행 중인 작업은 해당 구성 요소의 close()/stop()이 풀어 주도록 두고 기다리지 않는다.
+    """
+
+    def __init__(self, name, max_workers=1):
+        self.name = name
+        self.max_workers = max_workers
+        self._queue = queue.SimpleQueue()
+        self._threads = []
+        self._lock = threading.Lock()
+        self._shutdown = False
+
+    def submit(self, fn, /, *args, **kwargs):
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError(f"{self.name} executor is shut down")
+            future = concurrent.futures.Future()
+            self._queue.put((future, fn, args, kwargs))
+            if len(self._threads) < self.max_workers:
+                thread = threading.Thread(
+                    target=self._work, name=f"{self.name}-{len(self._threads)}", daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+        return future
+
+    def _work(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            future, fn, args, kwargs = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+
+    def shutdown(self, wait=True, *, cancel_futures=False):
+        with self._lock:
+            self._shutdown = True
+            if cancel_futures:
+                while True:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is not None:
+                        item[0].cancel()
+            for _ in self._threads:
+                self._queue.put(None)
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+class PlantRuntime:
+    """모니터링과 음성 비서를 하나의 asyncio 이벤트 루프에서 돌린다.
+
+    단계는 크기가 제한된 큐로 이어진 태스크다. 뒤 단계가 밀리면 앞 단계가 put()에서 기다린다.
+        샘플링 -> 평가 -> 알림 LLM -> 알림 TTS
+        호출어 -> STT -> 대화(LLM 스트리밍 + TTS)
+    블로킹 작업(호출어 검출/Whisper/OpenAI/재생 대기)은 단계별 StageExecutor에서 돌리고, 단계가
+    예외로 끝나면 잠시 쉬었다가 다시 띄운다. 종료는 태스크 취소로 하며, 막혀 있는 블로킹 호출은
+    on_stop 콜백(마이크/플레이어/Whisper 워커 닫기)이 풀어 준다. 콜백도 블로킹될 수 있으므로
+    (워커 프로세스 종료 대기 등) 루프 밖 스레드에서 돌리고 shutdown_timeout까지만 기다린다.
+    """
+
+    def __init__(self, monitor, chatbot=None, front_end=None, voice_ready=None, queue_size=4,
+                 shutdown_timeout=0.5, restart_delay=1.0, startup=None):
+        self.monitor = monitor
+        self.chatbot = chatbot
+        self.front_end = front_end
+        # 음성 구성 요소 준비 완료 (threading.Event). None이면 바로 시작
+        self.voice_ready = voice_ready
+        self.queue_size = queue_size
+        self.shutdown_timeout = shutdown_timeout
+        self.restart_delay = restart_delay
+        self.startup = startup
+        self.executors = {
+            # 호출어 검출은 spotter에 따라 Whisper를 돌리므로 재생 대기와 나눈다
+            "keyword": StageExecutor("keyword"),
+            "stt": StageExecutor("stt"),
+            "llm": StageExecutor("llm", max_workers=2),  # 대화가 알림 요청 뒤에 줄 서지 않도록
+            "audio": StageExecutor("audio", max_workers=2),
+        }
+        self.on_stop = []
+        self.shutdown_seconds = None
+        self._loop = None
+        self._stop_event = None
+        self._done = threading.Event()
+        self._tasks = []
+
+    @property
+    def running(self):
+        return self._loop is not None and not self._done.is_set()
+
+    def _run_blocking(self, executor, fn, *args, **kwargs):
+        return asyncio.wrap_future(self.executors[executor].submit(fn, *args, **kwargs))
+
+    async def run(self):
+        self._loop = asyncio.get_running_loop()
+        self._stop_event = asyncio.Event()
+        self._done.clear()
+        self._install_signal_handlers()
+
+        evaluations = asyncio.Queue(maxsize=2)
+        notifications = asyncio.Queue(maxsize=self.queue_size)
+        speech = asyncio.Queue(maxsize=2)
+        stages = [
+            ("sampling", lambda: self._sampling(evaluations)),
+            ("evaluation", lambda: self._evaluation(evaluations, notifications)),
+            ("alert_llm", lambda: self._alert_llm(notifications, speech)),
+            ("alert_tts", lambda: self._alert_tts(speech)),
+        ]
+        if self.chatbot is not None and self.front_end is not None:
+            utterances = asyncio.Queue(maxsize=1)
+            stages.append(("voice", lambda: self._voice(utterances)))
+            stages.append(("chat", lambda: self._chat(utterances)))
+
+        self._tasks = [
+            asyncio.create_task(self._supervise(name, factory), name=name) for name, factory in stages
+        ]
+        try:
+            await self._stop_event.wait()
+        finally:
+            await self._shutdown()
+
+    def request_stop(self):
+        """다른 스레드나 시그널 처리기에서 불러도 된다"""
+        loop = self._loop
+        if loop is None or self._done.is_set():
+            return
+        try:
+            loop.call_soon_threadsafe(self._stop_event.set)
+        except RuntimeError:
+            pass  # 루프가 이미 닫힘
+
+    def wait_stopped(self, timeout=None):
+        return self._done.wait(timeout)
+
+    def _install_signal_handlers(self):
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                self._loop.add_signal_handler(sig, self._stop_event.set)
+            except (NotImplementedError, RuntimeError, ValueError):
+                return  # 메인 스레드가 아니거나 지원하지 않는 플랫폼
+
+    async def _shutdown(self):
+        start = time.perf_counter()
+        print("Stopping runtime...")
+        stopper = StageExecutor("stop", max_workers=max(1, len(self.on_stop)))
+        callbacks = [asyncio.wrap_future(stopper.submit(callback)) for callback in self.on_stop]
+        if callbacks:
+            done, _ = await asyncio.wait(callbacks, timeout=self.shutdown_timeout)
+            for future in done:
+                if future.exception() is not None:
+                    print(f"Shutdown error: {future.exception()}")
+        stopper.shutdown(wait=False)
+        for task in self._tasks:
+            task.cancel()
+        if self._tasks:
+            await asyncio.wait(self._tasks, timeout=self.shutdown_timeout)
+        for executor in self.executors.values():
+            executor.shutdown(wait=False, cancel_futures=True)
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                self._loop.remove_signal_handler(sig)
+            except (NotImplementedError, RuntimeError, ValueError):
+                break
+        self.shutdown_seconds = time.perf_counter() - start
+        self._done.set()
+
+    async def _supervise(self, name, factory):
+        while True:
+            try:
+                await factory()
+                return
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"{name} stage error: {e}")
+                await asyncio.sleep(self.restart_delay)
+
+    # 모니터링
+
+    async def _sampling(self, evaluations):
+        monitor = self.monitor
+        if self.startup is not None:
+            self.startup.mark("monitoring_started")
+        while True:
+            if not monitor.pots:
+                await asyncio.sleep(monitor.sample_interval or 1)
+                continue
+            print("센서 데이터 수집 시작...")
+            started = time.perf_counter()
+            await monitor.sample()
+            # 창 경계에서 평균을 잘라 넘긴다 (평가가 밀리면 다음 창 측정이 여기서 기다린다)
+            await evaluations.put((monitor.scheduler.clock.monotonic(), monitor.evaluate(), started))
+
+    async def _evaluation(self, evaluations, notifications):
+        while True:
+            now, results, started = await evaluations.get()
+            pending = self.monitor.check_alerts(results, now)
+            # 측정 창 시작부터 경보 판정까지 (LLM/TTS 시간은 각 단계의 지표로)
+            MONITOR_CYCLE_SECONDS.observe(time.perf_counter() - started)
+            for notification in pending:
+                await notifications.put(notification)
+
+    async def _alert_llm(self, notifications, speech):
+        while True:
+            notification = await notifications.get()
+            text = await self._run_blocking("llm", self.monitor.answer, notification)
+            if text:
+                await speech.put(text)
+
+    async def _alert_tts(self, speech):
+        tts = getattr(self.monitor.chatbot, "tts", None)
+        while True:
+            text = await speech.get()
+            if tts is None:
+                print(text)  # 음성 비서 없이 모니터링만 도는 중
+                continue
+            handle = tts.speak_alert(text)
+            await self._wait_playback(handle)
+
+    async def _wait_playback(self, handle):
+        wait = getattr(handle, "wait", None)
+        if wait is None:
+            return
+        try:
+            # 재생이 끝나야 다음 알림을 꺼낸다 (스피커가 밀리면 LLM 단계도 멈춘다)
+            await self._run_blocking("audio", wait)
+        except asyncio.CancelledError:
+            handle.cancel()
+            raise
+
+    # 음성 비서
+
+    async def _voice(self, utterances):
+        """호출어를 기다렸다가 발화 하나를 받아 텍스트로 넘긴다.
+
+        대답을 재생하는 동안에도 호출어를 계속 듣는다. 재생 중에 들어온 구간은 호출어 검출에만
+        쓰이고 (호출어가 없으면 버려진다), 호출어가 들리면 재생 중인 대답을 끊고 새 질문을 받는다.
+        """
+        while self.voice_ready is not None and not self.voice_ready.is_set():
+            await asyncio.sleep(0.2)
+        try:
+            await self._run_blocking("keyword", self.front_end.start)
+        except Exception as e:
+            print(f"Voice front end error: {e}")
+            return
+        while True:
+            segment = await self._run_blocking("keyword", self.front_end.wait_for_keyword, 0.5)
+            if segment is None:
+                continue
+            # barge-in: 대화 응답 재생을 바로 끊는다 (알림은 유지)
+            barge_in = getattr(self.chatbot.tts, "barge_in", None)
+            if barge_in is not None:
+                barge_in()
+            print("Keyword detected! Starting chat...")
+            text = await self._run_blocking("stt", self.chatbot.listen)
+            if text:
+                # 끊긴 대답의 스트리밍이 정리되는 동안만 기다린다 (큐 크기 1)
+                await utterances.put(text)
+
+    async def _chat(self, utterances):
+        while True:
+            text = await utterances.get()
+            try:
+                await self._run_blocking("llm", self.chatbot.respond, text)
+            finally:
+                utterances.task_done()
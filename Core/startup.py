@@ -0,0 +1,49 @@
+import threading
+import time
+from contextlib import contextmanager
+
+class StartupTimer:
+    """시작 단계별 소요 시간 기록. 여러 스레드에서 동시에 단계를 재도 된다"""
+
+    def __init__(self):
+        self.t0 = time.perf_counter()
+        self.phases = {}  # name -> (시작, 끝) t0 기준 초
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter() - self.t0
+        try:
+            yield
+        finally:
+            end = time.perf_counter() - self.t0
+            with self._lock:
+                self.phases[name] = (start, end)
+
+    def timed(self, name, fn, *args, **kwargs):
+        """executor.submit()에 넘길 수 있도록 단계 측정을 감싼 함수"""
+        def run():
+            with self.phase(name):
+                return fn(*args, **kwargs)
+        return run
+
+    def mark(self, name):
+        now = time.perf_counter() - self.t0
+        with self._lock:
+            self.phases.setdefault(name, (now, now))
+
+    def as_dict(self):
+        with self._lock:
+            return {name: {"start_s": start, "end_s": end, "duration_s": end - start}
+                    for name, (start, end) in self.phases.items()}
+
+    def report(self):
+        with self._lock:
+            phases = sorted(self.phases.items(), key=lambda item: item[1])
+        lines = ["Startup timing:"]
+        for name, (start, end) in phases:
+            if end == start:
+                lines.append(f"  {name:<20} at {end:7.3f}s")
+            else:
+                lines.append(f"  {name:<20} {start:7.3f}s -> {end:7.3f}s ({end - start:.3f}s)")
+        print("\n".join(lines))
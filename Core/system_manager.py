@@ -1,125 +1,269 @@
 import asyncio
+import os
 import threading
-import time
-import signal
-from Sensor import DHT11, SoilMoistureSensor, LightSensor, SensorManager
-from Database import PlantDatabase
-from Monitor import PlantMonitor
-from STT import SpeechToText
-from TTS import TextToSpeech
-from Chatbot import ChatBot
+from concurrent.futures import ThreadPoolExecutor
+from Sensor import SensorManager, AsyncSensorReader, create_backend
+from Database import PlantDatabase, ReadingWriter
+from Monitor import PlantMonitor, Pot
+from STT import SpeechToText, VoiceFrontEnd, create_spotter, create_worker
+from TTS import TextToSpeech, AudioCache
+from TTS.tts import load_gtts
+from Chatbot import ChatBot, ResponseCache
+from Chatbot.chatbot import load_openai
+from Metrics import registry, MetricsServer
+from Gateway import NodeForwarder, create_collector
+from .runtime import PlantRuntime, StageExecutor
+from .startup import StartupTimer
+
+# 화분별 식물 종류와 MCP3008 채널 (DHT11은 선반 전체가 공유)
+DEFAULT_POTS = [
+    {"pot_id": "pot1", "plant": "스킨답서스", "soil_channel": 0, "light_channel": 7},
+]
 
 class IoTPlantSystem:
-    def __init__(self):
+    def __init__(self, pot_configs=None, sensor_backend=None):
         self.running = True
-        self.monitor_thread = None
-        self.voice_thread = None
+        self.pot_configs = pot_configs or DEFAULT_POTS
+        self.sensor_backend = sensor_backend
+        self.pots = []
+        self.runtime = None
+        self._runtime_thread = None
+        self._stop_lock = threading.Lock()
+        self.voice_init_thread = None
+        self.voice_ready = threading.Event()
+        self.startup = StartupTimer()
+        self.metrics_server = None
+        self.collector = None
         
         try:
             self.init_components()
         except Exception as e:
             print(f"Error initializing components: {e}")
             self.running = False
+            # 이미 띄운 구성 요소(메트릭 서버, 기록 스레드, 수집기 등)는 정리한다
+            self._close_components()
             return
 
     def init_components(self):
-        # Initialize sensors
-        self.dht_sensor = DHT11()
-        self.soil_sensor = SoilMoistureSensor()
-        self.light_sensor = LightSensor()
+        # PLANT_METRICS_PORT가 있으면 단계별 지연 시간을 모아 /metrics로 내보낸다 (없으면 측정 안 함)
+        metrics_port = os.environ.get("PLANT_METRICS_PORT")
+        if metrics_port:
+            registry.enable()
+            self.metrics_server = MetricsServer(
+                host=os.environ.get("PLANT_METRICS_HOST", "127.0.0.1"), port=int(metrics_port)
+            ).start()
+            print(f"Metrics available at {self.metrics_server.url}")
 
-        # Initialize database
-        self.db = PlantDatabase()
-        self.db.create_tables()
+        # 센서와 DB를 동시에 준비하고, 끝나는 대로 모니터링을 시작할 수 있게 한다.
+        # 음성/LLM은 생성만 해 두고 무거운 준비(모델, 합성)는 백그라운드에서
+        with ThreadPoolExecutor(max_workers=2, thread_name_prefix="Init") as pool:
+            sensors = pool.submit(self.startup.timed("sensors", self._init_sensors))
+            database = pool.submit(self.startup.timed("database", self._init_database))
+            sensors.result()
+            database.result()
 
-        # Initialize voice interface
-        self.stt = SpeechToText()
-        self.tts = TextToSpeech()
-        self.chatbot = ChatBot(self.stt, self.tts)
+        with self.startup.phase("voice_objects"):
+            self._init_voice_objects()
+        with self.startup.phase("pots"):
+            self._init_pots()
 
-        # Initialize managers
-        self.sensor_manager = SensorManager(self.dht_sensor, self.soil_sensor, self.light_sensor)
-        self.plant_monitor = PlantMonitor(self.sensor_manager, self.db, self.chatbot)
+        if self.chatbot is None:
+            self.voice_ready.set()
+            return
+        self.voice_init_thread = threading.Thread(
+            target=self._init_voice_background, name="VoiceInit", daemon=True
+        )
+        self.voice_init_thread.start()
 
-    async def monitor_task(self):
-        while self.running:
-            try:
-                await self.plant_monitor.monitor_cycle()
-            except Exception as e:
-                print(f"Monitoring error: {e}")
-                await asyncio.sleep(10)  # Wait before retrying
+    def _init_sensors(self):
+        # Initialize shared sensors (hardware, simulated or replay backend)
+        if self.sensor_backend is None:
+            self.sensor_backend = create_backend()
+        self.dht_sensor = self.sensor_backend.create_dht()
+        # 멈춘 센서 읽기가 프로세스 종료를 막지 않도록 데몬 스레드에서 읽는다
+        self.sensor_reader = AsyncSensorReader(executor=StageExecutor("sensor", max_workers=4))
 
-    def voice_assistant_task(self):
-        while self.running:
+    def _init_database(self):
+        self.db = PlantDatabase()
+        self.db.create_tables()
+        # PLANT_CATALOG가 있으면 식물 프로필(CSV/JSON)을 가져온다 (이름이 같으면 갱신)
+        catalog_path = os.environ.get("PLANT_CATALOG")
+        if catalog_path:
             try:
-                text = self.stt.transcribe_audio()
-                if text:
-                    if self.stt.detect_keyword(text):
-                        print("Keyword detected! Starting chat...")
-                        self.chatbot.chat()
+                count = self.db.import_plants(catalog_path)
+                print(f"Imported {count} plant profiles from {catalog_path}")
             except Exception as e:
-                print(f"Voice assistant error: {e}")
-                time.sleep(1)  # Wait before retrying
-
-    def start(self):
-        """Start all system components"""
-        if not self.running:
-            print("System initialization failed. Cannot start.")
-            return
+                print(f"Plant catalog import error: {e}")
+        self.reading_writer = ReadingWriter(self.db).start()
+        # PLANT_GATEWAY_URL이 있으면 측정값을 수집 노드로도 보낸다 (로컬 DB에도 계속 저장)
+        gateway_url = os.environ.get("PLANT_GATEWAY_URL")
+        # 노드와 수집기가 같은 PLANT_GATEWAY_KEY를 쓰면 서명하지 않은 프레임은 받지 않는다
+        gateway_key = os.environ.get("PLANT_GATEWAY_KEY")
+        if gateway_url:
+            self.reading_writer = NodeForwarder(
+                gateway_url, node_id=os.environ.get("PLANT_NODE_ID"), local_writer=self.reading_writer,
+                key=gateway_key
+            ).start()
+        # PLANT_GATEWAY_LISTEN이 있으면 이 노드가 다른 노드들의 측정값을 받아 저장한다
+        gateway_listen = os.environ.get("PLANT_GATEWAY_LISTEN")
+        if gateway_listen:
+            self.collector = create_collector(
+                self.db, gateway_listen, key=gateway_key, spool_path="gateway_spool.jsonl"
+            ).start()
 
+    def _init_voice_objects(self):
+        # 생성자는 가볍다 (whisper/openai/gtts는 처음 쓸 때 import)
+        # Whisper는 별도 프로세스에서 (모니터 루프와 GIL/CPU를 나눠 쓰지 않도록)
+        self.stt = SpeechToText(worker=create_worker())
+        # 마이크는 계속 열어 두고 VAD/호출어 검출을 통과한 구간만 Whisper로 보낸다
+        self.voice_front_end = VoiceFrontEnd(spotter=create_spotter(self.stt))
+        self.stt.front_end = self.voice_front_end
+        self.tts = TextToSpeech(audio_cache=AudioCache())
+        self.response_cache = ResponseCache()
         try:
-            # Create event loop for the monitor thread
-            self.monitor_thread = threading.Thread(
-                target=lambda: asyncio.run(self.monitor_task())
+            self.chatbot = ChatBot(self.stt, self.tts, response_cache=self.response_cache)
+        except Exception as e:
+            # API 키가 없어도 모니터링은 돌린다 (음성 비서와 알림 음성 없이)
+            print(f"Voice assistant disabled: {e}")
+            self.chatbot = None
+
+    def _init_pots(self):
+        # Initialize one sensor manager per pot
+        for config in self.pot_configs:
+            sensor_manager = SensorManager(
+                self.dht_sensor,
+                self.sensor_backend.create_soil(config["soil_channel"], config["pot_id"]),
+                self.sensor_backend.create_light(config["light_channel"], config["pot_id"]),
+                pot_id=config["pot_id"],
+                reading_writer=self.reading_writer,
+                async_reader=self.sensor_reader,
+                clock=self.sensor_backend.clock
             )
-            self.monitor_thread.daemon = True
+            self.pots.append(Pot(config["pot_id"], config["plant"], sensor_manager))
 
-            # Create voice assistant thread
-            self.voice_thread = threading.Thread(
-                target=self.voice_assistant_task
+        self.plant_monitor = PlantMonitor(
+            self.pots, self.db, self.chatbot, clock=self.sensor_backend.clock
+        )
+        # "몬스테라로 바꿔줘" 같은 식물 변경은 ChatGPT를 거치지 않고 바로 처리
+        if self.chatbot is not None:
+            self.chatbot.command_handler = self.plant_monitor.handle_command
+
+    def _init_voice_background(self):
+        """Whisper 모델, TTS 라이브러리/문구 합성, openai import를 동시에 준비"""
+        def prepare_stt():
+            self.stt.warm_up().join()
+
+        def prepare_tts():
+            load_gtts()
+            # 고정 안내 문구와 자주 나온 알림 답변을 미리 합성
+            self.tts.warm_up(
+                self.plant_monitor.known_phrases() + self.response_cache.answers(),
+                background=False
             )
-            self.voice_thread.daemon = True
 
-            # Start threads
-            self.monitor_thread.start()
-            self.voice_thread.start()
+        with ThreadPoolExecutor(max_workers=3, thread_name_prefix="VoiceInit") as pool:
+            futures = [
+                pool.submit(self.startup.timed("stt_model", prepare_stt)),
+                pool.submit(self.startup.timed("tts", prepare_tts)),
+                pool.submit(self.startup.timed("openai_import", load_openai)),
+            ]
+            for future in futures:
+                try:
+                    future.result()
+                except Exception as e:
+                    print(f"Voice initialization error: {e}")
+        self.voice_ready.set()
+        self.startup.report()
 
-            # Keep main thread alive
-            try:
-                while self.running:
-                    time.sleep(1)
-            except KeyboardInterrupt:
-                print("\nReceived shutdown signal...")
-            finally:
-                self.stop()
+    def start(self):
+        """Start all system components"""
+        if not self.running:
+            print("System initialization failed. Cannot start.")
+            return
 
+        # 모니터링과 음성 비서를 하나의 이벤트 루프에서 (이 스레드가 끝날 때까지 돈다)
+        self.runtime = PlantRuntime(
+            self.plant_monitor, self.chatbot, self.voice_front_end,
+            voice_ready=self.voice_ready, startup=self.startup
+        )
+        # 종료 요청 시 막혀 있는 녹음/재생/음성 인식을 바로 풀어 준다
+        self.runtime.on_stop.extend([
+            self.plant_monitor.stop_monitoring,
+            self.voice_front_end.close,
+            self.tts.stop,
+            self.stt.close,
+        ])
+        self._runtime_thread = threading.current_thread()
+        try:
+            asyncio.run(self.runtime.run())
+        except KeyboardInterrupt:
+            print("\nReceived shutdown signal...")
         except Exception as e:
             print(f"System error: {e}")
+        finally:
             self.stop()
 
     def stop(self):
         """Stop all system components"""
         if not self.running:
             return
-            
+
+        # 런타임이 돌고 있으면 먼저 멈춘다 (런타임 스레드에서 불렸으면 start()가 끝나며 다시 부른다)
+        if self.runtime is not None and self.runtime.running:
+            self.runtime.request_stop()
+            if threading.current_thread() is self._runtime_thread:
+                return
+            self.runtime.wait_stopped(timeout=2)
+
+        # start()의 finally와 다른 스레드의 stop()이 겹쳐도 정리는 한 번만
+        with self._stop_lock:
+            if not self.running:
+                return
+            self.running = False
         print("\nShutting down system...")
-        self.running = False
-        
-        # Wait for threads to finish
-        if self.monitor_thread and self.monitor_thread.is_alive():
-            self.monitor_thread.join(timeout=2)
-        if self.voice_thread and self.voice_thread.is_alive():
-            self.voice_thread.join(timeout=2)
+        self._close_components()
+        print("System shutdown complete")
+
+    def _close_components(self):
+        """만들어진 구성 요소만 닫는다 (초기화 도중 실패했을 때도 부른다)"""
+        for pot in self.pots:
+            try:
+                pot.close()
+            except:
+                pass
 
-        # Clean up resources
         try:
-            self.sensor_manager.close()
+            self.sensor_reader.close()
         except:
             pass
 
+        try:
+            self.voice_front_end.close()
+        except:
+            pass
+
+        try:
+            self.stt.close()
+        except:
+            pass
+
+        try:
+            self.tts.close()
+        except:
+            pass
+
+        try:
+            self.reading_writer.close()
+        except:
+            pass
+
+        if self.collector is not None:
+            self.collector.close()
+
         try:
             self.db.close()
         except:
             pass
 
-        print("System shutdown complete")
+        if self.metrics_server is not None:
+            self.metrics_server.close()
@@ -1 +1,5 @@
-from .plant_database import PlantDatabase
\ No newline at end of file
+from .plant_database import PlantDatabase
+from .reading_writer import ReadingWriter
+from .threshold_table import ThresholdTable
+from .pool import ConnectionPool
+from .catalog import PlantCatalog, load_profiles
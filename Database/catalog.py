@@ -0,0 +1,199 @@
+import csv
+import json
+import os
+import threading
+import unicodedata
+from collections import Counter
+from .threshold_table import THRESHOLD_COLUMNS
+
+# 자모 3개 = 대략 한 음절. 음절 단위보다 촘촘해서 Whisper가 받침 하나를 틀려도 대부분 겹친다
+NGRAM = 3
+# 이 글자 수 이하의 이름/별칭("스킨", "포토스")은 정확히 같을 때만 맞는 것으로 친다.
+# 짧으면 한두 자모만 틀려도 전혀 다른 말("포토", "스킨케어")과 점수가 높게 나온다
+SHORT_NAME = 3
+
+def normalize(text):
+    """공백/문장부호를 빼고 한글 음절을 자모로 풀어 소문자로 (몬스테라 -> ㅁㅗㄴㅅㅡㅌㅔㄹㅏ)"""
+    decomposed = unicodedata.normalize("NFD", text.casefold())
+    return "".join(ch for ch in decomposed if ch.isalnum())
+
+def ngrams(key, n=NGRAM):
+    if len(key) <= n:
+        return {key} if key else set()
+    return {key[i:i + n] for i in range(len(key) - n + 1)}
+
+def edit_distance(a, b):
+    prev = list(range(len(b) + 1))
+    for i, x in enumerate(a, 1):
+        cur = [i]
+        for j, y in enumerate(b, 1):
+            cur.append(min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (x != y)))
+        prev = cur
+    return prev[-1]
+
+def substring_distance(pattern, text):
+    """text 안의 아무 위치와 비교한 pattern의 최소 편집 거리 (문장 속 식물 이름 찾기)"""
+    prev = [0] * (len(text) + 1)
+    for i, x in enumerate(pattern, 1):
+        cur = [i]
+        for j, y in enumerate(text, 1):
+            cur.append(min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (x != y)))
+        prev = cur
+    return min(prev)
+
+class PlantCatalog:
+    """plants 이름과 별칭의 n-gram 색인. 음성 인식된 식물 이름을 LLM 없이 프로필로 찾는다.
+
+    ThresholdTable처럼 plants_version이 바뀔 때만 다시 읽는다. 먼저 n-gram이 많이 겹치는
+    후보를 색인으로 좁히고, 그 몇 개만 자모 편집 거리로 점수(0~1)를 매긴다.
+    """
+
+    def __init__(self, plant_db, min_score=0.75, candidates=20):
+        self.plant_db = plant_db
+        self.min_score = min_score
+        self.candidates = candidates
+        self._lock = threading.Lock()
+        self._version = None
+        self._keys = []    # 항목 번호 -> 정규화한 이름/별칭
+        self._names = []   # 항목 번호 -> 식물 이름 (plants.name)
+        self._sizes = []   # 항목 번호 -> n-gram 수
+        self._short = []   # 항목 번호 -> 정확히 같아야 하는 짧은 이름인지
+        self._exact = {}
+        self._postings = {}
+
+    def invalidate(self):
+        with self._lock:
+            self._version = None
+
+    def _load(self, version):
+        keys, names, sizes, short, exact, postings = [], [], [], [], {}, {}
+        for label, name in self.plant_db.fetch_catalog_names():
+            key = normalize(label)
+            if not key or key in exact:
+                continue
+            exact[key] = name
+            grams = ngrams(key)
+            for gram in grams:
+                postings.setdefault(gram, []).append(len(keys))
+            keys.append(key)
+            names.append(name)
+            sizes.append(len(grams))
+            short.append(len("".join(label.split())) <= SHORT_NAME)
+        self._keys, self._names, self._sizes, self._short = keys, names, sizes, short
+        self._exact, self._postings = exact, postings
+        self._version = version
+
+    def _ensure_loaded(self):
+        version = self.plant_db.plants_version()
+        with self._lock:
+            if self._version is None or version != self._version:
+                self._load(version)
+            return self._keys, self._names, self._sizes, self._short, self._exact, self._postings
+
+    def __len__(self):
+        return len(self._ensure_loaded()[0])
+
+    def canonical(self, label):
+        """이름이나 별칭과 정확히 같으면 plants.name, 아니면 None"""
+        return self._ensure_loaded()[4].get(normalize(label))
+
+    def _shared(self, grams, postings):
+        counts = Counter()
+        for gram in grams:
+            counts.update(postings.get(gram, ()))
+        return counts
+
+    def search(self, query, limit=5):
+        """이름 하나를 찾는다 -> [(식물 이름, 점수)] 점수 높은 순"""
+        keys, names, sizes, short, exact, postings = self._ensure_loaded()
+        key = normalize(query)
+        if not key:
+            return []
+        if key in exact:
+            return [(exact[key], 1.0)]
+        grams = ngrams(key)
+        shared = self._shared(grams, postings)
+        # 겹치는 n-gram 비율(Dice)로 후보를 좁힌다
+        ranked = sorted(shared, key=lambda i: -2 * shared[i] / (len(grams) + sizes[i]))
+        best = {}
+        for i in ranked[:self.candidates]:
+            if short[i]:
+                continue  # 정확히 같았다면 위에서 찾았다
+            score = 1 - edit_distance(key, keys[i]) / max(len(key), len(keys[i]))
+            if score > best.get(names[i], 0):
+                best[names[i]] = score
+        return sorted(best.items(), key=lambda item: -item[1])[:limit]
+
+    def resolve(self, query, min_score=None):
+        """가장 비슷한 식물 이름. min_score에 못 미치면 None"""
+        min_score = self.min_score if min_score is None else min_score
+        results = self.search(query, limit=1)
+        if results and results[0][1] >= min_score:
+            return results[0][0]
+        return None
+
+    def find_in_text(self, text, min_score=None):
+        """문장 속 아무 곳에 들어 있는 식물 이름 -> (식물 이름, 점수) 또는 None.
+
+        어디에나 걸리므로 검색용이다. 식물을 바꾸는 음성 명령은 이름 자리를 먼저 잘라 search()로 찾는다
+        """
+        min_score = self.min_score if min_score is None else min_score
+        keys, names, sizes, short, exact, postings = self._ensure_loaded()
+        key = normalize(text)
+        if not key:
+            return None
+        shared = self._shared(ngrams(key), postings)
+        # 문장이 이름보다 길므로 이름 쪽 n-gram이 얼마나 들어 있는지(포함 비율)로 좁힌다
+        ranked = sorted(shared, key=lambda i: (-shared[i] / sizes[i], -len(keys[i])))
+        best = None
+        for i in ranked[:self.candidates]:
+            if shared[i] / sizes[i] < 0.5:
+                break
+            score = 1 - substring_distance(keys[i], key) / len(keys[i])
+            if short[i] and score < 1:
+                continue
+            # 같은 점수면 긴 이름 (별칭 "스킨"보다 "스킨답서스")
+            candidate = (score, len(keys[i]), names[i])
+            if best is None or candidate > best:
+                best = candidate
+        if best is None or best[0] < min_score:
+            return None
+        return best[2], best[0]
+
+# 가져오기 파일의 열 이름. 짧은 이름(temperature_min)도 받는다
+_COLUMN_ALIASES = {column[len("ideal_"):]: column for column in THRESHOLD_COLUMNS}
+
+def _parse_aliases(value):
+    if value is None:
+        return []
+    if isinstance(value, str):
+        value = value.replace(";", "|").split("|")
+    return [alias.strip() for alias in value if alias and alias.strip()]
+
+def _parse_value(value):
+    if value is None or value == "":
+        return None
+    return float(value)
+
+def parse_profile(record):
+    """dict 하나 -> {"name", 임계값 열들, "aliases"}"""
+    profile = {"name": str(record.get("name") or "").strip(), "aliases": _parse_aliases(record.get("aliases"))}
+    if not profile["name"]:
+        raise ValueError(f"Plant profile without name: {record}")
+    for field, value in record.items():
+        column = _COLUMN_ALIASES.get(field, field)
+        if column in THRESHOLD_COLUMNS:
+            profile[column] = _parse_value(value)
+    return profile
+
+def load_profiles(path):
+    """CSV(헤더 있음) 또는 JSON(목록이나 {"plants": [...]}) 파일에서 식물 프로필을 읽는다"""
+    if os.path.splitext(path)[1].lower() == ".json":
+        with open(path, encoding="utf-8") as f:
+            records = json.load(f)
+        if isinstance(records, dict):
+            records = records.get("plants", [])
+    else:
+        with open(path, encoding="utf-8-sig", newline="") as f:
+            records = list(csv.DictReader(f))
+    return [parse_profile(record) for record in records]
@@ -1,24 +1,59 @@
-import sqlite3
-import threading
-from contextlib import contextmanager
+import time
+from Metrics.instruments import COMPARE_SECONDS, DB_WRITE_SECONDS
+from .pool import ConnectionPool
+from .catalog import PlantCatalog, load_profiles
+from .threshold_table import ThresholdTable, THRESHOLD_COLUMNS
+from .rollups import (
+    ROLLUPS, DEFAULT_RETENTION, rollup_table, create_rollup_table, upsert_sql,
+    backfill_sql, aggregate_rows, choose_resolution
+)
+
+INSERT_READING_SQL = "INSERT INTO readings (ts, pot_id, sensor, value) VALUES (?, ?, ?, ?)"
+UPSERT_ROLLUP_SQL = {name: upsert_sql(name) for name, _ in ROLLUPS}
+
+# 이름이 같으면 새 값으로 갱신 (파일에 없는 값은 그대로 둔다)
+UPSERT_PLANT_SQL = f"""
+    INSERT INTO plants (name, {', '.join(THRESHOLD_COLUMNS)})
+    VALUES (?, {', '.join('?' for _ in THRESHOLD_COLUMNS)})
+    ON CONFLICT (name) DO UPDATE SET
+    {', '.join(f'{column} = COALESCE(excluded.{column}, {column})' for column in THRESHOLD_COLUMNS)}
+"""
+INSERT_ALIAS_SQL = """
+    INSERT INTO plant_aliases (alias, plant_id)
+    SELECT ?, id FROM plants WHERE name = ?
+    ON CONFLICT (alias) DO UPDATE SET plant_id = excluded.plant_id
+"""
+
+DEFAULT_ALIASES = [
+    ("스킨", "스킨답서스"),
+    ("포토스", "스킨답서스"),
+    ("에피프레넘", "스킨답서스"),
+    ("몬스테라 델리시오사", "몬스테라"),
+    ("산세비에리아", "산세베리아"),
+]
 
 class PlantDatabase:
-    def __init__(self, db_name="plant_data.db"):
+    def __init__(self, db_name="plant_data.db", retention=None, readers=4, pragmas=None):
         self.db_name = db_name
-        self.thread_local = threading.local()
+        self.thresholds = ThresholdTable(self)
+        self.catalog = PlantCatalog(self)
+        # 원본/롤업별 보관 기간(초). prune()이 이보다 오래된 행을 지운다
+        self.retention = dict(DEFAULT_RETENTION, **(retention or {}))
+        # SQLite는 한 번에 한 연결만 쓸 수 있으므로 쓰기 연결은 하나를 돌려 쓰고,
+        # 조회는 읽기 전용 연결 풀에서 (WAL이라 쓰는 중에도 막히지 않는다)
+        self.writer = ConnectionPool(db_name, size=1, pragmas=pragmas)
+        if db_name == ":memory:":
+            self.reader = self.writer  # 메모리 DB는 연결마다 따로라 공유할 수 없다
+        else:
+            self.reader = ConnectionPool(db_name, size=readers, readonly=True, pragmas=pragmas)
 
-    @contextmanager
     def get_connection(self):
-        if not hasattr(self.thread_local, "connection"):
-            self.thread_local.connection = sqlite3.connect(self.db_name)
-        try:
-            yield self.thread_local.connection
-        except Exception as e:
-            print(f"Database error: {e}")
-            if hasattr(self.thread_local, "connection"):
-                self.thread_local.connection.close()
-                delattr(self.thread_local, "connection")
-            raise
+        """쓰기 연결을 빌린다 (with 블록이 끝나면 풀로 돌아감)"""
+        return self.writer.checkout()
+
+    def read_connection(self):
+        """읽기 전용 연결을 빌린다"""
+        return self.reader.checkout()
 
     def create_tables(self):
         with self.get_connection() as conn:
@@ -37,6 +72,50 @@ class PlantDatabase:
                     ideal_light_max REAL
                 )
             """)
+
+            # 예전 스키마는 name에 UNIQUE가 없어 시작할 때마다 기본 식물이 중복으로 들어갔다.
+            # 중복은 먼저 들어간 행만 남기고 지운 뒤 고유 색인을 만든다 (한 번만)
+            has_index = cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_plants_name'"
+            ).fetchone()
+            if not has_index:
+                cursor.execute(
+                    "DELETE FROM plants WHERE id NOT IN (SELECT MIN(id) FROM plants GROUP BY name)"
+                )
+                cursor.execute("CREATE UNIQUE INDEX idx_plants_name ON plants (name)")
+
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS plant_aliases (
+                    alias TEXT PRIMARY KEY,
+                    plant_id INTEGER NOT NULL REFERENCES plants (id)
+                )
+            """)
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_plant_aliases_plant ON plant_aliases (plant_id)")
+            cursor.execute("""
+                CREATE TRIGGER IF NOT EXISTS plants_delete_aliases
+                AFTER DELETE ON plants
+                BEGIN
+                    DELETE FROM plant_aliases WHERE plant_id = OLD.id;
+                END
+            """)
+
+            # plants/별칭이 바뀔 때마다 버전을 올려 임계값/카탈로그 캐시를 무효화
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS plants_meta (
+                    id INTEGER PRIMARY KEY CHECK (id = 0),
+                    version INTEGER NOT NULL
+                )
+            """)
+            cursor.execute("INSERT OR IGNORE INTO plants_meta (id, version) VALUES (0, 0)")
+            for table in ("plants", "plant_aliases"):
+                for event in ("INSERT", "UPDATE", "DELETE"):
+                    cursor.execute(f"""
+                        CREATE TRIGGER IF NOT EXISTS {table}_version_{event.lower()}
+                        AFTER {event} ON {table}
+                        BEGIN
+                            UPDATE plants_meta SET version = version + 1 WHERE id = 0;
+                        END
+                    """)
             
             plants_data = [
                 ("스킨답서스", 18, 27, 40, 70, 40, 60, 500, 2500),
@@ -52,62 +131,194 @@ class PlantDatabase:
                     ideal_light_min, ideal_light_max
                 ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
             """, plants_data)
+            cursor.executemany(
+                "INSERT OR IGNORE INTO plant_aliases (alias, plant_id) SELECT ?, id FROM plants WHERE name = ?",
+                DEFAULT_ALIASES
+            )
+
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS readings (
+                    ts REAL NOT NULL,
+                    pot_id TEXT NOT NULL,
+                    sensor TEXT NOT NULL,
+                    value REAL NOT NULL
+                )
+            """)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_readings_pot_sensor_ts
+                ON readings (pot_id, sensor, ts)
+            """)
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_readings_ts ON readings (ts)")
+
+            # 분/시/일 롤업. 새로 만든 테이블은 기존 원본 행으로 한 번 채운다
+            for name, step in ROLLUPS:
+                exists = cursor.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+                    (rollup_table(name),)
+                ).fetchone()
+                create_rollup_table(cursor, name)
+                if not exists:
+                    cursor.execute(backfill_sql(name, step))
             
             conn.commit()
 
-    def fetch_all_data(self):
+    def insert_readings(self, rows):
+        """(ts, pot_id, sensor, value) 목록과 그 롤업 갱신을 하나의 트랜잭션으로 저장"""
+        if not rows:
+            return 0
+        with self.get_connection() as conn, DB_WRITE_SECONDS.time():
+            with conn:
+                conn.executemany(INSERT_READING_SQL, rows)
+                # 배치를 구간별로 먼저 합쳐 구간당 UPSERT 한 번씩만
+                for name, step in ROLLUPS:
+                    conn.executemany(UPSERT_ROLLUP_SQL[name], aggregate_rows(rows, step))
+        return len(rows)
+
+    def fetch_readings(self, pot_id, sensor, start_ts=None, end_ts=None):
+        query = "SELECT ts, value FROM readings WHERE pot_id = ? AND sensor = ?"
+        params = [pot_id, sensor]
+        if start_ts is not None:
+            query += " AND ts >= ?"
+            params.append(start_ts)
+        if end_ts is not None:
+            query += " AND ts < ?"
+            params.append(end_ts)
+        query += " ORDER BY ts"
+        with self.read_connection() as conn:
+            return conn.execute(query, params).fetchall()
+
+    def fetch_history(self, pot_id, sensor, start_ts, end_ts=None, max_points=500, resolution=None):
+        """기간 조회. 범위에 맞는 해상도를 골라 (resolution, [(ts, count, mean, min, max, last)])
+
+        resolution을 지정하지 않으면 max_points 이하로 범위를 덮는 가장 세밀한 해상도를 쓴다.
+        """
+        now = time.time()
+        end_ts = now if end_ts is None else end_ts
+        if resolution is None:
+            resolution, step = choose_resolution(start_ts, end_ts, max_points, self.retention, now)
+        else:
+            step = dict(ROLLUPS).get(resolution, 0)
+
+        if resolution == "raw":
+            rows = self.fetch_readings(pot_id, sensor, start_ts, end_ts)
+            return resolution, [(ts, 1, value, value, value, value) for ts, value in rows]
+
+        # 시작 시각이 걸친 구간부터 포함
+        first_bucket = int(start_ts // step) * step
+        with self.read_connection() as conn:
+            rows = conn.execute(f"""
+                SELECT bucket, count, sum / count, min, max, last_value
+                FROM {rollup_table(resolution)}
+                WHERE pot_id = ? AND sensor = ? AND bucket >= ? AND bucket < ?
+                ORDER BY bucket
+            """, (pot_id, sensor, first_bucket, end_ts)).fetchall()
+        return resolution, rows
+
+    def history_summary(self, pot_id, sensor, start_ts, end_ts=None):
+        """기간 전체의 count/mean/min/max/last (예: "이번 주 습도는 어땠어?")"""
+        resolution, rows = self.fetch_history(pot_id, sensor, start_ts, end_ts)
+        count = sum(row[1] for row in rows)
+        if not count:
+            return None
+        return {
+            "resolution": resolution,
+            "count": count,
+            "mean": sum(row[1] * row[2] for row in rows) / count,
+            "min": min(row[3] for row in rows),
+            "max": max(row[4] for row in rows),
+            "last": rows[-1][5],
+        }
+
+    def prune(self, now=None):
+        """보관 기간이 지난 원본/롤업 행 삭제. 원본을 지워도 롤업은 남는다"""
+        now = time.time() if now is None else now
+        deleted = {}
         with self.get_connection() as conn:
+            with conn:
+                age = self.retention.get("raw")
+                if age is not None:
+                    deleted["raw"] = conn.execute(
+                        "DELETE FROM readings WHERE ts < ?", (now - age,)
+                    ).rowcount
+                for name, step in ROLLUPS:
+                    age = self.retention.get(name)
+                    if age is None:
+                        continue
+                    # 구간이 통째로 기간을 벗어난 것만
+                    deleted[name] = conn.execute(
+                        f"DELETE FROM {rollup_table(name)} WHERE bucket + ? <= ?",
+                        (step, now - age)
+                    ).rowcount
+        return deleted
+
+    def fetch_all_data(self):
+        with self.read_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT * FROM plants")
             return cursor.fetchall()
 
     def fetch_specific_columns(self, plant_name, columns):
-        with self.get_connection() as conn:
+        with self.read_connection() as conn:
             cursor = conn.cursor()
             col_names = ", ".join(columns)
             cursor.execute(f"SELECT {col_names} FROM plants WHERE name = ?", (plant_name,))
             return cursor.fetchone()
 
-    def compare_sensor_data(self, plant_name, sensor_data):
+    def fetch_catalog_names(self):
+        """(이름 또는 별칭, 식물 이름) 목록. 이름이 먼저"""
+        with self.read_connection() as conn:
+            return conn.execute("""
+                SELECT name, name FROM plants
+                UNION ALL
+                SELECT plant_aliases.alias, plants.name
+                FROM plant_aliases JOIN plants ON plants.id = plant_aliases.plant_id
+            """).fetchall()
+
+    def upsert_plants(self, profiles):
+        """식물 프로필(parse_profile 형식) 목록을 하나의 트랜잭션으로 추가/갱신. 저장한 수를 반환"""
+        plants = [
+            (profile["name"], *(profile.get(column) for column in THRESHOLD_COLUMNS))
+            for profile in profiles
+        ]
+        aliases = [
+            (alias, profile["name"])
+            for profile in profiles for alias in profile.get("aliases", ()) if alias != profile["name"]
+        ]
         with self.get_connection() as conn:
+            with conn:
+                conn.executemany(UPSERT_PLANT_SQL, plants)
+                conn.executemany(INSERT_ALIAS_SQL, aliases)
+        return len(plants)
+
+    def import_plants(self, path):
+        """CSV/JSON 파일의 식물 프로필을 한꺼번에 가져온다"""
+        return self.upsert_plants(load_profiles(path))
+
+    def plants_version(self):
+        with self.read_connection() as conn:
+            row = conn.execute("SELECT version FROM plants_meta WHERE id = 0").fetchone()
+            return row[0] if row else 0
+
+    def fetch_thresholds(self):
+        with self.read_connection() as conn:
             cursor = conn.cursor()
-            try:
-                ideal_values = self.fetch_specific_columns(
-                    plant_name,
-                    [
-                        "ideal_temperature_min", "ideal_temperature_max",
-                        "ideal_humidity_min", "ideal_humidity_max",
-                        "ideal_soil_moisture_min", "ideal_soil_moisture_max",
-                        "ideal_light_min", "ideal_light_max"
-                    ]
-                )
-                
-                if ideal_values:
-                    comparisons = {}
-                    temp_min, temp_max, hum_min, hum_max, soil_min, soil_max, light_min, light_max = ideal_values
-                    
-                    comparisons['temperature'] = self._compare(sensor_data.get('temperature'), temp_min, temp_max)
-                    comparisons['humidity'] = self._compare(sensor_data.get('humidity'), hum_min, hum_max)
-                    comparisons['soil_moisture'] = self._compare(sensor_data.get('soil_moisture'), soil_min, soil_max)
-                    comparisons['light'] = self._compare(sensor_data.get('light'), light_min, light_max)
-                    
-                    return comparisons
-                return None
-            except Exception as e:
-                print(f"Error comparing sensor data: {e}")
-                return None
-
-    def _compare(self, sensor_value, min_val, max_val):
-        if sensor_value is None:
-            return "no_data"
-        if sensor_value < min_val:
-            return "below_minimum"
-        elif min_val <= sensor_value <= max_val:
-            return "within_range"
-        else:
-            return "above_maximum"
+            cursor.execute(f"SELECT name, {', '.join(THRESHOLD_COLUMNS)} FROM plants ORDER BY id")
+            return cursor.fetchall()
+
+    def compare_sensor_data(self, plant_name, sensor_data):
+        results = self.compare_sensor_batch([plant_name], [sensor_data])
+        return results[0] if results else None
+
+    def compare_sensor_batch(self, plant_names, sensor_data_list):
+        """여러 화분의 센서 데이터를 캐시된 임계값 테이블로 한 번에 비교"""
+        try:
+            with COMPARE_SECONDS.time():
+                return self.thresholds.classify(plant_names, sensor_data_list)
+        except Exception as e:
+            print(f"Error comparing sensor data: {e}")
+            return [None] * len(sensor_data_list)
 
     def close(self):
-        if hasattr(self.thread_local, "connection"):
-            self.thread_local.connection.close()
-            delattr(self.thread_local, "connection")
+        """모든 연결을 닫는다 (사용 중인 연결은 돌아올 때). 닫은 뒤에는 쓸 수 없다"""
+        self.writer.close()
+        self.reader.close()
@@ -0,0 +1,120 @@
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+# 모든 연결에 적용. mmap/cache는 라즈베리파이 메모리를 생각해 적당히
+DEFAULT_PRAGMAS = {
+    "synchronous": "NORMAL",
+    "mmap_size": 64 * 1024 * 1024,
+    "cache_size": -8000,  # 음수는 KiB 단위 (약 8MB)
+    "temp_store": "MEMORY",
+}
+
+class ConnectionPool:
+    """크기가 제한된 sqlite3 연결 풀.
+
+    checkout()으로 빌리고 with 블록이 끝나면 돌려준다. 한 스레드가 이미 빌린 상태에서 다시
+    checkout() 하면 같은 연결을 준다 (중첩 호출이 풀을 두 칸 차지하거나 교착되지 않도록).
+    연결은 스레드에 묶이지 않으므로 sqlite3 자체의 문장 캐시(cached_statements)도 계속 쓰인다.
+    readonly면 mode=ro로 열고 query_only를 켠다 (WAL에서 쓰기와 서로 막지 않는 읽기 전용).
+    """
+
+    def __init__(self, db_name, size=4, readonly=False, pragmas=None, cached_statements=256,
+                 timeout=10.0, busy_timeout=5.0):
+        self.db_name = db_name
+        self.size = size
+        self.readonly = readonly
+        self.pragmas = dict(DEFAULT_PRAGMAS, **(pragmas or {}))
+        self.cached_statements = cached_statements
+        # 풀이 비어 있을 때 기다리는 시간 / DB 잠금을 기다리는 시간
+        self.timeout = timeout
+        self.busy_timeout = busy_timeout
+        self._idle = queue.LifoQueue()  # 최근에 쓴 연결(캐시가 따뜻한)부터
+        self._slots = threading.BoundedSemaphore(size)
+        self._held = threading.local()
+        # 닫은 뒤 돌아온 연결은 풀에 넣지 않고 닫는다
+        self._lock = threading.Lock()
+        self._closed = False
+        self.opened = 0
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def _connect(self):
+        if self.readonly:
+            conn = sqlite3.connect(
+                f"file:{self.db_name}?mode=ro", uri=True, timeout=self.busy_timeout,
+                check_same_thread=False, cached_statements=self.cached_statements
+            )
+            conn.execute("PRAGMA query_only=ON")
+        else:
+            conn = sqlite3.connect(
+                self.db_name, timeout=self.busy_timeout,
+                check_same_thread=False, cached_statements=self.cached_statements
+            )
+            # WAL 모드: 읽기와 쓰기가 서로 막지 않고, 커밋마다 fsync 하지 않음
+            conn.execute("PRAGMA journal_mode=WAL")
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name}={value}")
+        self.opened += 1
+        return conn
+
+    @contextmanager
+    def checkout(self):
+        held = getattr(self._held, "conn", None)
+        if held is not None:
+            self._held.depth += 1
+            try:
+                yield held
+            finally:
+                self._held.depth -= 1
+            return
+
+        if not self._slots.acquire(timeout=self.timeout):
+            raise sqlite3.OperationalError(f"Connection pool exhausted ({self.db_name})")
+        conn = None
+        try:
+            if self._closed:
+                raise sqlite3.ProgrammingError(f"Connection pool is closed ({self.db_name})")
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = self._connect()
+            self._held.conn, self._held.depth = conn, 1
+            try:
+                yield conn
+            except sqlite3.Error as e:
+                # 상태를 알 수 없는 연결은 버리고 다음에 새로 연다
+                print(f"Database error: {e}")
+                conn.close()
+                conn = None
+                raise
+            except BaseException:
+                if conn.in_transaction:
+                    conn.rollback()
+                raise
+            if conn.in_transaction:
+                # 커밋하지 않은 읽기/쓰기가 다음 사용자에게 넘어가지 않도록
+                conn.rollback()
+        finally:
+            self._held.conn = None
+            if conn is not None:
+                with self._lock:
+                    if self._closed:
+                        conn.close()
+                    else:
+                        self._idle.put(conn)
+            self._slots.release()
+
+    def close(self):
+        """쉬고 있는 연결을 모두 닫는다. 빌려 간 연결은 돌아올 때 닫히고, 이후 checkout()은 실패한다"""
+        with self._lock:
+            self._closed = True
+            while True:
+                try:
+                    conn = self._idle.get_nowait()
+                except queue.Empty:
+                    return
+                conn.close()
@@ -0,0 +1,109 @@
+import threading
+import time
+from collections import deque
+
+class ReadingWriter:
+    """센서 측정값을 버퍼에 모았다가 백그라운드 스레드에서 일괄 저장"""
+
+    def __init__(self, plant_db, batch_size=200, flush_interval=5.0, max_buffer=10000,
+                 prune_interval=3600.0):
+        self.plant_db = plant_db
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        # 보관 기간 정리도 쓰기 스레드에서 (None이면 하지 않음)
+        self.prune_interval = prune_interval
+        self._last_prune = time.monotonic()
+        self._buffer = deque()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._running = False
+        self._thread = None
+        self._dropped = 0
+        self.written = 0
+
+    def start(self):
+        if self._running:
+            return self
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="ReadingWriter")
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def add(self, pot_id, sensor, value, ts=None):
+        """이벤트 루프에서 호출해도 막히지 않도록 버퍼에 추가만 한다"""
+        row = (time.time() if ts is None else ts, pot_id, sensor, float(value))
+        with self._lock:
+            if len(self._buffer) >= self.max_buffer:
+                # 디스크가 따라오지 못하면 가장 오래된 값을 버린다
+                self._buffer.popleft()
+                self._dropped += 1
+            self._buffer.append(row)
+            size = len(self._buffer)
+        if size >= self.batch_size:
+            self._wakeup.set()
+
+    def add_many(self, pot_id, data, ts=None):
+        ts = time.time() if ts is None else ts
+        for sensor, value in data.items():
+            if value is not None:
+                self.add(pot_id, sensor, value, ts)
+
+    def _take_buffer(self):
+        with self._lock:
+            rows = list(self._buffer)
+            self._buffer.clear()
+        return rows
+
+    def flush(self):
+        rows = self._take_buffer()
+        if not rows:
+            return 0
+        try:
+            count = self.plant_db.insert_readings(rows)
+            self.written += count
+            return count
+        except Exception as e:
+            print(f"Error writing readings: {e}")
+            # 실패한 배치는 다음 flush에서 다시 시도
+            with self._lock:
+                self._buffer.extendleft(reversed(rows))
+                overflow = len(self._buffer) - self.max_buffer
+                for _ in range(max(0, overflow)):
+                    self._buffer.popleft()
+                self._dropped += max(0, overflow)
+            return 0
+
+    def _prune_if_due(self):
+        if self.prune_interval is None:
+            return
+        if time.monotonic() - self._last_prune < self.prune_interval:
+            return
+        self._last_prune = time.monotonic()
+        try:
+            self.plant_db.prune()
+        except Exception as e:
+            print(f"Error pruning readings: {e}")
+
+    def _run(self):
+        while self._running:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+            self._prune_if_due()
+        self.flush()
+
+    @property
+    def dropped(self):
+        return self._dropped
+
+    def close(self):
+        if not self._running:
+            self.flush()
+            return
+        self._running = False
+        self._wakeup.set()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=5)
+        self._thread = None
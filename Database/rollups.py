@@ -0,0 +1,102 @@
+import math
+
+# (이름, 구간 길이(초)) 세밀한 것부터
+ROLLUPS = (
+    ("minute", 60),
+    ("hour", 3600),
+    ("day", 86400),
+)
+
+# 보관 기간(초). None이면 지우지 않는다
+DEFAULT_RETENTION = {
+    "raw": 7 * 86400,
+    "minute": 30 * 86400,
+    "hour": 365 * 86400,
+    "day": None,
+}
+
+ROLLUP_COLUMNS = ("pot_id", "sensor", "bucket", "count", "sum", "min", "max", "last_ts", "last_value")
+
+def rollup_table(name):
+    return f"readings_{name}"
+
+def create_rollup_table(cursor, name):
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS {rollup_table(name)} (
+            pot_id TEXT NOT NULL,
+            sensor TEXT NOT NULL,
+            bucket INTEGER NOT NULL,
+            count INTEGER NOT NULL,
+            sum REAL NOT NULL,
+            min REAL NOT NULL,
+            max REAL NOT NULL,
+            last_ts REAL NOT NULL,
+            last_value REAL NOT NULL,
+            PRIMARY KEY (pot_id, sensor, bucket)
+        ) WITHOUT ROWID
+    """)
+
+def upsert_sql(name):
+    # SET 절의 열 이름은 갱신 전 값을 가리키므로 last_value를 last_ts보다 먼저 비교해도 된다
+    return f"""
+        INSERT INTO {rollup_table(name)} ({', '.join(ROLLUP_COLUMNS)})
+        VALUES ({', '.join('?' * len(ROLLUP_COLUMNS))})
+        ON CONFLICT (pot_id, sensor, bucket) DO UPDATE SET
+            count = count + excluded.count,
+            sum = sum + excluded.sum,
+            min = MIN(min, excluded.min),
+            max = MAX(max, excluded.max),
+            last_value = CASE WHEN excluded.last_ts >= last_ts
+                              THEN excluded.last_value ELSE last_value END,
+            last_ts = MAX(last_ts, excluded.last_ts)
+    """
+
+def backfill_sql(name, step):
+    """기존 readings 행으로 처음 한 번 롤업을 채운다"""
+    return f"""
+        INSERT INTO {rollup_table(name)} ({', '.join(ROLLUP_COLUMNS)})
+        SELECT r.pot_id, r.sensor, r.bucket, r.count, r.sum, r.min, r.max, r.last_ts,
+               (SELECT value FROM readings
+                WHERE pot_id = r.pot_id AND sensor = r.sensor AND ts = r.last_ts LIMIT 1)
+        FROM (
+            SELECT pot_id, sensor, CAST(ts / {step} AS INTEGER) * {step} AS bucket,
+                   COUNT(*) AS count, SUM(value) AS sum, MIN(value) AS min,
+                   MAX(value) AS max, MAX(ts) AS last_ts
+            FROM readings GROUP BY pot_id, sensor, bucket
+        ) AS r
+    """
+
+def aggregate_rows(rows, step):
+    """(ts, pot_id, sensor, value) 배치를 구간별 (count, sum, min, max, last)로 미리 합친다"""
+    buckets = {}
+    for ts, pot_id, sensor, value in rows:
+        key = (pot_id, sensor, int(ts // step) * step)
+        entry = buckets.get(key)
+        if entry is None:
+            buckets[key] = [1, value, value, value, ts, value]
+            continue
+        entry[0] += 1
+        entry[1] += value
+        if value < entry[2]:
+            entry[2] = value
+        if value > entry[3]:
+            entry[3] = value
+        if ts >= entry[4]:
+            entry[4] = ts
+            entry[5] = value
+    return [key + tuple(entry) for key, entry in buckets.items()]
+
+def choose_resolution(start_ts, end_ts, max_points, retention, now, raw_interval=1.0):
+    """범위를 max_points개 이하의 점으로 덮으면서 아직 보관 중인 가장 세밀한 해상도.
+
+    원본(raw)은 많아야 raw_interval초에 한 번 측정된다고 보고 점 수를 어림한다.
+    어느 것도 맞지 않으면 가장 거친 해상도(day)를 쓴다.
+    """
+    span = max(0.0, end_ts - start_ts)
+    for name, step in (("raw", raw_interval),) + ROLLUPS:
+        age = retention.get(name)
+        if age is not None and start_ts < now - age:
+            continue  # 범위 앞부분이 이미 지워졌다
+        if math.ceil(span / step) <= max_points:
+            return name, (0 if name == "raw" else step)
+    return ROLLUPS[-1]
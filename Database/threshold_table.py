@@ -0,0 +1,120 @@
+import threading
+import numpy as np
+
+SENSORS = ('temperature', 'humidity', 'soil_moisture', 'light')
+STATUS_LABELS = ('no_data', 'below_minimum', 'within_range', 'above_maximum')
+
+NO_DATA = 0
+BELOW_MINIMUM = 1
+WITHIN_RANGE = 2
+ABOVE_MAXIMUM = 3
+
+THRESHOLD_COLUMNS = (
+    "ideal_temperature_min", "ideal_temperature_max",
+    "ideal_humidity_min", "ideal_humidity_max",
+    "ideal_soil_moisture_min", "ideal_soil_moisture_max",
+    "ideal_light_min", "ideal_light_max"
+)
+
+class ThresholdTable:
+    """plants 테이블의 적정 범위를 배열로 캐시해 여러 화분을 한 번에 판정"""
+
+    def __init__(self, plant_db):
+        self.plant_db = plant_db
+        self._lock = threading.Lock()
+        self._version = None
+        self._index = {}
+        self._mins = np.empty((0, len(SENSORS)), dtype=np.float64)
+        self._maxs = np.empty((0, len(SENSORS)), dtype=np.float64)
+
+    def invalidate(self):
+        with self._lock:
+            self._version = None
+
+    def _load(self, version):
+        rows = self.plant_db.fetch_thresholds()
+        index = {}
+        bounds = []
+        for row in rows:
+            name = row[0]
+            if name in index:
+                # 같은 이름이 여러 번 있으면 먼저 들어간 행을 사용
+                continue
+            index[name] = len(bounds)
+            bounds.append([np.nan if v is None else v for v in row[1:]])
+
+        table = np.array(bounds, dtype=np.float64).reshape(-1, len(THRESHOLD_COLUMNS))
+        self._index = index
+        self._mins = np.ascontiguousarray(table[:, 0::2])
+        self._maxs = np.ascontiguousarray(table[:, 1::2])
+        self._version = version
+
+    def _ensure_loaded(self):
+        version = self.plant_db.plants_version()
+        with self._lock:
+            if self._version is None or version != self._version:
+                self._load(version)
+            return self._index, self._mins, self._maxs
+
+    def snapshot(self):
+        """(이름 -> 행 번호, 최소, 최대) 현재 테이블. 바뀌면 새 객체로 바뀌므로 들고 있어도 안전"""
+        return self._ensure_loaded()
+
+    def lookup(self, plant_names, snapshot=None):
+        index, _, _ = snapshot or self._ensure_loaded()
+        return np.array([index.get(name, -1) for name in plant_names], dtype=np.intp)
+
+    def bounds(self, plant_name):
+        """식물 하나의 센서별 (최소, 최대). 모르는 식물이면 None"""
+        index, mins, maxs = self._ensure_loaded()
+        row = index.get(plant_name)
+        if row is None:
+            return None
+        return {
+            sensor: (float(mins[row, j]), float(maxs[row, j])) for j, sensor in enumerate(SENSORS)
+        }
+
+    def classify_array(self, rows, values, snapshot=None):
+        """rows: 식물 행 번호 (n,), values: (n, 4) 센서값 (결측은 NaN) -> (n, 4) 상태 코드
+
+        rows를 lookup()으로 얻었다면 같은 snapshot을 넘긴다 (그 사이 테이블이 바뀌면 행 번호가 어긋난다)
+        """
+        _, mins, maxs = snapshot or self._ensure_loaded()
+        rows = np.asarray(rows, dtype=np.intp)
+        values = np.asarray(values, dtype=np.float64)
+
+        known = rows >= 0
+        safe_rows = np.where(known, rows, 0)
+        if len(mins) == 0:
+            return np.full(values.shape, NO_DATA, dtype=np.int8), known
+
+        lo = mins[safe_rows]
+        hi = maxs[safe_rows]
+        codes = np.full(values.shape, WITHIN_RANGE, dtype=np.int8)
+        codes[values < lo] = BELOW_MINIMUM
+        codes[values > hi] = ABOVE_MAXIMUM
+        codes[np.isnan(values)] = NO_DATA
+        return codes, known
+
+    def classify(self, plant_names, sensor_data_list):
+        """식물 이름과 센서 데이터 dict 목록을 받아 비교 결과 dict 목록을 반환"""
+        values = np.full((len(sensor_data_list), len(SENSORS)), np.nan, dtype=np.float64)
+        for i, sensor_data in enumerate(sensor_data_list):
+            for j, sensor in enumerate(SENSORS):
+                value = sensor_data.get(sensor)
+                if value is not None:
+                    values[i, j] = value
+
+        # 버전 확인은 한 번만, 이름 -> 행 번호와 판정에 같은 테이블을 쓴다
+        snapshot = self.snapshot()
+        codes, known = self.classify_array(self.lookup(plant_names, snapshot), values, snapshot)
+
+        results = []
+        for i in range(len(sensor_data_list)):
+            if not known[i]:
+                results.append(None)
+                continue
+            results.append({
+                sensor: STATUS_LABELS[codes[i, j]] for j, sensor in enumerate(SENSORS)
+            })
+        return results
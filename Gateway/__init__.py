@@ -0,0 +1,3 @@
+from .protocol import Frame, FrameError, encode_frame, decode_frame
+from .collector import IngestCollector, create_collector
+from .node import NodeForwarder, create_transport
@@ -0,0 +1,366 @@
+import json
+import os
+import queue
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+from Metrics.instruments import GATEWAY_FRAMES, GATEWAY_ROWS_WRITTEN, GATEWAY_ROWS_DROPPED
+from .protocol import FrameError, decode_frame, encode_ack, ACK_OK, ACK_DUPLICATE
+
+MAX_DATAGRAM = 65507
+
+class SequenceWindow:
+    """노드 하나(node_id, epoch)에서 받은 seq 기록: floor 이하는 모두 받았고 그 위는 집합으로"""
+
+    __slots__ = ("floor", "above", "limit", "last_seen")
+
+    def __init__(self, limit=4096):
+        self.floor = -1
+        self.above = set()
+        self.limit = limit
+        self.last_seen = time.monotonic()
+
+    def seen(self, seq):
+        return seq <= self.floor or seq in self.above
+
+    def add(self, seq):
+        """처음 보는 seq면 True"""
+        if self.seen(seq):
+            return False
+        self.above.add(seq)
+        while self.floor + 1 in self.above:
+            self.floor += 1
+            self.above.discard(self.floor)
+        if len(self.above) > self.limit:
+            # 빠진 seq를 끝없이 기다리지 않는다 (오래된 빈칸은 받은 것으로 친다)
+            self.floor = min(self.above)
+            self.above.discard(self.floor)
+        return True
+
+class IngestCollector:
+    """여러 센서 노드가 UDP/HTTP로 보낸 측정 프레임을 받아 PlantDatabase에 일괄 저장.
+
+    받은 프레임은 (node_id, epoch, seq)로 중복을 거르고 크기가 제한된 큐에 넣은 뒤 ACK 한다.
+    큐가 차면 ACK 하지 않거나(UDP) 503을 돌려주어(HTTP) 노드가 나중에 다시 보내게 한다.
+    쓰기 스레드는 큐에서 프레임을 모아 batch_size 행씩 한 트랜잭션으로 저장한다. 이미 ACK 한
+    행이므로 저장이 실패하면 성공할 때까지 간격을 늘려 가며 다시 시도하고(그동안 큐가 차서 노드가
+    기다린다), 종료 때도 실패하면 spool_path에 남겨 다음 시작 때 저장한다.
+    기본은 이 기기에서만 받는다. 다른 기기에서 받으려면 host를 열고 key(공유 키)를 함께 쓴다.
+    """
+
+    def __init__(self, plant_db, host="127.0.0.1", udp_port=9110, http_port=None, queue_size=1024,
+                 batch_size=2000, flush_interval=0.5, prefix_node=True, key=None, spool_path=None,
+                 window_ttl=3600.0, epoch_grace=60.0, max_retry_delay=30.0, close_attempts=3):
+        self.plant_db = plant_db
+        self.host = host
+        self.udp_port = udp_port
+        self.http_port = http_port
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        # 노드마다 pot1 같은 같은 이름을 쓰므로 "노드/화분"으로 저장
+        self.prefix_node = prefix_node
+        self.key = key
+        self.spool_path = spool_path
+        # 이 시간 동안 프레임이 없던 노드/epoch의 seq 기록은 버린다.
+        # 노드가 새 epoch(재시작)로 보내기 시작하면 이전 epoch는 epoch_grace 뒤에 버린다
+        self.window_ttl = window_ttl
+        self.epoch_grace = epoch_grace
+        self.max_retry_delay = max_retry_delay
+        self.close_attempts = close_attempts
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._windows = {}
+        self._latest_epoch = {}
+        # seq 기록과 수신 카운터(frames/duplicates/rejected/invalid)를 함께 보호한다.
+        # UDP 스레드와 HTTP 요청 스레드가 동시에 센다
+        self._windows_lock = threading.Lock()
+        self._next_sweep = 0.0
+        self._stopping = threading.Event()
+        self._running = False
+        self._threads = []
+        self._udp = None
+        self._http = None
+        self.frames = 0
+        self.duplicates = 0
+        self.rejected = 0
+        self.invalid = 0
+        self.written = 0
+        self.dropped = 0
+        self.spooled = 0
+
+    def start(self):
+        if self._running:
+            return self
+        if self.key is None and self.host not in ("127.0.0.1", "localhost", "::1"):
+            print(f"Warning: gateway collector listening on {self.host} without a shared key")
+        self._running = True
+        self._stopping.clear()
+        self._start_thread(self._write_loop, "GatewayWriter")
+        if self.udp_port is not None:
+            self._udp = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self._udp.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 * 1024 * 1024)
+            self._udp.bind((self.host, self.udp_port))
+            self._udp.settimeout(0.1)
+            self.udp_port = self._udp.getsockname()[1]
+            self._start_thread(self._udp_loop, "GatewayUDP")
+        if self.http_port is not None:
+            self._http = ThreadingHTTPServer((self.host, self.http_port), self._http_handler())
+            self._http.daemon_threads = True
+            self.http_port = self._http.server_address[1]
+            self._start_thread(lambda: self._http.serve_forever(0.1), "GatewayHTTP")
+        return self
+
+    def _start_thread(self, target, name):
+        thread = threading.Thread(target=target, name=name, daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def receive(self, data):
+        """프레임 하나를 처리하고 돌려보낼 ACK를 만든다. None이면 ACK 하지 않음(잘못된 프레임/큐 가득)"""
+        try:
+            frame = decode_frame(data, self.key)
+        except FrameError as e:
+            self._count_invalid()
+            print(f"Gateway frame error: {e}")
+            return None
+        status = self.accept(frame)
+        return None if status is None else encode_ack(frame.epoch, frame.seq, status, self.key)
+
+    def _count_invalid(self):
+        with self._windows_lock:
+            self.invalid += 1
+        GATEWAY_FRAMES.labels("invalid").inc()
+
+    def accept(self, frame):
+        """중복이면 ACK_DUPLICATE, 큐에 넣었으면 ACK_OK, 큐가 가득 찼으면 None"""
+        now = time.monotonic()
+        with self._windows_lock:
+            if now >= self._next_sweep:
+                self._expire_windows(now)
+            key = (frame.node_id, frame.epoch)
+            window = self._windows.get(key)
+            if window is None:
+                window = self._windows[key] = SequenceWindow()
+                self._latest_epoch[frame.node_id] = frame.epoch
+            window.last_seen = now
+            if window.seen(frame.seq):
+                self.duplicates += 1
+                result = "duplicate"
+                status = ACK_DUPLICATE
+            else:
+                try:
+                    self._queue.put_nowait(frame)
+                except queue.Full:
+                    self.rejected += 1
+                    result = "rejected"
+                    status = None
+                else:
+                    window.add(frame.seq)
+                    self.frames += 1
+                    result = "accepted"
+                    status = ACK_OK
+        GATEWAY_FRAMES.labels(result).inc()
+        return status
+
+    def _expire_windows(self, now):
+        """오래 조용한 노드와 재시작 전 epoch의 seq 기록을 버린다 (_windows_lock 안에서)"""
+        for key, window in list(self._windows.items()):
+            node_id, epoch = key
+            idle = now - window.last_seen
+            superseded = self._latest_epoch.get(node_id) != epoch
+            if idle > self.window_ttl or (superseded and idle > self.epoch_grace):
+                del self._windows[key]
+                if not superseded:
+                    self._latest_epoch.pop(node_id, None)
+        self._next_sweep = now + min(self.epoch_grace, self.window_ttl) / 2
+
+    def _udp_loop(self):
+        sock = self._udp
+        while self._running:
+            try:
+                data, address = sock.recvfrom(MAX_DATAGRAM)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            ack = self.receive(data)
+            if ack is None:
+                continue
+            try:
+                sock.sendto(ack, address)
+            except OSError as e:
+                print(f"Gateway ack error: {e}")
+
+    def _http_handler(self):
+        collector = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # 노드가 연결을 재사용하고, 헤더/본문을 따로 쓸 때 Nagle 지연이 없도록
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def do_POST(self):
+                if self.path.split("?", 1)[0] != "/ingest":
+                    self.send_error(404)
+                    return
+                length = int(self.headers.get("Content-Length") or 0)
+                try:
+                    frame = decode_frame(self.rfile.read(length), collector.key)
+                except FrameError as e:
+                    collector._count_invalid()
+                    self.send_error(400, str(e))
+                    return
+                status = collector.accept(frame)
+                if status is None:
+                    # 큐가 가득 참: 노드가 나중에 다시 보낸다
+                    self.send_error(503)
+                    return
+                body = encode_ack(frame.epoch, frame.seq, status, collector.key)
+                self.send_response(200)
+                self.send_header("Content-Type", "application/octet-stream")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def _take_batch(self, timeout):
+        """큐에서 batch_size 행이 될 때까지 프레임을 모은다 -> (행 목록, 프레임 수)"""
+        rows = []
+        try:
+            frame = self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return rows, 0
+        frames = 1
+        while True:
+            if self.prefix_node:
+                node = frame.node_id
+                rows.extend((ts, f"{node}/{pot_id}", sensor, value) for ts, pot_id, sensor, value in frame.rows)
+            else:
+                rows.extend(frame.rows)
+            if len(rows) >= self.batch_size:
+                return rows, frames
+            try:
+                frame = self._queue.get_nowait()
+            except queue.Empty:
+                return rows, frames
+            frames += 1
+
+    def _write(self, rows):
+        """노드는 이미 ACK를 받았으므로 저장될 때까지 다시 시도한다.
+        종료 중에는 close_attempts번까지만 해 보고 spool 파일에 남긴다"""
+        delay = 0.5
+        attempt = 0
+        while True:
+            try:
+                count = self.plant_db.insert_readings(rows)
+                self.written += count
+                GATEWAY_ROWS_WRITTEN.inc(count)
+                return True
+            except Exception as e:
+                attempt += 1
+                if attempt == 1 or attempt % 10 == 0:
+                    print(f"Gateway write error (attempt {attempt}): {e}")
+                if self._stopping.is_set() and attempt >= self.close_attempts:
+                    self._spool(rows)
+                    return False
+                # 종료 요청이 오면 바로 깨어나 남은 시도를 한다
+                self._stopping.wait(delay)
+                delay = min(self.max_retry_delay, delay * 2)
+
+    def _spool(self, rows):
+        if self.spool_path is not None:
+            try:
+                with open(self.spool_path, "a", encoding="utf-8") as f:
+                    for row in rows:
+                        f.write(json.dumps(row, ensure_ascii=False) + "\n")
+                self.spooled += len(rows)
+                print(f"Gateway: {len(rows)} readings saved to {self.spool_path}")
+                return
+            except OSError as e:
+                print(f"Gateway spool error: {e}")
+        self.dropped += len(rows)
+        GATEWAY_ROWS_DROPPED.inc(len(rows))
+        print(f"Gateway: {len(rows)} acknowledged readings dropped")
+
+    def _replay_spool(self):
+        """지난번 종료 때 저장하지 못한 행을 먼저 저장한다"""
+        if self.spool_path is None or not os.path.exists(self.spool_path):
+            return
+        try:
+            with open(self.spool_path, encoding="utf-8") as f:
+                rows = [tuple(json.loads(line)) for line in f if line.strip()]
+            os.remove(self.spool_path)
+        except (OSError, ValueError) as e:
+            print(f"Gateway spool error: {e}")
+            return
+        for start in range(0, len(rows), self.batch_size):
+            self._write(rows[start:start + self.batch_size])
+        if rows:
+            print(f"Gateway: replayed {len(rows)} spooled readings")
+
+    def _write_loop(self):
+        self._replay_spool()
+        while self._running or not self._queue.empty():
+            rows, frames = self._take_batch(min(self.flush_interval, 0.1))
+            if rows:
+                self._write(rows)
+            for _ in range(frames):
+                self._queue.task_done()
+
+    @property
+    def pending(self):
+        return self._queue.qsize()
+
+    def stats(self):
+        with self._windows_lock:
+            received = {
+                "frames": self.frames,
+                "duplicates": self.duplicates,
+                "rejected": self.rejected,
+                "invalid": self.invalid,
+            }
+        return {
+            **received,
+            "written": self.written,
+            "dropped": self.dropped,
+            "spooled": self.spooled,
+            "pending": self.pending,
+        }
+
+    def wait_idle(self, timeout=10.0):
+        """받은 프레임이 모두 저장될 때까지 기다린다 (테스트/벤치마크용)"""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return not self._queue.unfinished_tasks
+
+    def close(self):
+        """수신을 멈추고 큐에 남은 프레임을 모두 저장한 뒤 끝낸다"""
+        if not self._running:
+            return
+        if self._http is not None:
+            self._http.shutdown()
+            self._http.server_close()
+        self._running = False
+        self._stopping.set()
+        for thread in self._threads:
+            thread.join(timeout=10)
+        if self._udp is not None:
+            self._udp.close()
+        self._threads = []
+
+def create_collector(plant_db, url, **kwargs):
+    """udp://host:port 또는 http://host:port 로 받는 수집기"""
+    parts = urlsplit(url)
+    host = parts.hostname or "127.0.0.1"
+    if parts.scheme == "udp":
+        return IngestCollector(plant_db, host=host, udp_port=parts.port or 9110, **kwargs)
+    if parts.scheme == "http":
+        return IngestCollector(plant_db, host=host, udp_port=None, http_port=parts.port or 9111, **kwargs)
+    raise ValueError(f"Unsupported gateway url: {url}")
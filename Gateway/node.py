@@ -0,0 +1,288 @@
+import collections
+import http.client
+import os
+import select
+import socket
+import threading
+import time
+from urllib.parse import urlsplit
+
+from .protocol import decode_ack, encode_frame
+
+class UdpTransport:
+    """ACK는 같은 소켓으로 따로 돌아온다"""
+
+    synchronous = False
+
+    def __init__(self, host, port, key=None):
+        self.key = key
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        # connect 해 두면 수집기가 꺼져 있을 때 ICMP 거부가 ConnectionRefusedError로 올라온다
+        self._sock.connect((host, port))
+        self._sock.setblocking(False)
+
+    def send(self, data):
+        self._sock.send(data)
+        return None
+
+    def acks(self, timeout):
+        ready, _, _ = select.select([self._sock], [], [], max(0.0, timeout))
+        acks = []
+        if not ready:
+            return acks
+        while True:
+            try:
+                ack = decode_ack(self._sock.recv(64), self.key)
+            except (BlockingIOError, ConnectionRefusedError):
+                return acks
+            if ack is not None:
+                acks.append(ack)
+
+    def close(self):
+        self._sock.close()
+
+class HttpTransport:
+    """POST /ingest 응답 본문이 ACK. 연결은 재사용한다"""
+
+    synchronous = True
+
+    def __init__(self, host, port, path="/ingest", timeout=5.0, key=None):
+        self.host = host
+        self.port = port
+        self.path = path
+        self.timeout = timeout
+        self.key = key
+        self._conn = None
+
+    def send(self, data):
+        """ACK (epoch, seq, status). 수집기가 바빠 거절하면(503) None"""
+        if self._conn is None:
+            self._conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        try:
+            self._conn.request(
+                "POST", self.path, body=data, headers={"Content-Type": "application/octet-stream"}
+            )
+            response = self._conn.getresponse()
+            body = response.read()
+        except (OSError, http.client.HTTPException) as e:
+            self.close()
+            raise OSError(f"Gateway request failed: {e}")
+        if response.status != 200:
+            return None
+        return decode_ack(body, self.key)
+
+    def acks(self, timeout):
+        return []
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+def create_transport(url, key=None):
+    """udp://host:port 또는 http://host:port[/ingest]"""
+    parts = urlsplit(url)
+    if parts.scheme == "udp":
+        return UdpTransport(parts.hostname, parts.port or 9110, key=key)
+    if parts.scheme == "http":
+        return HttpTransport(parts.hostname, parts.port or 80, parts.path or "/ingest", key=key)
+    raise ValueError(f"Unsupported gateway url: {url}")
+
+class _PendingFrame:
+    __slots__ = ("data", "rows", "sent_at")
+
+    def __init__(self, data, rows):
+        self.data = data
+        self.rows = rows
+        self.sent_at = None
+
+class NodeForwarder:
+    """측정값을 묶어 순번을 붙인 프레임으로 수집 게이트웨이에 보낸다.
+
+    ReadingWriter와 같은 add/add_many/close를 제공하므로 SensorManager에 그대로 넘길 수 있다.
+    ACK를 받을 때까지 프레임을 메모리에 들고 있다가 다시 보내며, 수집기가 응답하지 않으면
+    재전송 간격을 max_backoff까지 늘리고 가장 오래된 프레임 하나로만 살아났는지 확인한다.
+    local_writer가 있으면 같은 값을 노드의 DB에도 저장한다. key는 수집기와 같은 공유 키.
+    """
+
+    def __init__(self, url, node_id=None, batch_size=200, flush_interval=2.0, window=16,
+                 ack_timeout=1.0, max_backoff=30.0, max_pending=5000, local_writer=None,
+                 transport=None, key=None):
+        self.url = url
+        self.node_id = node_id or socket.gethostname()
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.window = window
+        self.ack_timeout = ack_timeout
+        self.max_backoff = max_backoff
+        # ACK를 기다리는 프레임 수 상한. 넘치면 가장 오래된 프레임을 버린다
+        self.max_pending = max_pending
+        self.local_writer = local_writer
+        self._transport = transport
+        self.key = key
+        # 재시작하면 seq가 0부터 다시 시작하므로 epoch로 구분한다
+        self.epoch = int.from_bytes(os.urandom(4), "big")
+        self._seq = 0
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._pending = collections.OrderedDict()  # seq -> _PendingFrame
+        self._wakeup = threading.Event()
+        self._running = False
+        self._thread = None
+        self._last_cut = time.monotonic()
+        self._backoff = 0.0
+        self._retry_at = 0.0
+        self._dropped = 0
+        self.written = 0
+        self.retransmits = 0
+
+    def start(self):
+        if self._running:
+            return self
+        if self._transport is None:
+            self._transport = create_transport(self.url, key=self.key)
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="NodeForwarder", daemon=True)
+        self._thread.start()
+        return self
+
+    def add(self, pot_id, sensor, value, ts=None):
+        ts = time.time() if ts is None else ts
+        if self.local_writer is not None:
+            self.local_writer.add(pot_id, sensor, value, ts)
+        with self._lock:
+            self._buffer.append((ts, pot_id, sensor, float(value)))
+            size = len(self._buffer)
+        if size >= self.batch_size:
+            self._wakeup.set()
+
+    def add_many(self, pot_id, data, ts=None):
+        ts = time.time() if ts is None else ts
+        for sensor, value in data.items():
+            if value is not None:
+                self.add(pot_id, sensor, value, ts)
+
+    def _cut_frames(self, force=False):
+        """버퍼를 batch_size 행씩 프레임으로 만든다. force면 남은 행도"""
+        now = time.monotonic()
+        if not force and now - self._last_cut >= self.flush_interval:
+            force = True
+        with self._lock:
+            if not self._buffer or (len(self._buffer) < self.batch_size and not force):
+                return
+            rows, self._buffer = self._buffer, []
+        self._last_cut = now
+        for start in range(0, len(rows), self.batch_size):
+            chunk = rows[start:start + self.batch_size]
+            self._seq += 1
+            self._pending[self._seq] = _PendingFrame(
+                encode_frame(self.node_id, self.epoch, self._seq, chunk, key=self.key), len(chunk)
+            )
+        while len(self._pending) > self.max_pending:
+            _, frame = self._pending.popitem(last=False)
+            self._dropped += frame.rows
+
+    def _fail(self, now):
+        # 수집기 장애로 보고 재전송 간격을 늘린다
+        self._backoff = min(self.max_backoff, max(self.ack_timeout, self._backoff * 2))
+        self._retry_at = now + self._backoff
+
+    def _acked(self, epoch, seq):
+        if epoch != self.epoch:
+            return
+        frame = self._pending.pop(seq, None)
+        if frame is not None:
+            self.written += frame.rows
+        self._backoff = 0.0
+        self._retry_at = 0.0
+
+    def _send_due(self):
+        now = time.monotonic()
+        if now < self._retry_at:
+            return
+        # 장애 중에는 가장 오래된 프레임 하나로만 확인한다
+        limit = 1 if self._backoff else self.window
+        in_flight = 0
+        for seq, frame in list(self._pending.items()):
+            if frame.sent_at is not None and now - frame.sent_at < self.ack_timeout:
+                in_flight += 1
+                continue
+            if in_flight >= limit:
+                return
+            if frame.sent_at is not None:
+                self.retransmits += 1
+                if not self._backoff or now >= self._retry_at:
+                    self._fail(now)
+                    limit = 1
+            try:
+                ack = self._transport.send(frame.data)
+            except OSError as e:
+                if not self._backoff:
+                    print(f"Gateway unreachable: {e}")
+                self._fail(now)
+                return
+            frame.sent_at = now
+            in_flight += 1
+            if self._transport.synchronous:
+                if ack is None:
+                    self._fail(now)  # 수집기 큐가 가득 참
+                    return
+                self._acked(ack[0], ack[1])
+                in_flight -= 1
+
+    def _wait(self):
+        timeout = self.flush_interval
+        if self._pending:
+            timeout = min(timeout, self.ack_timeout / 4)
+            if self._retry_at:
+                timeout = min(timeout, max(0.0, self._retry_at - time.monotonic()))
+        if self._transport.synchronous:
+            self._wakeup.wait(timeout)
+            self._wakeup.clear()
+            return
+        try:
+            acks = self._transport.acks(timeout)
+        except OSError as e:
+            print(f"Gateway ack error: {e}")
+            acks = []
+        for epoch, seq, _ in acks:
+            self._acked(epoch, seq)
+
+    def _run(self):
+        while self._running:
+            self._cut_frames()
+            self._send_due()
+            self._wait()
+
+    def flush(self, timeout=5.0):
+        """버퍼와 ACK 대기 중인 프레임을 timeout 안에서 최대한 보낸다. 다 보냈으면 True"""
+        deadline = time.monotonic() + timeout
+        self._cut_frames(force=True)
+        self._retry_at = 0.0
+        while self._pending and time.monotonic() < deadline:
+            self._send_due()
+            self._wait()
+        return not self._pending
+
+    @property
+    def pending_rows(self):
+        with self._lock:
+            buffered = len(self._buffer)
+        return buffered + sum(frame.rows for frame in list(self._pending.values()))
+
+    @property
+    def dropped(self):
+        return self._dropped
+
+    def close(self, timeout=5.0):
+        if self._running:
+            self._running = False
+            self._wakeup.set()
+            if self._thread and self._thread.is_alive():
+                self._thread.join(timeout=5)
+            self._thread = None
+            if not self.flush(timeout):
+                print(f"Gateway: {self.pending_rows} readings not delivered")
+            self._transport.close()
+        if self.local_writer is not None:
+            self.local_writer.close()
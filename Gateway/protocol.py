@@ -0,0 +1,137 @@
+import hashlib
+import hmac
+import struct
+import zlib
+
+# 측정 프레임 (빅엔디언)
+#   헤더   magic "PF", version, epoch(u32), seq(u64), base_ts(f64), 이름 수(u8), 행 수(u16)
+#   이름   길이(u8) + UTF-8. 0번은 노드 id, 나머지는 행에서 번호로 가리키는 화분/센서 이름
+#   행     base_ts로부터의 초(f32), 화분 이름 번호(u8), 센서 이름 번호(u8), 값(f32) = 10바이트
+#   끝     앞부분 전체의 CRC32
+# 응답(ACK)  magic "PA", version, status, epoch(u32), seq(u64)
+# 공유 키가 있으면 프레임/ACK 뒤에 HMAC-SHA256 앞 16바이트를 붙인다
+FRAME_MAGIC = b"PF"
+ACK_MAGIC = b"PA"
+VERSION = 1
+
+ACK_OK = 0         # 받아서 쓰기 대기열에 넣음
+ACK_DUPLICATE = 1  # 이미 받은 프레임. 다시 보낼 필요 없음
+
+MAX_ROWS = 65535
+MAX_NAMES = 255
+
+_HEADER = struct.Struct("!2sBIQdBH")
+_ROW = struct.Struct("!fBBf")
+_CRC = struct.Struct("!I")
+_ACK = struct.Struct("!2sBBIQ")
+AUTH_SIZE = 16
+
+class FrameError(ValueError):
+    pass
+
+class Frame:
+    """노드 하나가 보낸 측정값 묶음. (node_id, epoch, seq)가 프레임을 식별한다"""
+
+    __slots__ = ("node_id", "epoch", "seq", "rows")
+
+    def __init__(self, node_id, epoch, seq, rows):
+        self.node_id = node_id
+        self.epoch = epoch
+        self.seq = seq
+        self.rows = rows  # [(ts, pot_id, sensor, value)]
+
+    def __repr__(self):
+        return f"Frame({self.node_id!r}, {self.epoch}, {self.seq}, rows={len(self.rows)})"
+
+def _key_bytes(key):
+    return key.encode("utf-8") if isinstance(key, str) else key
+
+def sign(data, key):
+    if not key:
+        return data
+    return data + hmac.new(_key_bytes(key), data, hashlib.sha256).digest()[:AUTH_SIZE]
+
+def verify(data, key):
+    """서명을 확인하고 떼어 낸 본문. 키가 없으면 그대로"""
+    if not key:
+        return data
+    if len(data) < AUTH_SIZE:
+        raise FrameError("Unsigned frame")
+    body, tag = data[:-AUTH_SIZE], data[-AUTH_SIZE:]
+    expected = hmac.new(_key_bytes(key), body, hashlib.sha256).digest()[:AUTH_SIZE]
+    if not hmac.compare_digest(bytes(tag), expected):
+        raise FrameError("Frame signature mismatch")
+    return body
+
+def encode_frame(node_id, epoch, seq, rows, key=None):
+    """rows: [(ts, pot_id, sensor, value)] -> bytes"""
+    if len(rows) > MAX_ROWS:
+        raise FrameError(f"Too many rows in one frame: {len(rows)}")
+    names = {node_id: 0}
+    base_ts = min(row[0] for row in rows) if rows else 0.0
+    body = bytearray()
+    for ts, pot_id, sensor, value in rows:
+        pot_index = names.setdefault(pot_id, len(names))
+        sensor_index = names.setdefault(sensor, len(names))
+        body += _ROW.pack(ts - base_ts, pot_index, sensor_index, value)
+    if len(names) > MAX_NAMES:
+        raise FrameError(f"Too many distinct names in one frame: {len(names)}")
+
+    out = bytearray(_HEADER.pack(FRAME_MAGIC, VERSION, epoch, seq, base_ts, len(names), len(rows)))
+    for name in names:  # dict는 넣은 순서를 지킨다
+        encoded = name.encode("utf-8")
+        if len(encoded) > 255:
+            raise FrameError(f"Name too long: {name!r}")
+        out.append(len(encoded))
+        out += encoded
+    out += body
+    out += _CRC.pack(zlib.crc32(out))
+    return sign(bytes(out), key)
+
+def decode_frame(data, key=None):
+    data = verify(data, key)
+    if len(data) < _HEADER.size + _CRC.size:
+        raise FrameError("Frame too short")
+    (crc,) = _CRC.unpack_from(data, len(data) - _CRC.size)
+    if zlib.crc32(memoryview(data)[:-_CRC.size]) != crc:
+        raise FrameError("Frame checksum mismatch")
+    magic, version, epoch, seq, base_ts, name_count, row_count = _HEADER.unpack_from(data, 0)
+    if magic != FRAME_MAGIC or version != VERSION:
+        raise FrameError("Unknown frame format")
+
+    offset = _HEADER.size
+    names = []
+    try:
+        for _ in range(name_count):
+            length = data[offset]
+            names.append(bytes(data[offset + 1:offset + 1 + length]).decode("utf-8"))
+            offset += 1 + length
+        if offset + row_count * _ROW.size + _CRC.size != len(data):
+            raise FrameError("Frame length mismatch")
+        rows = [
+            (base_ts + dt, names[pot_index], names[sensor_index], value)
+            for dt, pot_index, sensor_index, value in _ROW.iter_unpack(
+                memoryview(data)[offset:offset + row_count * _ROW.size]
+            )
+        ]
+    except (IndexError, UnicodeDecodeError) as e:
+        raise FrameError(f"Malformed frame: {e}")
+    if not names:
+        raise FrameError("Frame without node id")
+    return Frame(names[0], epoch, seq, rows)
+
+def encode_ack(epoch, seq, status=ACK_OK, key=None):
+    return sign(_ACK.pack(ACK_MAGIC, VERSION, status, epoch, seq), key)
+
+def decode_ack(data, key=None):
+    """-> (epoch, seq, status). 형식이나 서명이 맞지 않으면 None"""
+    try:
+        data = verify(data, key)
+    except FrameError:
+        return None
+    if len(data) != _ACK.size:
+        return None
+    magic, version, status, epoch, seq = _ACK.unpack(data)
+    if magic != ACK_MAGIC or version != VERSION:
+        return None
+    return epoch, seq, status
@@ -0,0 +1,2 @@
+from .registry import registry, Registry, Counter, Histogram, DEFAULT_BUCKETS
+from .server import MetricsServer
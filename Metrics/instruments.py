@@ -0,0 +1,58 @@
+from .registry import registry
+
+# 센서
+SENSOR_READ_SECONDS = registry.histogram(
+    "plant_sensor_read_seconds", "Time spent in one sensor driver read", ["driver"]
+)
+SENSOR_READ_FAILURES = registry.counter(
+    "plant_sensor_read_failures_total", "Sensor reads that returned no value", ["driver", "reason"]
+)
+SENSOR_RETRIES = registry.counter(
+    "plant_sensor_retries_total", "Transient sensor errors that will be retried", ["driver"]
+)
+SENSOR_REINITS = registry.counter(
+    "plant_sensor_reinit_total", "Sensor driver re-initializations", ["driver"]
+)
+
+# 모니터링 / DB
+MONITOR_CYCLE_SECONDS = registry.histogram(
+    "plant_monitor_cycle_seconds", "Duration of one monitoring cycle (sampling window, evaluation and alert checks)",
+    buckets=(1.0, 5.0, 10.0, 30.0, 60.0, 120.0, 180.0, 300.0)
+)
+COMPARE_SECONDS = registry.histogram(
+    "plant_compare_sensor_seconds", "Threshold comparison for a batch of pots"
+)
+DB_WRITE_SECONDS = registry.histogram(
+    "plant_db_write_seconds", "SQLite transaction writing a batch of readings and rollups"
+)
+
+# 음성 / LLM
+OPENAI_SECONDS = registry.histogram(
+    "plant_openai_request_seconds", "OpenAI chat completion latency", ["channel", "mode"]
+)
+RESPONSE_CACHE_LOOKUPS = registry.counter(
+    "plant_response_cache_lookups_total", "Monitor answer cache lookups", ["result"]
+)
+TRANSCRIBE_SECONDS = registry.histogram(
+    "plant_transcribe_seconds", "Whisper transcription of one utterance", ["backend"]
+)
+TTS_SYNTHESIS_SECONDS = registry.histogram(
+    "plant_tts_synthesis_seconds", "gTTS synthesis of one text"
+)
+TTS_CACHE_LOOKUPS = registry.counter(
+    "plant_tts_cache_lookups_total", "Synthesized audio cache lookups", ["result"]
+)
+PLAYBACK_SECONDS = registry.histogram(
+    "plant_audio_playback_seconds", "Audio playback of one clip", ["priority"]
+)
+
+# 수집 게이트웨이
+GATEWAY_FRAMES = registry.counter(
+    "plant_gateway_frames_total", "Reading frames received by the ingest collector", ["result"]
+)
+GATEWAY_ROWS_WRITTEN = registry.counter(
+    "plant_gateway_rows_written_total", "Readings written by the ingest collector"
+)
+GATEWAY_ROWS_DROPPED = registry.counter(
+    "plant_gateway_rows_dropped_total", "Acknowledged readings the ingest collector could not store"
+)
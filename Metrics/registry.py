@@ -0,0 +1,212 @@
+import bisect
+import math
+import threading
+import time
+
+# 초 단위 지연 시간 버킷 (센서 읽기 ~ms, LLM/음성 인식 ~수 초)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+class _NullTimer:
+    """비활성화 상태에서 쓰는 아무것도 하지 않는 타이머"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+_NULL_TIMER = _NullTimer()
+
+class _Timer:
+    __slots__ = ("_child", "_start")
+
+    def __init__(self, child):
+        self._child = child
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._child.observe(time.perf_counter() - self._start)
+        return False
+
+class _CounterChild:
+    __slots__ = ("_registry", "_lock", "value")
+
+    def __init__(self, registry):
+        self._registry = registry
+        self._lock = threading.Lock()
+        self.value = 0.0
+
+    def inc(self, amount=1):
+        if not self._registry.enabled:
+            return
+        with self._lock:
+            self.value += amount
+
+class _HistogramChild:
+    __slots__ = ("_registry", "_lock", "_bounds", "counts", "sum", "count")
+
+    def __init__(self, registry, bounds):
+        self._registry = registry
+        self._lock = threading.Lock()
+        self._bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # 마지막 칸은 +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        if not self._registry.enabled:
+            return
+        index = bisect.bisect_left(self._bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def time(self):
+        """with 블록의 실행 시간을 기록. 비활성화 상태면 공용 no-op 객체"""
+        if not self._registry.enabled:
+            return _NULL_TIMER
+        return _Timer(self)
+
+class _Metric:
+    kind = None
+
+    def __init__(self, registry, name, documentation, labelnames):
+        self._registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._unlabelled = self._child_for(())
+
+    def labels(self, *values):
+        child = self._children.get(values)
+        if child is None:
+            child = self._child_for(tuple(str(value) for value in values))
+        return child
+
+    def _child_for(self, key):
+        with self._lock:
+            child = self._children.get(key)
+            if child is None:
+                child = self._new_child()
+                self._children[key] = child
+            return child
+
+    def _label_text(self, key, extra=None):
+        pairs = list(zip(self.labelnames, key))
+        if extra:
+            pairs.append(extra)
+        if not pairs:
+            return ""
+        body = ",".join(f'{name}="{_escape(value)}"' for name, value in pairs)
+        return "{" + body + "}"
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            children = list(self._children.items())
+        for key, child in children:
+            lines.extend(self._render_child(key, child))
+        return lines
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild(self._registry)
+
+    def inc(self, amount=1):
+        self._unlabelled.inc(amount)
+
+    def _render_child(self, key, child):
+        return [f"{self.name}{self._label_text(key)} {_format(child.value)}"]
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, registry, name, documentation, labelnames, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(registry, name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self._registry, self.buckets)
+
+    def observe(self, value):
+        self._unlabelled.observe(value)
+
+    def time(self):
+        return self._unlabelled.time()
+
+    def _render_child(self, key, child):
+        with child._lock:
+            counts = list(child.counts)
+            total, count = child.sum, child.count
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+            cumulative += bucket_count
+            le = "+Inf" if bound == math.inf else _format(bound)
+            lines.append(f"{self.name}_bucket{self._label_text(key, ('le', le))} {cumulative}")
+        lines.append(f"{self.name}_sum{self._label_text(key)} {_format(total)}")
+        lines.append(f"{self.name}_count{self._label_text(key)} {count}")
+        return lines
+
+class Registry:
+    """측정 지표 모음. 기본은 비활성화: 이때 observe/inc/time은 플래그 확인만 하고 돌아간다"""
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def _get_or_create(self, cls, name, documentation, labelnames, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = cls(self, name, documentation, labelnames, **kwargs)
+                self._metrics[name] = metric
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {name} already registered as {metric.kind}")
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def render(self):
+        """Prometheus 텍스트 형식 (version 0.0.4)"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format(value):
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value)) if abs(value) < 1e15 else repr(float(value))
+    return repr(float(value))
+
+# 프로세스 전체에서 쓰는 기본 레지스트리
+registry = Registry()
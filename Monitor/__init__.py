@@ -1 +1,4 @@
-from .plant_monitor import PlantMonitor
\ No newline at end of file
+from .plant_monitor import PlantMonitor
+from .pot import Pot
+from .scheduler import SamplingScheduler
+from .alerts import AlertTracker, AlertEvent
@@ -0,0 +1,159 @@
+import math
+
+OK = "within_range"
+BELOW = "below_minimum"
+ABOVE = "above_maximum"
+NO_DATA = "no_data"
+
+# 이벤트 종류
+RAISED = "raised"      # 새로 범위를 벗어남 (또는 반대쪽으로 넘어감)
+REMINDER = "reminder"  # 같은 경보가 계속됨. 간격은 점점 늘어난다
+CLEARED = "cleared"    # 알렸던 경보가 회복됨
+
+class AlertEvent:
+    __slots__ = ("pot_id", "sensor", "kind", "state", "value")
+
+    def __init__(self, pot_id, sensor, kind, state, value):
+        self.pot_id = pot_id
+        self.sensor = sensor
+        self.kind = kind
+        self.state = state
+        self.value = value
+
+    def __repr__(self):
+        return f"AlertEvent({self.pot_id!r}, {self.sensor!r}, {self.kind!r}, {self.state!r}, {self.value!r})"
+
+class SensorAlert:
+    """화분 하나, 센서 하나의 경보 상태"""
+
+    __slots__ = ("state", "pending", "pending_since", "announced", "last_notified",
+                 "notify_at", "reminder_interval")
+
+    def __init__(self):
+        self.state = OK
+        self.pending = None
+        self.pending_since = None
+        self.announced = False
+        self.last_notified = None
+        self.notify_at = None
+        self.reminder_interval = None
+
+class AlertTracker:
+    """화분/센서별 경보 상태 기계. 실제 상태 전이가 있을 때만 이벤트를 낸다.
+
+    - 히스테리시스: 경보는 임계값을 넘으면 들어가지만, 범위 폭의 hysteresis 비율만큼
+      안쪽으로 돌아와야 풀린다. 임계값 근처에서 흔들리는 값이 매 주기 상태를 뒤집지 않는다.
+    - 최소 유지 시간: 새 상태가 raise_dwell / clear_dwell 초 이상 이어져야 확정한다.
+    - 쿨다운: 같은 센서는 cooldown 초 안에 다시 알리지 않고, 쿨다운이 끝날 때 알린다.
+    - 반복 알림: 경보가 계속되면 reminder_interval 뒤 다시 알리고, 간격을
+      reminder_backoff배씩 max_reminder_interval까지 늘린다.
+    """
+
+    def __init__(self, hysteresis=0.1, raise_dwell=60.0, clear_dwell=180.0, cooldown=1800.0,
+                 reminder_interval=1800.0, reminder_backoff=2.0, max_reminder_interval=4 * 3600.0):
+        self.hysteresis = hysteresis
+        self.raise_dwell = raise_dwell
+        self.clear_dwell = clear_dwell
+        self.cooldown = cooldown
+        self.reminder_interval = reminder_interval
+        self.reminder_backoff = reminder_backoff
+        self.max_reminder_interval = max_reminder_interval
+        self._alerts = {}  # pot_id -> {sensor: SensorAlert}
+
+    def reset(self, pot_id=None):
+        """식물이 바뀌면 이전 식물 기준의 상태를 버린다"""
+        if pot_id is None:
+            self._alerts.clear()
+        else:
+            self._alerts.pop(pot_id, None)
+
+    def candidate(self, current, value, status, bounds):
+        """히스테리시스를 적용한 이번 측정의 상태. 판단할 수 없으면 None (현재 상태 유지)"""
+        if status == NO_DATA or value is None:
+            return None
+        if not bounds:
+            return status
+        low, high = bounds
+        band = high - low
+        if math.isnan(band) or band <= 0:
+            return status
+        margin = self.hysteresis * band
+        if current == BELOW and value < low + margin:
+            return BELOW
+        if current == ABOVE and value > high - margin:
+            return ABOVE
+        return status
+
+    def update(self, pot_id, sensor_data, comparisons, bounds, now):
+        """한 화분의 이번 평가 결과를 반영하고 이벤트 목록을 돌려준다.
+
+        comparisons는 compare_sensor_batch의 원래 판정, bounds는 {sensor: (min, max)} 또는 None.
+        now는 단조 증가하는 초 단위 시각.
+        """
+        alerts = self._alerts.setdefault(pot_id, {})
+        events = []
+        for sensor, status in comparisons.items():
+            alert = alerts.get(sensor)
+            if alert is None:
+                alert = alerts[sensor] = SensorAlert()
+            value = sensor_data.get(sensor)
+            state = self.candidate(alert.state, value, status, (bounds or {}).get(sensor))
+
+            if state is not None and state != alert.state:
+                if alert.pending != state:
+                    alert.pending, alert.pending_since = state, now
+                dwell = self.clear_dwell if state == OK else self.raise_dwell
+                if now - alert.pending_since >= dwell:
+                    event = self._commit(pot_id, sensor, alert, state, value, now)
+                    if event:
+                        events.append(event)
+            elif state is not None:
+                alert.pending = None
+
+            # 회복 중(pending)이면 반복 알림을 미룬다
+            if (alert.state != OK and alert.pending is None
+                    and alert.notify_at is not None and now >= alert.notify_at):
+                events.append(self._notify(pot_id, sensor, alert, value, now))
+        return events
+
+    def _commit(self, pot_id, sensor, alert, state, value, now):
+        alert.state = state
+        alert.pending = None
+        if state == OK:
+            announced = alert.announced
+            alert.announced = False
+            alert.notify_at = None
+            # 알리지 않은 경보가 조용히 풀렸으면 회복도 알리지 않는다
+            return AlertEvent(pot_id, sensor, CLEARED, state, value) if announced else None
+
+        alert.announced = False
+        alert.reminder_interval = self.reminder_interval
+        alert.notify_at = now
+        if alert.last_notified is not None:
+            alert.notify_at = max(now, alert.last_notified + self.cooldown)
+        return None
+
+    def _notify(self, pot_id, sensor, alert, value, now):
+        kind = REMINDER if alert.announced else RAISED
+        if alert.announced:
+            alert.reminder_interval = min(
+                self.max_reminder_interval, alert.reminder_interval * self.reminder_backoff
+            )
+        alert.announced = True
+        alert.last_notified = now
+        alert.notify_at = now + alert.reminder_interval
+        return AlertEvent(pot_id, sensor, kind, alert.state, value)
+
+    def states(self, pot_id, comparisons=None):
+        """확정된 상태로 만든 비교 결과 (프롬프트/응답 캐시 키용). 측정이 없던 센서는 원래 판정"""
+        alerts = self._alerts.get(pot_id, {})
+        result = dict(comparisons or {})
+        for sensor, alert in alerts.items():
+            if result.get(sensor) != NO_DATA:
+                result[sensor] = alert.state
+        return result
+
+    def active(self, pot_id):
+        """확정된 경보 {sensor: 상태}"""
+        return {sensor: alert.state for sensor, alert in self._alerts.get(pot_id, {}).items()
+                if alert.state != OK}
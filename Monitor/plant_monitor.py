@@ -1,19 +1,181 @@
+import re
 import time
 import asyncio
-from typing import Dict, Optional
+from typing import Dict, List, Optional
+from Metrics.instruments import MONITOR_CYCLE_SECONDS
+from Sensor.clock import RealClock
+from .alerts import AlertTracker, CLEARED
+from .pot import Pot
+from .scheduler import SamplingScheduler
+
+DEFAULT_PLANT = "스킨답서스"
+
+# "몬스테라로 바꿔줘", "2번 화분 산세베리아로 변경" 같은 식물 변경 요청.
+# 이름은 "(으)로" 바로 앞의 한두 어절이고, 동사가 곧바로 뒤따라야 한다
+CHANGE_PLANT_PATTERN = re.compile(
+    r"(?P<name>(?:\S+\s+)?\S+?)(?:으로|로)\s*(?:바꿔|바꾸|바꿨|변경|교체|심었)"
+)
+POT_NUMBER_PATTERN = re.compile(r"(\d+)\s*번\s*화분")
+CONFIRM_PATTERN = re.compile(r"^\W*(응|어|네|예|그래|맞아|좋아)")
+CANCEL_PATTERN = re.compile(r"아니|취소|됐어|하지\s*마")
+# 이름이 정확히 맞지 않을 때 되묻고 대답을 기다리는 시간(초)
+CONFIRM_SECONDS = 30
+
+def with_ro(word: str) -> str:
+    """받침이 있으면 '으로', 없거나 ㄹ 받침이면 '로'"""
+    last = word[-1] if word else ""
+    if "가" <= last <= "힣":
+        final = (ord(last) - ord("가")) % 28
+        if final and final != 8:  # 8 = ㄹ
+            return f"{word}으로"
+    return f"{word}로"
 
 class PlantMonitor:
-    def __init__(self, sensor_manager, plant_db, chatbot):
-        self.sensor_manager = sensor_manager
+    def __init__(self, pots: List[Pot], plant_db, chatbot, sample_interval=10, samples_per_cycle=12, clock=None,
+                 rates=None, adaptive=True, min_interval=None, max_interval=None, alerts=None):
+        self.pots = {pot.pot_id: pot for pot in pots}
         self.plant_db = plant_db
         self.chatbot = chatbot
-        self.current_plant = "스킨답서스"  # Default plant
+        self.sample_interval = sample_interval
+        self.samples_per_cycle = samples_per_cycle
+        # 시뮬레이션 백엔드는 가속된 시계를 넘겨준다
+        self.clock = clock
         self._monitoring_active = True
+        # 채널별 주기로 읽는 스케줄러. rates로 채널별 기본 간격, adaptive로 간격 자동 조절
+        self.scheduler = SamplingScheduler(
+            clock or RealClock(), base_interval=sample_interval, rates=rates, adaptive=adaptive,
+            min_interval=min_interval, max_interval=max_interval,
+            thresholds=getattr(plant_db, "thresholds", None)
+        )
+        self._window_deadline = None
+        # 실제 상태 전이 때만 LLM/TTS를 부르도록 화분/센서별 경보 상태를 추적
+        self.alerts = alerts or AlertTracker()
+        # 확인을 기다리는 식물 변경 (식물 이름, 화분 id, 만료 시각)
+        self._pending_change = None
+
+    @property
+    def cycle_seconds(self) -> float:
+        """평가 한 번의 시간 창 (기본 10초 x 12 = 2분)"""
+        return self.sample_interval * self.samples_per_cycle
+
+    @property
+    def current_plant(self) -> str:
+        # 단일 화분 구성과의 호환을 위해 첫 번째 화분의 식물을 반환
+        pot = self.default_pot
+        return pot.plant_name if pot else DEFAULT_PLANT
+
+    @property
+    def default_pot(self) -> Optional[Pot]:
+        return next(iter(self.pots.values()), None)
+
+    def add_pot(self, pot: Pot):
+        self.pots[pot.pot_id] = pot
 
-    def set_plant(self, plant_name: str):
-        self.current_plant = plant_name
+    def set_plant(self, plant_name: str, pot_id=None):
+        pot = self.pots.get(pot_id) if pot_id is not None else self.default_pot
+        if pot is None:
+            print(f"Unknown pot: {pot_id}")
+            return False
+        # 별칭이나 띄어쓰기가 다른 이름도 카탈로그의 이름으로 저장 (임계값을 찾을 수 있도록)
+        catalog = getattr(self.plant_db, "catalog", None)
+        if catalog is not None:
+            plant_name = catalog.canonical(plant_name) or plant_name
+        pot.set_plant(plant_name)
+        self.alerts.reset(pot.pot_id)
+        return True
 
-    def generate_status_prompt(self, sensor_data: Dict[str, float], comparisons: Dict[str, str]) -> str:
+    def _pot_in_text(self, text: str) -> Optional[Pot]:
+        """발화에서 화분 지정 ("pot2", "2번 화분"). 없으면 None"""
+        # 긴 id부터, 영문/숫자가 이어지지 않는 자리에서만 ("pot10"이 pot1로 잡히지 않도록)
+        for pot in sorted(self.pots.values(), key=lambda pot: -len(pot.pot_id)):
+            pattern = rf"(?<![0-9a-z]){re.escape(pot.pot_id.lower())}(?![0-9a-z])"
+            if re.search(pattern, text.lower()):
+                return pot
+        match = POT_NUMBER_PATTERN.search(text)
+        if match:
+            index = int(match.group(1)) - 1
+            pots = list(self.pots.values())
+            if 0 <= index < len(pots):
+                return pots[index]
+        return None
+
+    def _plant_in_request(self, catalog, request: str):
+        """"(으)로" 앞 어절에서 식물 이름을 찾는다 -> (식물 이름, 점수). 긴 쪽부터, 정확히 맞으면 바로"""
+        words = request.split()
+        best = None
+        for start in range(len(words)):
+            results = catalog.search(" ".join(words[start:]), limit=1)
+            if results and (best is None or results[0][1] > best[1]):
+                best = results[0]
+                if best[1] >= 1.0:
+                    break
+        return best
+
+    def _change_message(self, plant_name: str, pot: Pot, done=True) -> str:
+        target = "식물을" if len(self.pots) <= 1 else f"{pot.pot_id} 화분의 식물을"
+        if done:
+            return f"{target} {with_ro(plant_name)} 바꿨습니다."
+        return f"{target} {with_ro(plant_name)} 바꿀까요?"
+
+    def _answer_pending(self, text: str) -> Optional[str]:
+        pending, self._pending_change = self._pending_change, None
+        plant_name, pot_id, expires = pending
+        if time.monotonic() > expires:
+            return None
+        if CONFIRM_PATTERN.search(text):
+            pot = self.pots.get(pot_id)
+            if pot is None or not self.set_plant(plant_name, pot_id):
+                return None
+            return self._change_message(plant_name, pot)
+        if CANCEL_PATTERN.search(text):
+            return "식물을 바꾸지 않았습니다."
+        return None
+
+    def handle_command(self, text: str) -> Optional[str]:
+        """식물 변경 요청이면 카탈로그에서 이름을 찾아 바꾸고 대답할 문장을 반환 (LLM 호출 없음).
+
+        "<이름>(으)로 바꿔/변경/심었" 꼴일 때만 처리한다. 이름이 카탈로그와 정확히 같으면 바로
+        바꾸고, 비슷하기만 하면(인식 오류) 되물어 다음 발화의 "응"/"아니"를 기다린다.
+        변경 요청이 아니거나 식물을 찾지 못하면 None (평소처럼 ChatGPT에 묻는다)
+        """
+        if not text:
+            return None
+        if self._pending_change is not None:
+            reply = self._answer_pending(text)
+            if reply is not None:
+                return reply
+        catalog = getattr(self.plant_db, "catalog", None)
+        match = CHANGE_PLANT_PATTERN.search(text)
+        if catalog is None or match is None:
+            return None
+        found = self._plant_in_request(catalog, match.group("name"))
+        if found is None or found[1] < catalog.min_score:
+            return None
+        plant_name, score = found
+        pot = self._pot_in_text(text) or self.default_pot
+        if pot is None:
+            return None
+        if score < 1.0:
+            self._pending_change = (plant_name, pot.pot_id, time.monotonic() + CONFIRM_SECONDS)
+            return self._change_message(plant_name, pot, done=False)
+        if not self.set_plant(plant_name, pot.pot_id):
+            return None
+        return self._change_message(plant_name, pot)
+
+    def pot_label(self, pot: Pot) -> str:
+        if len(self.pots) <= 1:
+            return pot.plant_name
+        return f"{pot.pot_id} 화분의 {pot.plant_name}"
+
+    def all_clear_message(self, plant_label: str) -> str:
+        return f"{plant_label}의 모든 환경이 적정 범위 내에 있습니다."
+
+    def known_phrases(self) -> List[str]:
+        """고정 안내 문구 목록 (TTS 캐시 미리 합성용)"""
+        return [self.all_clear_message(self.pot_label(pot)) for pot in self.pots.values()]
+
+    def generate_status_prompt(self, sensor_data: Dict[str, float], comparisons: Dict[str, str], plant_label: Optional[str] = None) -> str:
+        plant_label = plant_label or self.current_plant
         status_texts = []
         sensors_kr = {
             'temperature': '온도',
@@ -35,52 +197,184 @@ class PlantMonitor:
                 status_texts.append(f"{kr_name}가 너무 높습니다 (현재: {value:.1f})")
         
         if not status_texts:
-            return f"{self.current_plant}의 모든 환경이 적정 범위 내에 있습니다."
+            return self.all_clear_message(plant_label)
         
         status_summary = ", ".join(status_texts)
         prompt = f"""
-        {self.current_plant}의 현재 상태:
+        {plant_label}의 현재 상태:
         {status_summary}
         
-        이러한 상황에서 {self.current_plant}를 위해 어떤 조치가 필요한지 설명해주세요.
+        이러한 상황에서 {plant_label}를 위해 어떤 조치가 필요한지 설명해주세요.
         """
         return prompt.strip()
 
+    def state_key(self, pot: Pot, sensor_data: Dict[str, float], comparisons: Dict[str, str]) -> Optional[str]:
+        cache = getattr(self.chatbot, "response_cache", None)
+        if cache is None:
+            return None
+        return cache.make_key(pot.plant_name, comparisons, sensor_data)
+
+    async def _sleep(self, seconds):
+        if self.clock is not None:
+            await self.clock.sleep(seconds)
+        else:
+            await asyncio.sleep(seconds)
+
+    async def _collect_pot(self, pot: Pot):
+        data = await pot.sensor_manager.collect_data_async()
+        if data:
+            pot.measurement_count += 1
+        return data
+
+    async def collect_all(self):
+        """모든 화분의 센서를 동시에 읽는다"""
+        return await asyncio.gather(
+            *(self._collect_pot(pot) for pot in self.pots.values()),
+            return_exceptions=True
+        )
+
+    async def sample_window(self):
+        """다음 평가 시각까지 채널별 마감 시각에 맞춰 읽는다.
+
+        창은 성공한 읽기 수가 아니라 시간으로 끝나므로 DHT11이 계속 실패해도 늘어나지 않고,
+        평가 시각도 이전 평가 시각에 더해 정하므로 LLM/TTS 시간만큼 밀리지 않는다.
+        """
+        scheduler = self.scheduler
+        scheduler.set_pots(list(self.pots.values()))
+        scheduler.refresh_thresholds()  # 식물이 바뀌었거나 DB가 갱신되었을 수 있다
+        now = scheduler.clock.monotonic()
+        if self._window_deadline is None:
+            self._window_deadline = now + self.cycle_seconds
+        elif self._window_deadline <= now:
+            # 한 창 이상 멈춰 있었으면 지금부터 다시
+            self._window_deadline = now + self.cycle_seconds
+        await scheduler.run_until(self._window_deadline, lambda: self._monitoring_active)
+        self._window_deadline += self.cycle_seconds
+
+    def evaluate(self):
+        """각 화분의 평균을 계산하고 DB와 한 번에 비교"""
+        pots, averages_list = [], []
+        for pot in self.pots.values():
+            averages = pot.sensor_manager.calculate_averages()
+            pot.measurement_count = 0
+            if not averages:
+                print(f"No valid sensor data collected ({pot.pot_id})")
+                continue
+            pots.append(pot)
+            averages_list.append(averages)
+
+        if not pots:
+            return []
+
+        comparisons_list = self.plant_db.compare_sensor_batch(
+            [pot.plant_name for pot in pots], averages_list
+        )
+
+        results = []
+        for pot, averages, comparisons in zip(pots, averages_list, comparisons_list):
+            if not comparisons:
+                print(f"Could not compare sensor data ({pot.pot_id})")
+                continue
+            results.append((pot, averages, comparisons))
+        return results
+
     async def monitor_cycle(self):
+        with MONITOR_CYCLE_SECONDS.time():
+            await self._monitor_cycle()
+
+    async def sample(self):
+        """평가 한 번 분량을 측정한다"""
+        if self.cycle_seconds > 0:
+            await self.sample_window()
+            return
+        # 대기 없이 화분마다 samples_per_cycle번 읽는다 (벤치마크/시뮬레이션용)
+        for _ in range(self.samples_per_cycle):
+            if not self._monitoring_active:
+                break
+            await self.collect_all()
+
+    def check_alerts(self, results, now=None):
+        """evaluate() 결과로 경보 상태를 갱신하고 알릴 내용 목록을 반환"""
+        now = self.scheduler.clock.monotonic() if now is None else now
+        notifications = []
+        for pot, averages, comparisons in results:
+            bounds = self.scheduler.plant_bounds(pot.plant_name)
+            events = self.alerts.update(pot.pot_id, averages, comparisons, bounds, now)
+            if events:
+                notification = self.notification(pot, averages, comparisons, events)
+                if notification is not None:
+                    notifications.append(notification)
+        return notifications
+
+    async def _monitor_cycle(self):
         print("센서 데이터 수집 시작...")
-        measurement_count = 0
+        if not self.pots:
+            await self._sleep(self.sample_interval)
+            return
         
         try:
-            # 2분 동안 10초마다 데이터 수집 (12회)
-            while measurement_count < 12 and self._monitoring_active:
-                data = self.sensor_manager.collect_data()
-                if data:
-                    measurement_count += 1
-                await asyncio.sleep(10)
+            await self.sample()
             
             if not self._monitoring_active:
                 return
             
-            # 평균 계산
-            averages = self.sensor_manager.calculate_averages()
-            if not averages:
-                print("No valid sensor data collected")
-                return
-            
-            # DB와 비교
-            comparisons = self.plant_db.compare_sensor_data(self.current_plant, averages)
-            if not comparisons:
-                print("Could not compare sensor data")
-                return
-            
-            # 상태가 이상적이지 않은 경우 ChatGPT에 물어보고 TTS로 출력
-            prompt = self.generate_status_prompt(averages, comparisons)
-            response = self.chatbot.ask_openai(prompt)
-            if response:
-                self.chatbot.tts.speak(response)
+            # 평균 계산 후 DB와 일괄 비교, 상태가 바뀐 화분만 알린다
+            loop = asyncio.get_running_loop()
+            for notification in self.check_alerts(self.evaluate()):
+                # ChatGPT 요청은 이벤트 루프 밖에서 (그동안 다른 태스크가 돈다)
+                text = await loop.run_in_executor(None, self.answer, notification)
+                self.speak(text)
         
         except Exception as e:
             print(f"Monitoring cycle error: {e}")
 
+    def notification(self, pot: Pot, averages: Dict[str, float], comparisons: Dict[str, str], events):
+        """경보 이벤트로 알릴 내용을 정한다.
+
+        ("speak", 고정 문구, None) 또는 ("ask", ChatGPT 프롬프트, 응답 캐시 키). 알릴 것이 없으면 None
+        """
+        label = self.pot_label(pot)
+        if not self.alerts.active(pot.pot_id):
+            if any(event.kind == CLEARED for event in events):
+                # 고정 문구는 LLM을 거치지 않고 바로 읽는다 (TTS 캐시에서 재생)
+                return ("speak", self.all_clear_message(label), None)
+            return None
+        if all(event.kind == CLEARED for event in events):
+            return None  # 일부만 회복됨. 남은 경보는 반복 알림 때 다시 말한다
+
+        # 흔들리는 원래 판정 대신 확정된 상태로 물어봐야 응답 캐시도 잘 맞는다
+        states = self.alerts.states(pot.pot_id, comparisons)
+        prompt = self.generate_status_prompt(averages, states, label)
+        return ("ask", prompt, self.state_key(pot, averages, states))
+
+    def answer(self, notification) -> Optional[str]:
+        """알릴 문장 (필요하면 ChatGPT에 물어본다)"""
+        kind, text, cache_key = notification
+        if kind == "ask":
+            if self.chatbot is None:
+                # 음성 비서가 꺼져 있으면 상태만 출력한다
+                print(text)
+                return None
+            return self.chatbot.ask_openai(text, cache_key=cache_key, channel="monitor")
+        return text
+
+    def deliver(self, notification):
+        self.speak(self.answer(notification))
+
+    def speak(self, text):
+        """알림 문장을 재생 큐에 넣는다 (합성/재생은 TTS 쪽 스레드에서)"""
+        if not text:
+            return
+        if self.chatbot is None:
+            print(text)
+        else:
+            self.chatbot.tts.speak_alert(text)
+
+    def notify(self, pot: Pot, averages: Dict[str, float], comparisons: Dict[str, str], events):
+        """경보 이벤트가 있을 때만 ChatGPT에 물어보고 TTS로 출력"""
+        notification = self.notification(pot, averages, comparisons, events)
+        if notification is not None:
+            self.deliver(notification)
+
     def stop_monitoring(self):
         self._monitoring_active = False
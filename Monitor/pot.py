@@ -0,0 +1,17 @@
+class Pot:
+    """화분 하나: 식물 종류와 해당 화분 전용 SensorManager"""
+
+    def __init__(self, pot_id, plant_name, sensor_manager):
+        self.pot_id = pot_id
+        self.plant_name = plant_name
+        self.sensor_manager = sensor_manager
+        self.measurement_count = 0
+
+    def set_plant(self, plant_name):
+        self.plant_name = plant_name
+
+    def close(self):
+        self.sensor_manager.close()
+
+    def __repr__(self):
+        return f"Pot({self.pot_id!r}, {self.plant_name!r})"
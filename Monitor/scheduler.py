@@ -0,0 +1,234 @@
+import asyncio
+import math
+
+NORMAL = "normal"
+STABLE = "stable"
+FAST = "fast"
+ALARM = "alarm"  # 적정 범위 안팎이 바뀜: 최소 간격으로
+HOLD = "hold"  # 범위 밖에 그대로 머무는 중: 기본 간격 쪽으로 다시 늘린다
+
+# 센서 여러 개/화분 여러 개의 상태 중 간격을 정하는 쪽
+_PRIORITY = {STABLE: 0, NORMAL: 1, HOLD: 2, FAST: 3, ALARM: 4}
+
+class _Consumer:
+    """같은 드라이버를 쓰는 화분 하나 (공유 DHT11은 한 번 읽어 모든 화분에 기록)"""
+
+    __slots__ = ("pot", "channel", "last")
+
+    def __init__(self, pot, channel):
+        self.pot = pot
+        self.channel = channel
+        self.last = {}  # sensor -> (ts, value, 평활한 기울기, 범위 위치 -1/0/1 또는 None)
+
+class SamplingStream:
+    """드라이버 하나의 샘플링 상태: 다음 마감 시각(monotonic)과 현재 간격"""
+
+    def __init__(self, driver, base_interval, min_interval, max_interval):
+        self.driver = driver
+        self.base_interval = base_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.interval = base_interval
+        self.next_due = None
+        self.consumers = []
+        self.reads = 0
+        self.failures = 0
+        self.missed = 0
+
+    def reschedule(self, now):
+        # 이전 마감 시각 기준으로 더해 읽기 시간이 누적되지 않게 한다
+        self.next_due += self.interval
+        if self.next_due <= now:
+            # 한 주기 이상 밀렸으면 따라잡으려 몰아 읽지 않고 건너뛴다
+            self.missed += int((now - self.next_due) // self.interval) + 1
+            self.next_due = now + self.interval
+
+class SamplingScheduler:
+    """monotonic 마감 시각으로 도는 채널별 적응형 샘플링.
+
+    값이 안정적이면(창 안 표준편차가 적정 범위 폭에 비해 작으면) 간격을 backoff배로 늘리고,
+    빠르게 변하거나 적정 범위 경계에 가까우면 speedup배로 줄인다. 범위를 벗어나거나 돌아오면
+    최소 간격으로 한 번 확인하고, 범위 밖에 그대로 머무는 동안에는 기본 간격까지 backoff배씩 다시
+    늘린다. 그 외에는 기본 간격으로 돌아간다. 스트림마다 따로 도는 태스크라 느린 DHT11 읽기가
+    토양/조도 읽기의 마감 시각을 밀지 않는다.
+    """
+
+    def __init__(self, clock, base_interval=10.0, rates=None, min_interval=None, max_interval=None,
+                 adaptive=True, backoff=1.5, speedup=0.5, near_fraction=0.1, change_fraction=0.15,
+                 stable_fraction=0.02, horizon=3.0, thresholds=None):
+        self.clock = clock
+        self.base_interval = base_interval
+        # 채널 이름("climate", "analog", "soil", "light") -> 기본 간격(초). 없으면 base_interval
+        self.rates = dict(rates or {})
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.adaptive = adaptive
+        self.backoff = backoff
+        self.speedup = speedup
+        # 적정 범위 폭에 대한 비율: 경계까지 거리 / 빠른 변화로 볼 변화량 / 안정으로 볼 표준편차
+        self.near_fraction = near_fraction
+        self.change_fraction = change_fraction
+        self.stable_fraction = stable_fraction
+        # 기울기로 이 간격 수만큼 앞을 내다본 변화량도 빠른 변화 판단에 쓴다
+        self.horizon = horizon
+        # 식물 이름 -> {sensor: (min, max)} (plant_db.thresholds.bounds)
+        self.thresholds = thresholds
+        self.streams = []
+        self._pot_ids = None
+        self._bounds = {}
+
+    def set_pots(self, pots):
+        """화분 구성이 바뀌었을 때만 스트림을 다시 만든다 (진행 중인 마감 시각은 유지)"""
+        pot_ids = tuple(pot.pot_id for pot in pots)
+        if pot_ids == self._pot_ids:
+            return
+        previous = {id(stream.driver): stream for stream in self.streams}
+        streams = {}
+        for pot in pots:
+            for channel, driver in pot.sensor_manager.sampling_channels().items():
+                stream = streams.get(id(driver))
+                if stream is None:
+                    base = self.rates.get(channel, self.base_interval)
+                    stream = SamplingStream(
+                        driver, base,
+                        self.min_interval or base / 5.0,
+                        self.max_interval or base * 6.0,
+                    )
+                    old = previous.get(id(driver))
+                    if old is not None:
+                        stream.next_due, stream.interval = old.next_due, old.interval
+                    streams[id(driver)] = stream
+                stream.consumers.append(_Consumer(pot, channel))
+        self.streams = list(streams.values())
+        self._pot_ids = pot_ids
+
+    def refresh_thresholds(self):
+        self._bounds = {}
+
+    def plant_bounds(self, plant_name):
+        """식물의 센서별 (최소, 최대). 평가 창마다 다시 읽는다"""
+        if self.thresholds is None:
+            return None
+        if plant_name not in self._bounds:
+            try:
+                self._bounds[plant_name] = self.thresholds.bounds(plant_name)
+            except Exception as e:
+                print(f"Error loading thresholds: {e}")
+                self._bounds[plant_name] = None
+        return self._bounds[plant_name]
+
+    async def run_until(self, deadline, active=None):
+        """deadline(clock.monotonic 기준)까지 마감이 된 채널을 읽는다. active()가 False면 중단"""
+        now = self.clock.monotonic()
+        for stream in self.streams:
+            if stream.next_due is None:
+                stream.next_due = now
+        await asyncio.gather(*(self._run_stream(stream, deadline, active) for stream in self.streams))
+
+    async def _run_stream(self, stream, deadline, active):
+        while active is None or active():
+            now = self.clock.monotonic()
+            if now >= deadline:
+                return
+            if stream.next_due <= now:
+                await self._sample(stream)
+                continue
+            # 중단 요청에 늦지 않도록 한 번에 오래 자지 않는다
+            await self.clock.sleep(min(stream.next_due, deadline, now + 5.0) - now)
+
+    async def _sample(self, stream):
+        first = stream.consumers[0]
+        try:
+            raw = await first.pot.sensor_manager.read_channel_async(first.channel)
+        except Exception as e:
+            print(f"Sensor read error: {e}")
+            raw = None
+        stream.reads += 1
+        if raw is None:
+            stream.failures += 1
+
+        states = []
+        for consumer in stream.consumers:
+            data = consumer.pot.sensor_manager.record_channel(consumer.channel, raw)
+            if data:
+                states.append(self._assess(consumer, data, stream.base_interval))
+
+        if self.adaptive and states:
+            self._adapt(stream, states)
+        stream.reschedule(self.clock.monotonic())
+
+    def _assess(self, consumer, data, base):
+        """한 화분의 이번 측정값으로 범위 변화/빠른 변화/범위 밖 유지/안정/보통을 판단"""
+        bounds = self.plant_bounds(consumer.pot.plant_name)
+        manager = consumer.pot.sensor_manager
+        now = manager.clock.time()
+        state = STABLE
+        for sensor, value in data.items():
+            previous = consumer.last.get(sensor)
+            slope = 0.0
+            if previous is not None and now > previous[0]:
+                # 측정 잡음/양자화(DHT11은 1도 단위)에 흔들리지 않도록 기울기를 평활
+                raw_slope = (value - previous[1]) / (now - previous[0])
+                slope = 0.7 * previous[2] + 0.3 * raw_slope
+            side = None
+            sensor_state = NORMAL
+            band = None
+            if bounds and sensor in bounds:
+                low, high = bounds[sensor]
+                band = high - low
+                if math.isnan(band) or band <= 0:
+                    band = None
+            if band is not None:
+                side = -1 if value < low else 1 if value > high else 0
+                stats = manager.get_statistics(sensor)
+                change = abs(slope) * base * self.horizon
+                if stats:
+                    change = max(change, abs(value - stats["mean"]))
+                # 처음 보는 값은 범위 안에 있었던 것으로 친다
+                if side != ((previous[3] or 0) if previous else 0):
+                    sensor_state = ALARM
+                elif change >= self.change_fraction * band:
+                    sensor_state = FAST  # 최근 평균에서 크게 벗어나는 중
+                elif side:
+                    sensor_state = HOLD
+                elif min(value - low, high - value) <= self.near_fraction * band:
+                    sensor_state = FAST  # 경계 근처
+                else:
+                    stddev = stats["stddev"] if stats and stats["count"] > 2 else None
+                    if stddev is not None and stddev <= self.stable_fraction * band:
+                        sensor_state = STABLE
+            consumer.last[sensor] = (now, value, slope, side)
+            if _PRIORITY[sensor_state] > _PRIORITY[state]:
+                state = sensor_state
+        return state
+
+    def _adapt(self, stream, states):
+        if ALARM in states:
+            stream.interval = stream.min_interval
+        elif FAST in states:
+            stream.interval = max(stream.min_interval, stream.interval * self.speedup)
+        elif HOLD in states:
+            # 범위 밖이라도 값이 그대로면 기본 간격까지만 다시 늘린다
+            stream.interval = min(stream.base_interval, stream.interval * self.backoff)
+        elif all(state == STABLE for state in states):
+            stream.interval = min(stream.max_interval, stream.interval * self.backoff)
+        else:
+            # 기본 간격 쪽으로 절반씩 돌아간다
+            stream.interval += (stream.base_interval - stream.interval) * 0.5
+
+    @property
+    def reads(self):
+        return sum(stream.reads for stream in self.streams)
+
+    def summary(self):
+        return [
+            {
+                "driver": type(stream.driver).__name__,
+                "pots": [consumer.pot.pot_id for consumer in stream.consumers],
+                "interval": stream.interval,
+                "reads": stream.reads,
+                "failures": stream.failures,
+                "missed": stream.missed,
+            }
+            for stream in self.streams
+        ]
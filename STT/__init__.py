@@ -1 +1,3 @@
-from .stt import SpeechToText
\ No newline at end of file
+from .stt import SpeechToText
+from .frontend import VoiceFrontEnd, EnergyVAD, TemplateKeywordSpotter, WhisperKeywordSpotter, create_spotter
+from .worker import WhisperWorker, create_worker
\ No newline at end of file
@@ -0,0 +1,362 @@
+import os
+import queue
+import threading
+import time
+
+import numpy as np
+
+class AudioRingBuffer:
+    """최근 capacity개 샘플을 보관하는 float32 원형 버퍼. 위치는 처음부터 센 절대 샘플 번호"""
+
+    def __init__(self, capacity):
+        self.capacity = int(capacity)
+        self._data = np.zeros(self.capacity, dtype=np.float32)
+        self.total = 0  # 지금까지 쓴 샘플 수
+
+    def write(self, samples):
+        samples = np.asarray(samples, dtype=np.float32).ravel()
+        if len(samples) > self.capacity:
+            # 버퍼보다 긴 입력은 마지막 capacity개만 남는다
+            self.total += len(samples) - self.capacity
+            samples = samples[-self.capacity:]
+        n = len(samples)
+        start = self.total % self.capacity
+        end = start + n
+        if end <= self.capacity:
+            self._data[start:end] = samples
+        else:
+            split = self.capacity - start
+            self._data[start:] = samples[:split]
+            self._data[:end - self.capacity] = samples[split:]
+        self.total += n
+
+    @property
+    def oldest(self):
+        return max(0, self.total - self.capacity)
+
+    def read(self, start, end=None):
+        """절대 위치 [start, end) 구간 복사본. 이미 덮어쓴 부분은 잘라낸다"""
+        end = self.total if end is None else min(end, self.total)
+        start = max(start, self.oldest)
+        if start >= end:
+            return np.zeros(0, dtype=np.float32)
+        i, j = start % self.capacity, end % self.capacity
+        if i < j or (j == 0 and i > 0):
+            return self._data[i:j or self.capacity].copy()
+        return np.concatenate((self._data[i:], self._data[:j]))
+
+class EnergyVAD:
+    """프레임 에너지 + 영교차율(ZCR) 기반 음성 구간 판별. 배경 소음 수준을 따라간다"""
+
+    def __init__(self, threshold_db=-50.0, margin_db=12.0, max_zcr=0.35, noise_alpha=0.05):
+        self.threshold_db = threshold_db
+        self.margin_db = margin_db
+        self.max_zcr = max_zcr
+        self.noise_alpha = noise_alpha
+        self.noise_db = threshold_db - margin_db
+
+    def is_speech(self, frame):
+        rms = np.sqrt(np.mean(frame * frame)) if len(frame) else 0.0
+        level_db = 20.0 * np.log10(rms + 1e-10)
+        zcr = np.count_nonzero(np.diff(np.signbit(frame))) / max(len(frame) - 1, 1)
+        # 에너지가 소음보다 충분히 크고, ZCR이 너무 높지 않은(백색 소음/치찰음이 아닌) 프레임
+        speech = level_db > max(self.threshold_db, self.noise_db + self.margin_db) and zcr <= self.max_zcr
+        if not speech:
+            self.noise_db += self.noise_alpha * (level_db - self.noise_db)
+        return speech
+
+def _mel_filterbank(samplerate, n_fft, n_mels):
+    def hz_to_mel(hz):
+        return 2595.0 * np.log10(1.0 + hz / 700.0)
+
+    def mel_to_hz(mel):
+        return 700.0 * (10.0 ** (mel / 2595.0) - 1.0)
+
+    mels = np.linspace(hz_to_mel(20.0), hz_to_mel(samplerate / 2), n_mels + 2)
+    bins = np.floor((n_fft + 1) * mel_to_hz(mels) / samplerate).astype(int)
+    bank = np.zeros((n_mels, n_fft // 2 + 1), dtype=np.float32)
+    for m in range(1, n_mels + 1):
+        left, center, right = bins[m - 1], bins[m], bins[m + 1]
+        if center > left:
+            bank[m - 1, left:center] = (np.arange(left, center) - left) / (center - left)
+        if right > center:
+            bank[m - 1, center:right] = (right - np.arange(center, right)) / (right - center)
+    return bank
+
+class TemplateKeywordSpotter:
+    """등록한 호출어 녹음(템플릿)과 MFCC 특징을 DTW로 비교하는 경량 호출어 검출기.
+
+    발화 안 어디에서 호출어가 시작해도 되도록 시작/끝이 자유로운 subsequence DTW를 쓰고,
+    경로 기울기를 1/2 ~ 2로 제한해 행 단위로 벡터화한다.
+    """
+
+    def __init__(self, samplerate=16000, threshold=0.35, n_mels=24, n_ceps=12, path="keyword_templates.npz"):
+        self.samplerate = samplerate
+        self.threshold = threshold
+        self.n_mels = n_mels
+        self.path = path
+        self.n_fft = 512
+        self.win = int(0.025 * samplerate)
+        self.hop = int(0.010 * samplerate)
+        self._window = np.hanning(self.win).astype(np.float32)
+        self._bank = _mel_filterbank(samplerate, self.n_fft, n_mels)
+        n = np.arange(n_mels)
+        self._dct = np.cos(np.pi / n_mels * (n[:, None] + 0.5) * np.arange(1, n_ceps + 1)[None, :])
+        self.templates = []
+        self.last_distance = None
+        self.load()
+
+    def features(self, audio):
+        audio = np.asarray(audio, dtype=np.float32).ravel()
+        if len(audio) < self.win:
+            audio = np.pad(audio, (0, self.win - len(audio)))
+        count = 1 + (len(audio) - self.win) // self.hop
+        idx = np.arange(self.win)[None, :] + self.hop * np.arange(count)[:, None]
+        spectrum = np.abs(np.fft.rfft(audio[idx] * self._window, n=self.n_fft)) ** 2
+        mel = spectrum @ self._bank.T
+        # 동적 범위를 60dB로 제한한 log-mel → DCT(MFCC). c0(음량)은 버린다
+        log_mel = np.log(np.maximum(mel, mel.max(axis=1, keepdims=True) * 1e-6 + 1e-10))
+        feats = log_mel @ self._dct
+        norms = np.linalg.norm(feats, axis=1, keepdims=True)
+        return feats / np.maximum(norms, 1e-8)
+
+    def enroll(self, audio):
+        self.templates.append(self.features(audio))
+        return len(self.templates)
+
+    def _distance(self, template, feats):
+        # 코사인 거리 행렬 (특징이 정규화되어 있으므로 내적)
+        cost = 1.0 - template @ feats.T
+        rows, cols = cost.shape
+        inf = np.full(2, np.inf)
+        before = np.full(cols, np.inf)
+        acc = cost[0].copy()  # 어느 프레임에서든 시작 가능
+        for i in range(1, rows):
+            # 기울기 1/2 ~ 2 경로만 허용: (i-1, j-1), (i-1, j-2), (i-2, j-1)
+            diagonal = np.concatenate((inf[:1], acc[:-1]))
+            slow = np.concatenate((inf, acc[:-2]))
+            fast = np.concatenate((inf[:1], before[:-1])) + cost[i - 1]
+            before = acc
+            acc = cost[i] + np.minimum(np.minimum(diagonal, slow), fast)
+        return float(acc.min() / rows)
+
+    def detect(self, audio):
+        if not self.templates:
+            return False
+        feats = self.features(audio)
+        self.last_distance = min(self._distance(t, feats) for t in self.templates)
+        return self.last_distance <= self.threshold
+
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with np.load(self.path) as data:
+                self.templates = [data[name] for name in sorted(data.files)]
+        except Exception as e:
+            print(f"Error loading keyword templates: {e}")
+
+    def save(self):
+        if not self.path:
+            return
+        np.savez(self.path, **{f"t{i:03d}": t for i, t in enumerate(self.templates)})
+
+class WhisperKeywordSpotter:
+    """템플릿이 없을 때의 대체 검출기: 음성 구간만 Whisper로 인식해 호출어를 찾는다"""
+
+    def __init__(self, stt):
+        self.stt = stt
+        self.last_text = None
+
+    def detect(self, audio):
+        self.last_text = self.stt.transcribe_audio(audio)
+        return self.stt.detect_keyword(self.last_text)
+
+def create_spotter(stt, path="keyword_templates.npz", **kwargs):
+    """등록된 호출어 템플릿이 있으면 DTW 검출기, 없으면 Whisper 검출기"""
+    spotter = TemplateKeywordSpotter(samplerate=stt.samplerate, path=path, **kwargs)
+    return spotter if spotter.templates else WhisperKeywordSpotter(stt)
+
+class VoiceFrontEnd:
+    """마이크를 계속 열어 두고 링 버퍼 → VAD → 호출어 검출 순서로 거른다.
+
+    음성 구간은 고정 길이 블록이 아니라 VAD가 판단한 시작/끝 위치로 링 버퍼에서 잘라내므로
+    블록 경계에 걸친 발화도 잘리지 않는다. 무음 구간에서는 프레임 에너지 계산만 한다.
+    """
+
+    def __init__(self, spotter=None, vad=None, samplerate=16000, frame_ms=30, ring_seconds=30,
+                 pre_roll_ms=300, hangover_ms=500, min_speech_ms=150, max_segment_seconds=8.0,
+                 max_pending=8):
+        self.spotter = spotter
+        self.vad = vad or EnergyVAD()
+        self.samplerate = samplerate
+        self.frame_len = int(samplerate * frame_ms / 1000)
+        self.ring = AudioRingBuffer(samplerate * ring_seconds)
+        self.pre_roll = int(samplerate * pre_roll_ms / 1000)
+        self.hangover_frames = max(1, hangover_ms // frame_ms)
+        self.min_speech_frames = max(1, min_speech_ms // frame_ms)
+        self.max_segment = int(samplerate * max_segment_seconds)
+        self.segments = queue.Queue(maxsize=max_pending)
+        self.frames = 0
+        self.voiced_frames = 0
+        self.segment_count = 0
+        self.dropped_segments = 0
+        self.spotter_calls = 0
+        self._blocks = queue.Queue()
+        self._pending = np.zeros(0, dtype=np.float32)
+        self._speech_start = None
+        self._speech_frames = 0
+        self._silence_frames = 0
+        self._stream = None
+        self._thread = None
+        self._running = False
+
+    def start(self):
+        """sounddevice 입력 스트림을 열고 처리 스레드를 시작"""
+        if self._running:
+            return self
+        import sounddevice as sd
+
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="VoiceFrontEnd", daemon=True)
+        self._thread.start()
+        self._stream = sd.InputStream(
+            samplerate=self.samplerate, channels=1, dtype='float32',
+            blocksize=self.frame_len, callback=self._callback
+        )
+        self._stream.start()
+        return self
+
+    def _callback(self, indata, frames, time_info, status):
+        # 오디오 콜백에서는 복사만 하고 바로 반환
+        self._blocks.put(indata[:, 0].copy())
+
+    def _run(self):
+        while self._running:
+            try:
+                block = self._blocks.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            if block is None:
+                break  # close()
+            self.feed(block)
+
+    def feed(self, samples):
+        """오디오 샘플을 밀어 넣는다 (입력 스트림 스레드 또는 테스트/재생용으로 직접 호출)"""
+        samples = np.asarray(samples, dtype=np.float32).ravel()
+        base = self.ring.total - len(self._pending)
+        self.ring.write(samples)
+        if len(self._pending):
+            samples = np.concatenate((self._pending, samples))
+        usable = len(samples) - len(samples) % self.frame_len
+        for offset in range(0, usable, self.frame_len):
+            self._process_frame(samples[offset:offset + self.frame_len], base + offset)
+        self._pending = samples[usable:]
+
+    def _process_frame(self, frame, position):
+        self.frames += 1
+        end = position + len(frame)
+        if self.vad.is_speech(frame):
+            self.voiced_frames += 1
+            if self._speech_start is None:
+                self._speech_start = position
+                self._speech_frames = 0
+            self._speech_frames += 1
+            self._silence_frames = 0
+        elif self._speech_start is not None:
+            self._silence_frames += 1
+            if self._silence_frames >= self.hangover_frames:
+                self._close_segment(end)
+                return
+
+        if self._speech_start is not None and end - self._speech_start >= self.max_segment:
+            # 너무 긴 발화는 잘라 내보내고, 경계에 걸친 단어를 위해 1초 겹쳐서 이어간다
+            self._close_segment(end)
+            self._speech_start = max(end - self.samplerate, self.ring.oldest)
+            self._speech_frames = 1
+
+    def _close_segment(self, end):
+        start, voiced = self._speech_start, self._speech_frames
+        self._speech_start = None
+        self._speech_frames = 0
+        self._silence_frames = 0
+        if voiced < self.min_speech_frames:
+            return  # 짧은 잡음 (딸깍 소리 등)
+        segment = self.ring.read(start - self.pre_roll, end)
+        self.segment_count += 1
+        try:
+            self.segments.put_nowait(segment)
+        except queue.Full:
+            # 소비가 밀리면 가장 오래된 구간을 버린다
+            self.dropped_segments += 1
+            try:
+                self.segments.get_nowait()
+            except queue.Empty:
+                pass
+            self.segments.put_nowait(segment)
+
+    def next_segment(self, timeout=None):
+        try:
+            return self.segments.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def clear(self):
+        """쌓인 음성 구간을 버린다 (예: 대화 중 스피커 소리가 들어간 구간)"""
+        while True:
+            try:
+                self.segments.get_nowait()
+            except queue.Empty:
+                return
+
+    def wait_for_keyword(self, timeout=None):
+        """호출어가 든 음성 구간을 반환. timeout 동안 없으면 None"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            segment = self.next_segment(remaining)
+            if segment is None:
+                return None
+            self.spotter_calls += 1
+            if self.spotter is not None and self.spotter.detect(segment):
+                return segment
+
+    def capture_utterance(self, timeout=5.0):
+        """지금부터 시작되는 발화 하나를 끝(무음)까지 받아 반환.
+
+        timeout은 말을 시작하기까지의 대기 시간이다. 말을 시작했으면 발화가 끝날 때까지
+        기다리되, 최대 구간 길이(max_segment_seconds)가 지나면 잘린 구간이 나온다.
+        """
+        self.clear()
+        deadline = time.monotonic() + timeout
+        while True:
+            if self._speech_start is not None:
+                # 최대 구간 길이 + 끝을 판단하는 무음 구간만큼이면 반드시 구간이 나온다
+                limit = (self.max_segment + (self.hangover_frames + 1) * self.frame_len) / self.samplerate
+                return self.next_segment(limit + 1.0)
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            try:
+                # None이면 close()
+                return self.segments.get(timeout=min(remaining, 0.05))
+            except queue.Empty:
+                continue
+
+    def close(self):
+        self._running = False
+        self._blocks.put(None)
+        # next_segment()에서 기다리는 쪽을 바로 깨운다 (None을 받으면 구간 없음으로 끝남)
+        try:
+            self.segments.put_nowait(None)
+        except queue.Full:
+            pass
+        if self._stream is not None:
+            try:
+                self._stream.stop()
+                self._stream.close()
+            except Exception:
+                pass
+            self._stream = None
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=1)
@@ -1,71 +1,150 @@
-import whisper
-import sounddevice as sd
-import soundfile as sf
 import numpy as np
-import os
+import threading
 import warnings
 import time
+from Metrics.instruments import TRANSCRIBE_SECONDS
+
+whisper = None  # torch까지 끌고 오므로 모델을 올릴 때 import (시작 시간 단축)
+
+def load_whisper():
+    global whisper
+    if whisper is None:
+        import whisper as module
+        whisper = module
+    return whisper
 
 class SpeechToText:
-    def __init__(self, model_size="base", duration=5, keyword="지니"):
+    def __init__(self, model_size="base", duration=5, keyword="지니", use_mel=False, worker=None):
         self.model = None
         self.model_size = model_size
         self.duration = duration
         self.samplerate = 16000
-        self.sound_file = "sound_file.mp3"
         self.keywords = keyword
+        # True면 transcribe() 대신 log-mel 스펙트로그램을 직접 만들어 한 번에 decode
+        # (5초 단위 짧은 발화에서는 30초 창 하나로 충분해 슬라이딩 창 처리를 건너뛴다)
+        self.use_mel = use_mel
+        # WhisperWorker가 주어지면 모델은 워커 프로세스가 갖고, 이 프로세스는 오디오만 넘긴다
+        self.worker = worker
         self._last_text = None
+        self._fp16 = False
+        self._load_lock = threading.Lock()
+        self._warm_thread = None
+        self._warm_lock = threading.Lock()
+        # VoiceFrontEnd가 붙어 있으면 고정 길이 녹음 대신 VAD로 발화 하나를 받는다
+        self.front_end = None
         warnings.filterwarnings("ignore", category=UserWarning)
 
     def load_model(self):
-        if self.model is None:
-            print("모델 로드 중...")
-            self.model = whisper.load_model(self.model_size)
-            print("모델 로드 완료!")
+        if self.worker is not None:
+            self.worker.start()
+            return self
+        with self._load_lock:
+            if self.model is None:
+                print("모델 로드 중...")
+                model = load_whisper().load_model(self.model_size)
+                device = getattr(model, "device", None)
+                self._fp16 = getattr(device, "type", None) == "cuda"
+                self.model = model
+                print("모델 로드 완료!")
         return self
 
+    def warm_up(self, background=True):
+        """시스템 시작 시 모델을 미리 올리고 무음으로 한 번 추론해 첫 발화 지연을 없앤다"""
+        def run():
+            try:
+                self.load_model()
+                if self.worker is None:  # 워커는 시작할 때 스스로 warm-up
+                    self._transcribe(np.zeros(self.samplerate, dtype=np.float32))
+            except Exception as e:
+                print(f"음성 인식 모델 준비 오류: {e}")
+
+        if not background:
+            run()
+            return None
+        # 동시에 불려도 스레드는 하나만, 그리고 항상 시작된 스레드를 돌려준다 (바로 join() 할 수 있도록)
+        with self._warm_lock:
+            if self._warm_thread is None:
+                thread = threading.Thread(target=run, name="WhisperWarmUp", daemon=True)
+                thread.start()
+                self._warm_thread = thread
+            return self._warm_thread
+
+    def record(self, duration=None):
+        duration = duration or self.duration
+        if self.front_end is not None:
+            print("\n말씀해주세요...")
+            return self.front_end.capture_utterance(timeout=duration)
+        print(f"\n{duration}초 동안 말씀해주세요...")
+        import sounddevice as sd
+
+        audio = sd.rec(
+            int(duration * self.samplerate),
+            samplerate=self.samplerate,
+            channels=1,
+            dtype='float32'
+        )
+        sd.wait()
+        print("녹음 완료!")
+        return audio
+
+    @staticmethod
+    def _as_mono(audio):
+        """sounddevice의 (N, 1) 배열을 whisper가 받는 1차원 float32로 (복사 없이 가능하면 view)"""
+        audio = np.asarray(audio, dtype=np.float32)
+        if audio.ndim > 1:
+            audio = audio[:, 0] if audio.shape[1] == 1 else audio.mean(axis=1)
+        return np.ascontiguousarray(audio)
+
+    def _transcribe(self, audio):
+        if self.worker is not None:
+            return {"text": self.worker.transcribe(audio)}
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            if self.use_mel:
+                whisper = load_whisper()
+                n_mels = getattr(getattr(self.model, "dims", None), "n_mels", 80)
+                # 구버전 whisper는 n_mels 인자가 없다 (80 고정)
+                kwargs = {"n_mels": n_mels} if n_mels != 80 else {}
+                mel = whisper.log_mel_spectrogram(whisper.pad_or_trim(audio), **kwargs)
+                options = whisper.DecodingOptions(language='ko', fp16=self._fp16, without_timestamps=True)
+                result = whisper.decode(self.model, mel.to(self.model.device), options)
+                return {"text": result.text}
+            return self.model.transcribe(audio, language='ko', fp16=self._fp16)
+
     def transcribe_audio(self, audio=None):
         try:
             if self.model is None:
                 self.load_model()
 
             if audio is None:
-                print(f"\n{self.duration}초 동안 말씀해주세요...")
-                audio = sd.rec(
-                    int(self.duration * self.samplerate),
-                    samplerate=self.samplerate,
-                    channels=1,
-                    dtype='float32'
-                )
-                sd.wait()
-                print("녹음 완료!")
-
-            sf.write(self.sound_file, audio, self.samplerate)
+                audio = self.record()
+                if audio is None or len(audio) == 0:
+                    return None
+
+            # 녹음 배열을 그대로 모델에 넘긴다 (파일 저장/ffmpeg 디코딩 없음)
+            audio = self._as_mono(audio)
 
             print("음성 인식 중...")
-            with warnings.catch_warnings():
-                warnings.simplefilter("ignore")
-                result = self.model.transcribe(self.sound_file, language='ko')
-            
-            text = result["text"].strip() if result and "text" in result else None
-            
+            backend = "inline" if self.worker is None else "worker"
+            with TRANSCRIBE_SECONDS.labels(backend).time():
+                result = self._transcribe(audio)
+
+            text = result["text"].strip() if result and result.get("text") else None
+
             # 중복 출력 방지
             if text and text != self._last_text:
                 print(f"Recognized text: {text}")
                 self._last_text = text
-            
+
             return text
 
         except Exception as e:
             print(f"음성 인식 오류: {e}")
             return None
 
-        finally:
-            if os.path.exists(self.sound_file):
-                try:
-                    os.remove(self.sound_file)
-                except:
-                    pass
-
     def detect_keyword(self, text):
         return bool(text and self.keywords in text)
+
+    def close(self):
+        if self.worker is not None:
+            self.worker.close()
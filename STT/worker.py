@@ -0,0 +1,223 @@
+import itertools
+import multiprocessing as mp
+import os
+import queue
+import threading
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+def _parse_cores(value):
+    if not value:
+        return None
+    if isinstance(value, str):
+        return {int(core) for core in value.replace(" ", "").split(",") if core}
+    return set(value)
+
+def _worker_main(shm_name, capacity, model_size, use_mel, threads, cores, requests, responses):
+    """워커 프로세스: 모델을 소유하고 공유 메모리의 오디오를 인식해 텍스트만 돌려준다"""
+    if cores:
+        try:
+            os.sched_setaffinity(0, cores)
+        except (AttributeError, OSError) as e:
+            print(f"STT worker affinity error: {e}")
+    if threads:
+        # torch/OpenMP가 import 시점에 읽으므로 모델 import 전에 설정
+        os.environ["OMP_NUM_THREADS"] = str(threads)
+        os.environ["MKL_NUM_THREADS"] = str(threads)
+
+    from .stt import SpeechToText
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        stt = SpeechToText(model_size=model_size, use_mel=use_mel)
+        stt.load_model()
+        if threads:
+            try:
+                import torch
+                torch.set_num_threads(threads)
+            except ImportError:
+                pass
+        buffer = np.ndarray((capacity,), dtype=np.float32, buffer=shm.buf)
+        stt._transcribe(np.zeros(stt.samplerate, dtype=np.float32))  # warm-up
+        responses.put(("ready", None, None))
+
+        while True:
+            message = requests.get()
+            if message is None:
+                break
+            request_id, length = message
+            try:
+                result = stt._transcribe(buffer[:length])
+                responses.put((request_id, result.get("text"), None))
+            except Exception as e:
+                responses.put((request_id, None, str(e)))
+        del buffer
+    finally:
+        shm.close()
+
+class WorkerExited(queue.Empty):
+    """응답을 기다리는 중에 워커 프로세스가 죽었다 (메모리 부족, 세그폴트 등)"""
+
+class WhisperWorker:
+    """Whisper 추론을 별도 프로세스에서 돌린다.
+
+    오디오는 미리 만든 공유 메모리 버퍼에 써서 넘기고(배열 pickle 없음) 큐로는 요청 번호와
+    길이만 보낸다. 응답이 timeout 안에 없거나 프로세스가 죽으면 워커를 다시 띄운다.
+    threads/cores로 추론 스레드 수와 사용할 CPU 코어를 센서 쪽과 분리할 수 있다.
+    """
+
+    def __init__(self, model_size="base", use_mel=False, threads=None, cores=None,
+                 max_seconds=30, samplerate=16000, timeout=30.0, startup_timeout=300.0):
+        self.model_size = model_size
+        self.use_mel = use_mel
+        self.threads = threads
+        self.cores = _parse_cores(cores)
+        self.capacity = int(max_seconds * samplerate)
+        self.timeout = timeout
+        self.startup_timeout = startup_timeout
+        self.restarts = 0
+        self.timeouts = 0
+        self.crashes = 0
+        self._ctx = mp.get_context("spawn")
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        # close()가 오래 기다리는 transcribe/시작 대기를 바로 끝내도록
+        self._closing = threading.Event()
+        self._shm = None
+        self._buffer = None
+        self._process = None
+        self._requests = None
+        self._responses = None
+
+    @property
+    def alive(self):
+        return self._process is not None and self._process.is_alive()
+
+    def start(self):
+        """워커가 떠서 모델 준비를 마칠 때까지 기다린다. 이미 떠 있으면 바로 반환"""
+        with self._lock:
+            if not self.alive:
+                self._spawn()
+        return self
+
+    def _spawn(self):
+        if self._process is not None:
+            self.restarts += 1
+        if self._shm is None:
+            self._shm = shared_memory.SharedMemory(create=True, size=self.capacity * 4)
+            self._buffer = np.ndarray((self.capacity,), dtype=np.float32, buffer=self._shm.buf)
+        self._requests = self._ctx.Queue()
+        self._responses = self._ctx.Queue()
+        self._process = self._ctx.Process(
+            target=_worker_main,
+            args=(self._shm.name, self.capacity, self.model_size, self.use_mel,
+                  self.threads, self.cores, self._requests, self._responses),
+            name="WhisperWorker", daemon=True
+        )
+        self._process.start()
+        try:
+            status, _, _ = self._get_response(self.startup_timeout)
+        except queue.Empty:
+            status = None
+        if status != "ready":
+            self._kill()
+            if self._closing.is_set():
+                return  # 시작 중에 종료 요청
+            raise RuntimeError("STT worker failed to start")
+
+    def transcribe(self, audio, timeout=None):
+        """1차원 float32 오디오를 인식한 텍스트. 실패/시간 초과 시 워커를 재시작하고 None"""
+        audio = np.asarray(audio, dtype=np.float32).ravel()
+        if len(audio) > self.capacity:
+            audio = audio[-self.capacity:]  # Whisper 창(30초)보다 긴 앞부분은 버린다
+
+        with self._lock:
+            if self._closing.is_set():
+                return None
+            if not self.alive:
+                self._spawn()
+
+            request_id = next(self._ids)
+            self._buffer[:len(audio)] = audio
+            self._requests.put((request_id, len(audio)))
+            try:
+                while True:
+                    response_id, text, error = self._get_response(timeout or self.timeout)
+                    if response_id == request_id:
+                        break
+                    # 이전(시간 초과된) 요청의 늦은 응답은 버린다
+            except WorkerExited:
+                self.crashes += 1
+                print(f"STT worker exited (code {self._process.exitcode}), restarting")
+                self._kill()
+                return None
+            except queue.Empty:
+                if self._closing.is_set():
+                    return None
+                self.timeouts += 1
+                print("STT worker timed out, restarting")
+                self._kill()
+                return None
+
+        if error:
+            print(f"STT worker error: {error}")
+            return None
+        return text
+
+    def _get_response(self, timeout):
+        """응답 큐를 짧게 나눠 기다린다. 닫는 중이면 queue.Empty, 워커가 죽었으면 WorkerExited"""
+        deadline = time.monotonic() + timeout
+        while not self._closing.is_set():
+            try:
+                return self._responses.get(timeout=min(0.1, max(0.0, deadline - time.monotonic())))
+            except queue.Empty:
+                if not self._process.is_alive():
+                    # 죽기 직전에 보낸 응답이 파이프에 남아 있을 수 있다
+                    try:
+                        return self._responses.get(timeout=0.1)
+                    except queue.Empty:
+                        raise WorkerExited from None
+                if time.monotonic() >= deadline:
+                    raise
+        raise queue.Empty
+
+    def _kill(self):
+        if self._process is not None and self._process.is_alive():
+            self._process.terminate()
+            self._process.join(timeout=2)
+            if self._process.is_alive():
+                self._process.kill()
+                self._process.join()
+        for q in (self._requests, self._responses):
+            if q is not None:
+                q.close()
+                q.cancel_join_thread()
+
+    def close(self):
+        self._closing.set()
+        with self._lock:
+            if self.alive:
+                # 추론 중이면 끝까지 기다리지 않고 _kill()로 끝낸다
+                self._requests.put(None)
+                self._process.join(timeout=0.2)
+            self._kill()
+            self._process = None
+            if self._shm is not None:
+                self._buffer = None
+                self._shm.close()
+                self._shm.unlink()
+                self._shm = None
+
+def create_worker(mode=None, **options):
+    """PLANT_STT_WORKER=process|inline, PLANT_STT_THREADS, PLANT_STT_CORES(예: "2,3") 환경 변수로 설정"""
+    mode = (mode or os.environ.get("PLANT_STT_WORKER", "process")).lower()
+    if mode == "inline":
+        return None
+    if mode != "process":
+        raise ValueError(f"Unknown STT worker mode: {mode}")
+    threads = os.environ.get("PLANT_STT_THREADS")
+    options.setdefault("threads", int(threads) if threads else None)
+    options.setdefault("cores", os.environ.get("PLANT_STT_CORES"))
+    return WhisperWorker(**options)
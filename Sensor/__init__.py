@@ -1,3 +1,7 @@
 from .analog_sensor import SoilMoistureSensor, LightSensor
 from .dht11 import DHT11
-from .sensor_manager import SensorManager
\ No newline at end of file
+from .sensor_manager import SensorManager
+from .aggregator import StreamingAggregator
+from .async_reader import AsyncSensorReader
+from .clock import RealClock, SimClock
+from .backends import HardwareBackend, SimulatedBackend, ReplayBackend, create_backend
\ No newline at end of file
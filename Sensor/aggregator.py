@@ -0,0 +1,263 @@
+from array import array
+from collections import deque
+import math
+import time
+
+# 센서별 근사 백분위수 히스토그램 범위
+DEFAULT_RANGES = {
+    'temperature': (-20.0, 60.0),
+    'humidity': (0.0, 100.0),
+    'soil_moisture': (0.0, 100.0),
+    'light': (0.0, 100.0),
+}
+
+class SensorWindow:
+    """센서 하나의 고정 크기 링 버퍼와 O(1) 갱신 통계"""
+
+    __slots__ = (
+        'capacity', 'window_seconds', 'ewma_alpha',
+        '_values', '_times', '_head', '_size', '_seq',
+        'count', 'mean', '_m2', '_min_q', '_max_q',
+        'ewma', 'last', 'last_ts', 'total_count',
+        '_hist_lo', '_hist_width', '_hist',
+    )
+
+    def __init__(self, capacity=256, window_seconds=None, ewma_alpha=0.2,
+                 value_range=(0.0, 100.0), bins=200):
+        self.capacity = capacity
+        self.window_seconds = window_seconds
+        self.ewma_alpha = ewma_alpha
+        self._values = array('d', bytes(8 * capacity))
+        self._times = array('d', bytes(8 * capacity))
+        self._hist_lo = float(value_range[0])
+        self._hist_width = (float(value_range[1]) - self._hist_lo) / bins
+        self._hist = array('l', bytes(array('l').itemsize * bins))
+        self.ewma = None
+        self.last = None
+        self.last_ts = None
+        self.total_count = 0
+        self.reset()
+
+    def reset(self):
+        """창 통계만 초기화 (EWMA와 마지막 값은 유지)"""
+        self._head = 0
+        self._size = 0
+        self._seq = 0
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self._min_q = deque()
+        self._max_q = deque()
+        for i in range(len(self._hist)):
+            self._hist[i] = 0
+
+    def _bin(self, value):
+        index = int((value - self._hist_lo) / self._hist_width)
+        return min(max(index, 0), len(self._hist) - 1)
+
+    def _oldest_seq(self):
+        return self._seq - self._size
+
+    def _evict_oldest(self):
+        tail = (self._head - self._size) % self.capacity
+        value = self._values[tail]
+        self._size -= 1
+
+        # Welford 역연산
+        self.count -= 1
+        if self.count == 0:
+            self.mean = 0.0
+            self._m2 = 0.0
+        else:
+            delta = value - self.mean
+            self.mean -= delta / self.count
+            self._m2 = max(self._m2 - delta * (value - self.mean), 0.0)
+
+        self._hist[self._bin(value)] -= 1
+
+        oldest = self._oldest_seq()
+        while self._min_q and self._min_q[0][0] < oldest:
+            self._min_q.popleft()
+        while self._max_q and self._max_q[0][0] < oldest:
+            self._max_q.popleft()
+
+    def expire(self, now=None):
+        if self.window_seconds is None or self._size == 0:
+            return
+        cutoff = (time.time() if now is None else now) - self.window_seconds
+        while self._size:
+            tail = (self._head - self._size) % self.capacity
+            if self._times[tail] >= cutoff:
+                break
+            self._evict_oldest()
+
+    def add(self, value, ts=None):
+        ts = time.time() if ts is None else ts
+        self.expire(ts)
+        if self._size == self.capacity:
+            self._evict_oldest()
+
+        self._values[self._head] = value
+        self._times[self._head] = ts
+        self._head = (self._head + 1) % self.capacity
+        self._size += 1
+        seq = self._seq
+        self._seq += 1
+
+        # Welford 평균/분산
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+
+        # 단조 큐로 최소/최대 유지
+        while self._min_q and self._min_q[-1][1] >= value:
+            self._min_q.pop()
+        self._min_q.append((seq, value))
+        while self._max_q and self._max_q[-1][1] <= value:
+            self._max_q.pop()
+        self._max_q.append((seq, value))
+
+        self._hist[self._bin(value)] += 1
+
+        self.ewma = value if self.ewma is None else (
+            self.ewma_alpha * value + (1 - self.ewma_alpha) * self.ewma
+        )
+        self.last = value
+        self.last_ts = ts
+        self.total_count += 1
+
+    @property
+    def variance(self):
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def minimum(self):
+        return self._min_q[0][1] if self._min_q else None
+
+    @property
+    def maximum(self):
+        return self._max_q[0][1] if self._max_q else None
+
+    def percentile(self, q):
+        """히스토그램 기반 근사 백분위수 (q: 0~100)"""
+        if self.count == 0:
+            return None
+        target = q / 100.0 * self.count
+        cumulative = 0
+        for i, n in enumerate(self._hist):
+            if n and cumulative + n >= target:
+                fraction = (target - cumulative) / n
+                value = self._hist_lo + (i + fraction) * self._hist_width
+                return min(max(value, self.minimum), self.maximum)
+            cumulative += n
+        return self.maximum
+
+    def values_since(self, since):
+        result = []
+        for i in range(self._size):
+            index = (self._head - self._size + i) % self.capacity
+            if self._times[index] >= since:
+                result.append(self._values[index])
+        return result
+
+    def summary(self):
+        if self.count == 0:
+            return None
+        return {
+            'count': self.count,
+            'mean': self.mean,
+            'variance': self.variance,
+            'stddev': math.sqrt(self.variance),
+            'min': self.minimum,
+            'max': self.maximum,
+            'ewma': self.ewma,
+            'p50': self.percentile(50),
+            'p90': self.percentile(90),
+            'last': self.last,
+        }
+
+class StreamingAggregator:
+    """센서별 SensorWindow 묶음. tumbling 모드는 평균 계산 시 창을 비우고,
+    sliding 모드는 window_seconds 이내의 값만 유지한다."""
+
+    TUMBLING = "tumbling"
+    SLIDING = "sliding"
+
+    def __init__(self, mode=SLIDING, window_seconds=120, capacity=256, ewma_alpha=0.2, ranges=None):
+        if mode not in (self.TUMBLING, self.SLIDING):
+            raise ValueError(f"Unknown aggregation mode: {mode}")
+        self.mode = mode
+        self.window_seconds = window_seconds
+        self.capacity = capacity
+        self.ewma_alpha = ewma_alpha
+        self.ranges = dict(DEFAULT_RANGES, **(ranges or {}))
+        self.windows = {}
+
+    def _window(self, sensor):
+        window = self.windows.get(sensor)
+        if window is None:
+            window = SensorWindow(
+                capacity=self.capacity,
+                window_seconds=self.window_seconds if self.mode == self.SLIDING else None,
+                ewma_alpha=self.ewma_alpha,
+                value_range=self.ranges.get(sensor, (0.0, 100.0)),
+            )
+            self.windows[sensor] = window
+        return window
+
+    def add(self, sensor, value, ts=None):
+        self._window(sensor).add(value, ts)
+
+    def add_many(self, data, ts=None):
+        ts = time.time() if ts is None else ts
+        for sensor, value in data.items():
+            if value is not None:
+                self.add(sensor, value, ts)
+
+    def stats(self, sensor, window_seconds=None, now=None):
+        """센서 통계. window_seconds가 설정 창과 다르면 링 버퍼를 훑어 계산"""
+        window = self.windows.get(sensor)
+        if window is None:
+            return None
+        now = time.time() if now is None else now
+        window.expire(now)
+        if window_seconds is None or window_seconds == window.window_seconds:
+            return window.summary()
+
+        values = window.values_since(now - window_seconds)
+        if not values:
+            return None
+        n = len(values)
+        mean = sum(values) / n
+        variance = sum((v - mean) ** 2 for v in values) / (n - 1) if n > 1 else 0.0
+        return {
+            'count': n,
+            'mean': mean,
+            'variance': variance,
+            'stddev': math.sqrt(variance),
+            'min': min(values),
+            'max': max(values),
+            'ewma': window.ewma,
+            'p50': sorted(values)[n // 2],
+            'p90': sorted(values)[min(int(n * 0.9), n - 1)],
+            'last': values[-1],
+        }
+
+    def means(self, now=None):
+        now = time.time() if now is None else now
+        result = {}
+        for sensor, window in self.windows.items():
+            window.expire(now)
+            if window.count:
+                result[sensor] = window.mean
+        return result
+
+    def roll(self):
+        """tumbling 모드에서 현재 창을 닫는다"""
+        if self.mode == self.TUMBLING:
+            for window in self.windows.values():
+                window.reset()
+
+    def clear(self):
+        self.windows.clear()
@@ -1,54 +1,77 @@
-import spidev
-import time
+from .mcp3008 import MCP3008Bus
 
 class AnalogSensor:
-    def __init__(self, channel, bus=0, device=0):
-        self.spi = spidev.SpiDev()
-        self.spi.open(bus, device)
-        self.spi.max_speed_hz = 50000
+    """공유 MCP3008 버스의 채널 하나를 보는 센서"""
+
+    def __init__(self, channel, bus=0, device=0, oversample=4, adc=None):
+        # 넘겨받은 adc는 호출한 쪽 소유라 close()에서 놓지 않는다
+        self._shared_adc = adc is None
+        self.adc = adc or MCP3008Bus.shared(bus, device)
         self.channel = channel
-        self._last_error_time = 0
-        self.error_cooldown = 5
+        self.oversample = oversample
+        self.name = "Analog Sensor"
 
     def read_adc(self):
         if self.channel < 0 or self.channel > 7:
             return -1
-        try:
-            r = self.spi.xfer2([1, (8 + self.channel) << 4, 0])
-            data = ((r[1] & 3) << 8) + r[2]
-            return data
-        except Exception as e:
-            current_time = time.time()
-            if current_time - self._last_error_time >= self.error_cooldown:
-                print(f"Analog sensor error: {e}")
-                self._last_error_time = current_time
+        value = self.adc.read_channel(self.channel, self.oversample)
+        if value is None:
             return -1
+        return value
+
+    def convert(self, value):
+        return (value / 1023.0) * 100
 
     def read(self):
         value = self.read_adc()
         if value == -1:
             return None
-        return (value / 1023.0) * 100
-    
+        return self.convert(value)
+
     def close(self):
-        try:
-            self.spi.close()
-        except:
-            pass
+        if self.adc is not None:
+            if self._shared_adc:
+                self.adc.release()
+            self.adc = None
 
 class SoilMoistureSensor(AnalogSensor):
-    def __init__(self, ch=0):
-        super().__init__(channel=ch)
+    def __init__(self, ch=0, **kwargs):
+        super().__init__(channel=ch, **kwargs)
         self.name = "Soil Moisture Sensor"
 
-    def read(self):
-        value = super().read()
-        if value is None:
-            return None
+    def convert(self, value):
         # 토양 수분 센서는 값이 반전되어 있으므로 보정
-        return 100 - value
+        return 100 - super().convert(value)
 
 class LightSensor(AnalogSensor):
-    def __init__(self, ch=7):
-        super().__init__(channel=ch)
+    def __init__(self, ch=7, **kwargs):
+        super().__init__(channel=ch, **kwargs)
         self.name = "Light Sensor"
+
+class AnalogChannelGroup:
+    """같은 버스의 아날로그 센서들을 한 번의 스캔으로 읽는다"""
+
+    def __init__(self, sensors):
+        self.sensors = list(sensors)
+        self.adc = self.sensors[0].adc
+        self.oversample = max(sensor.oversample for sensor in self.sensors)
+        self.name = "Analog Channel Group"
+
+    @staticmethod
+    def can_group(sensors):
+        adcs = {id(getattr(sensor, 'adc', None)) for sensor in sensors}
+        return (
+            all(isinstance(sensor, AnalogSensor) and sensor.adc is not None for sensor in sensors)
+            and len(adcs) == 1
+        )
+
+    def read(self):
+        raw = self.adc.scan([sensor.channel for sensor in self.sensors], self.oversample)
+        values = []
+        for sensor in self.sensors:
+            value = raw.get(sensor.channel)
+            values.append(None if value is None else sensor.convert(value))
+        return values
+
+    def close(self):
+        pass
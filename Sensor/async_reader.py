@@ -0,0 +1,70 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from Metrics import registry
+from Metrics.instruments import SENSOR_READ_SECONDS, SENSOR_READ_FAILURES
+
+def timed_read(driver):
+    """driver.read()를 실행하고, 측정이 켜져 있으면 드라이버별 소요 시간과 실패를 기록"""
+    if not registry.enabled:
+        return driver.read()
+    name = type(driver).__name__
+    try:
+        with SENSOR_READ_SECONDS.labels(name).time():
+            result = driver.read()
+    except Exception:
+        SENSOR_READ_FAILURES.labels(name, "error").inc()
+        raise
+    if result is None:
+        SENSOR_READ_FAILURES.labels(name, "no_data").inc()
+    return result
+
+class AsyncSensorReader:
+    """블로킹 센서 드라이버를 제한된 스레드 풀에서 실행하고 읽기마다 마감 시간을 둔다.
+
+    executor를 주면 그것을 쓴다. ThreadPoolExecutor는 인터프리터 종료 때 실행 중인 읽기를
+    기다리므로, 멈춘 DHT11/SPI 읽기가 종료를 붙잡지 않게 하려면 데몬 스레드 풀을 넘긴다.
+    """
+
+    def __init__(self, max_workers=4, timeout=3.0, executor=None):
+        self.timeout = timeout
+        self.executor = executor or ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="sensor")
+        self._inflight = {}
+        self._last_error_time = 0
+        self.error_cooldown = 5
+        self.timeouts = 0
+
+    async def read(self, driver, timeout=None):
+        """driver.read()를 실행하고 마감 시간을 넘기면 None을 반환"""
+        loop = asyncio.get_running_loop()
+        key = id(driver)
+
+        # 이전 읽기가 아직 끝나지 않았으면 (예: 멈춘 DHT11) 새 작업을 쌓지 않고 결과를 공유
+        future = self._inflight.get(key)
+        if future is None or future.done() or future.get_loop() is not loop:
+            future = loop.run_in_executor(self.executor, timed_read, driver)
+            self._inflight[key] = future
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout or self.timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            SENSOR_READ_FAILURES.labels(type(driver).__name__, "timeout").inc()
+            self._log(f"{getattr(driver, 'name', type(driver).__name__)} read timed out")
+            return None
+        except Exception as e:
+            self._log(f"Sensor read error: {e}")
+            return None
+
+    async def read_all(self, drivers, timeout=None):
+        return await asyncio.gather(*(self.read(driver, timeout) for driver in drivers))
+
+    def _log(self, message):
+        current_time = time.time()
+        if current_time - self._last_error_time >= self.error_cooldown:
+            print(message)
+            self._last_error_time = current_time
+
+    def close(self):
+        self._inflight.clear()
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,132 @@
+import itertools
+import os
+from .analog_sensor import SoilMoistureSensor, LightSensor
+from .clock import RealClock, SimClock
+from .dht11 import DHT11
+from .replay import TraceReplay
+from .simulated import (
+    SimulatedADC, SimulatedDHTDevice, DiurnalCurve, DaylightCurve, DryingSoil
+)
+
+class HardwareBackend:
+    """라즈베리파이의 실제 DHT11 / MCP3008"""
+
+    name = "hardware"
+
+    def __init__(self):
+        self.clock = RealClock()
+
+    def create_dht(self):
+        return DHT11()
+
+    def create_soil(self, channel, pot_id=None):
+        return SoilMoistureSensor(channel)
+
+    def create_light(self, channel, pot_id=None):
+        return LightSensor(channel)
+
+class SimulatedBackend:
+    """하드웨어 없이 합성 데이터를 만드는 백엔드. speed로 시간을 가속한다"""
+
+    name = "simulated"
+
+    def __init__(self, speed=1.0, seed=None, error_rate=0.05, dropout_rate=0.01, start=None):
+        self.clock = SimClock(speed, start)
+        self.seed = seed
+        self.error_rate = error_rate
+        self.adc = SimulatedADC(self.clock, dropout_rate=dropout_rate, seed=seed)
+
+    def _seed(self, offset):
+        return None if self.seed is None else self.seed + offset
+
+    def create_dht(self):
+        generation = itertools.count()
+
+        def device_factory(pin):
+            # 재초기화마다 오류 난수 열을 바꾼다 (같은 시드면 같은 오류 구간이 반복됨)
+            offset = 100 * next(generation)
+            return SimulatedDHTDevice(
+                self.clock,
+                temperature=DiurnalCurve(22.0, 4.0, noise=0.3, seed=self._seed(1)),
+                humidity=DiurnalCurve(55.0, -10.0, noise=1.0, seed=self._seed(2)),
+                error_rate=self.error_rate,
+                seed=self._seed(3 + offset),
+            )
+        return DHT11(pin="simulated", device_factory=device_factory)
+
+    def create_soil(self, channel, pot_id=None):
+        # 화분마다 물 주는 시점을 다르게 해 서로 다른 곡선을 만든다
+        model = DryingSoil(start=self.clock.time() - channel * 6 * 3600, seed=self._seed(10 + channel))
+        self.adc.set_channel(channel, model, inverted=True)
+        return SoilMoistureSensor(channel, adc=self.adc)
+
+    def create_light(self, channel, pot_id=None):
+        if channel not in self.adc.channels:
+            self.adc.set_channel(channel, DaylightCurve(seed=self._seed(20 + channel)))
+        return LightSensor(channel, adc=self.adc)
+
+class ReplayBackend(SimulatedBackend):
+    """기록된 CSV/바이너리 트레이스를 재생하는 백엔드"""
+
+    name = "replay"
+
+    def __init__(self, path, speed=1.0, loop=True, start=None):
+        super().__init__(speed=speed, error_rate=0.0, dropout_rate=0.0, start=start)
+        self.adc.noise_counts = 0.0
+        self.path = path
+        self.loop = loop
+        self._replays = {}
+        self._adcs = {None: self.adc}
+
+    def _replay(self, pot_id=None):
+        replay = self._replays.get(pot_id)
+        if replay is None:
+            replay = TraceReplay(self.path, self.clock, pot_id=pot_id, loop=self.loop)
+            self._replays[pot_id] = replay
+        return replay
+
+    def create_dht(self):
+        replay = self._replay()
+
+        def device_factory(pin):
+            return SimulatedDHTDevice(
+                self.clock,
+                temperature=replay.channel('temperature'),
+                humidity=replay.channel('humidity'),
+                error_rate=0.0,
+            )
+        return DHT11(pin="replay", device_factory=device_factory)
+
+    def _adc(self, pot_id=None):
+        # 화분마다 자기 트레이스를 재생하도록 ADC 채널을 (채널, 화분) 단위로 나눈다
+        adc = self._adcs.get(pot_id)
+        if adc is None:
+            adc = SimulatedADC(self.clock, dropout_rate=0.0, noise_counts=0.0)
+            self._adcs[pot_id] = adc
+        return adc
+
+    def create_soil(self, channel, pot_id=None):
+        adc = self._adc(pot_id)
+        adc.set_channel(channel, self._replay(pot_id).channel('soil_moisture'), inverted=True)
+        return SoilMoistureSensor(channel, adc=adc)
+
+    def create_light(self, channel, pot_id=None):
+        adc = self._adc(pot_id)
+        if channel not in adc.channels:
+            adc.set_channel(channel, self._replay(pot_id).channel('light'))
+        return LightSensor(channel, adc=adc)
+
+def create_backend(name=None, **options):
+    """이름으로 센서 백엔드 생성. 지정하지 않으면 PLANT_SENSOR_BACKEND 환경 변수를 따른다"""
+    name = name or os.getenv("PLANT_SENSOR_BACKEND", "hardware")
+    if name == "hardware":
+        return HardwareBackend()
+    speed = options.pop("speed", None) or float(os.getenv("PLANT_SIM_SPEED", "1"))
+    if name == "simulated":
+        return SimulatedBackend(speed=speed, **options)
+    if name == "replay":
+        path = options.pop("path", None) or os.getenv("PLANT_TRACE_FILE")
+        if not path:
+            raise ValueError("Replay backend needs a trace file (PLANT_TRACE_FILE)")
+        return ReplayBackend(path, speed=speed, **options)
+    raise ValueError(f"Unknown sensor backend: {name}")
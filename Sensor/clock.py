@@ -0,0 +1,37 @@
+import asyncio
+import time
+
+class RealClock:
+    speed = 1.0
+
+    def time(self):
+        return time.time()
+
+    def monotonic(self):
+        return time.monotonic()
+
+    async def sleep(self, seconds):
+        await asyncio.sleep(seconds)
+
+    def sleep_sync(self, seconds):
+        time.sleep(seconds)
+
+class SimClock:
+    """speed 배로 흐르는 가상 시계. 예: speed=86400/60 이면 하루가 1분에 지나감"""
+
+    def __init__(self, speed=1.0, start=None):
+        self.speed = float(speed)
+        self.start = time.time() if start is None else start
+        self._t0 = time.monotonic()
+
+    def monotonic(self):
+        return (time.monotonic() - self._t0) * self.speed
+
+    def time(self):
+        return self.start + self.monotonic()
+
+    async def sleep(self, seconds):
+        await asyncio.sleep(seconds / self.speed)
+
+    def sleep_sync(self, seconds):
+        time.sleep(seconds / self.speed)
@@ -1,26 +1,41 @@
-import board
-import adafruit_dht
+import threading
 import time
+from Metrics.instruments import SENSOR_RETRIES, SENSOR_REINITS
 
 class DHT11:
-    def __init__(self, pin=board.D17):
+    def __init__(self, pin=None, device_factory=None):
+        # 하드웨어 라이브러리는 실제 장치를 쓸 때만 불러온다
+        if pin is None and device_factory is None:
+            import board
+            pin = board.D17
         self.pin = pin
+        self.device_factory = device_factory
         self.dht_device = None
         self.init_sensor()
         self._last_error_time = 0
         self.error_cooldown = 5
         self._consecutive_errors = 0
         self.max_consecutive_errors = 3
+        # 여러 화분이 같은 DHT11을 공유하므로 동시 읽기를 막는다
+        self._lock = threading.Lock()
 
     def init_sensor(self):
         try:
             if self.dht_device:
                 self.dht_device.exit()
-            self.dht_device = adafruit_dht.DHT11(self.pin)
+            if self.device_factory is not None:
+                self.dht_device = self.device_factory(self.pin)
+            else:
+                import adafruit_dht
+                self.dht_device = adafruit_dht.DHT11(self.pin)
         except Exception as e:
             print(f"DHT11 initialization error: {e}")
 
     def read(self):
+        with self._lock:
+            return self._read()
+
+    def _read(self):
         if self.dht_device is None:
             self.init_sensor()
             return None
@@ -34,12 +49,15 @@ class DHT11:
         except RuntimeError as err:
             current_time = time.time()
             self._consecutive_errors += 1
+            # DHT11은 체크섬 오류 등으로 자주 실패하고 다음 주기에 다시 읽는다
+            SENSOR_RETRIES.labels("DHT11").inc()
             
             if self._consecutive_errors >= self.max_consecutive_errors:
                 if current_time - self._last_error_time >= self.error_cooldown:
                     print(f"DHT11 Error: {err.args[0]}")
                     self._last_error_time = current_time
                 self.init_sensor()  # 센서 재초기화
+                SENSOR_REINITS.labels("DHT11").inc()
                 self._consecutive_errors = 0
             
             return None
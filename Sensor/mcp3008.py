@@ -0,0 +1,111 @@
+import threading
+import time
+
+DEFAULT_SPEED_HZ = 1000000  # MCP3008: 3.3V에서 최대 약 1.35MHz
+
+class MCP3008Bus:
+    """하나의 SPI 장치를 여러 아날로그 센서가 공유하는 MCP3008 드라이버"""
+
+    _shared = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, bus=0, device=0, max_speed_hz=DEFAULT_SPEED_HZ):
+        self.bus = bus
+        self.device = device
+        self.max_speed_hz = max_speed_hz
+        self.spi = None
+        self._lock = threading.Lock()
+        self._refs = 0
+        # 채널별 명령 프레임을 미리 만들어 둔다 (start bit, single-ended + channel, dummy)
+        self._frames = [[1, (8 + channel) << 4, 0] for channel in range(8)]
+        self._last_error_time = 0
+        self.error_cooldown = 5
+
+    @classmethod
+    def shared(cls, bus=0, device=0, max_speed_hz=None):
+        """(bus, device)마다 하나의 인스턴스를 참조 카운트로 공유.
+
+        max_speed_hz를 주지 않으면 기존 인스턴스의 속도(없으면 기본값)를 따른다.
+        이미 다른 속도로 열린 버스를 다른 속도로 요청하면 ValueError
+        """
+        with cls._shared_lock:
+            adc = cls._shared.get((bus, device))
+            if adc is None:
+                adc = cls(bus, device, max_speed_hz or DEFAULT_SPEED_HZ)
+                cls._shared[(bus, device)] = adc
+            elif max_speed_hz is not None and max_speed_hz != adc.max_speed_hz:
+                raise ValueError(
+                    f"MCP3008 on SPI {bus}.{device} is already shared at {adc.max_speed_hz} Hz "
+                    f"(requested {max_speed_hz} Hz); use set_speed() to change it"
+                )
+            adc._refs += 1
+            return adc
+
+    def open(self):
+        if self.spi is None:
+            import spidev
+            self.spi = spidev.SpiDev()
+            self.spi.open(self.bus, self.device)
+            self.spi.max_speed_hz = self.max_speed_hz
+            self.spi.mode = 0
+        return self
+
+    def set_speed(self, max_speed_hz):
+        with self._lock:
+            self.max_speed_hz = max_speed_hz
+            if self.spi is not None:
+                self.spi.max_speed_hz = max_speed_hz
+
+    def scan(self, channels, oversample=1):
+        """여러 채널을 버스 잠금 한 번으로 읽고 채널마다 oversample 회 평균 (0~1023)
+
+        MCP3008은 변환마다 CS가 해제되어야 하므로 변환 프레임은 개별 전송하지만,
+        프레임 생성과 잠금/열기 비용은 스캔 전체에서 한 번만 든다.
+        """
+        results = {}
+        with self._lock:
+            try:
+                self.open()
+                xfer = self.spi.xfer2
+                for channel in channels:
+                    if channel < 0 or channel > 7:
+                        results[channel] = None
+                        continue
+                    frame = self._frames[channel]
+                    total = 0
+                    for _ in range(oversample):
+                        r = xfer(list(frame))
+                        total += ((r[1] & 3) << 8) + r[2]
+                    results[channel] = total / oversample
+            except Exception as e:
+                current_time = time.time()
+                if current_time - self._last_error_time >= self.error_cooldown:
+                    print(f"Analog sensor error: {e}")
+                    self._last_error_time = current_time
+                for channel in channels:
+                    results.setdefault(channel, None)
+        return results
+
+    def read_channel(self, channel, oversample=1):
+        return self.scan([channel], oversample)[channel]
+
+    def release(self):
+        """shared()로 얻은 참조 하나를 돌려준다. 마지막 참조면 닫는다.
+        shared()로 얻지 않은 인스턴스는 만든 쪽이 close() 하므로 여기서는 아무것도 하지 않는다"""
+        with self._shared_lock:
+            if self._shared.get((self.bus, self.device)) is not self or self._refs <= 0:
+                return
+            self._refs -= 1
+            if self._refs > 0:
+                return
+            del self._shared[(self.bus, self.device)]
+        self.close()
+
+    def close(self):
+        with self._lock:
+            try:
+                if self.spi is not None:
+                    self.spi.close()
+            except:
+                pass
+            self.spi = None
@@ -0,0 +1,100 @@
+import bisect
+import csv
+import struct
+
+SENSOR_CODES = {'temperature': 0, 'humidity': 1, 'soil_moisture': 2, 'light': 3}
+SENSOR_NAMES = {code: name for name, code in SENSOR_CODES.items()}
+
+# 바이너리 트레이스: 헤더 뒤에 (ts: float64, sensor: uint8, value: float32) 레코드
+TRACE_MAGIC = b"PTRC1\n"
+RECORD = struct.Struct("<dBf")
+
+def write_binary_trace(path, rows):
+    """(ts, sensor, value) 목록을 바이너리 트레이스로 저장"""
+    with open(path, "wb") as f:
+        f.write(TRACE_MAGIC)
+        for ts, sensor, value in rows:
+            f.write(RECORD.pack(ts, SENSOR_CODES[sensor], value))
+
+def read_binary_trace(path):
+    with open(path, "rb") as f:
+        if f.read(len(TRACE_MAGIC)) != TRACE_MAGIC:
+            raise ValueError(f"Not a sensor trace file: {path}")
+        data = f.read()
+    usable = len(data) - len(data) % RECORD.size
+    return [
+        (ts, SENSOR_NAMES[code], value)
+        for ts, code, value in RECORD.iter_unpack(data[:usable])
+    ]
+
+def read_csv_trace(path, pot_id=None):
+    """ts,sensor,value[,pot_id] (long) 또는 ts,temperature,humidity,... (wide) 형식"""
+    rows = []
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        for record in reader:
+            if pot_id is not None and record.get("pot_id") not in (None, "", pot_id):
+                continue
+            ts = float(record["ts"])
+            if "sensor" in record:
+                if record["value"] not in (None, ""):
+                    rows.append((ts, record["sensor"], float(record["value"])))
+                continue
+            for sensor in SENSOR_CODES:
+                value = record.get(sensor)
+                if value not in (None, ""):
+                    rows.append((ts, sensor, float(value)))
+    return rows
+
+class TraceReplay:
+    """기록된 트레이스를 시계에 맞춰 재생. loop=True면 끝에서 처음으로 돌아간다"""
+
+    def __init__(self, path, clock, pot_id=None, loop=True):
+        self.clock = clock
+        self.loop = loop
+        if str(path).endswith(".csv"):
+            rows = read_csv_trace(path, pot_id)
+        else:
+            rows = read_binary_trace(path)
+        if not rows:
+            raise ValueError(f"Trace is empty: {path}")
+        rows.sort(key=lambda row: row[0])
+
+        self.series = {}
+        for ts, sensor, value in rows:
+            times, values = self.series.setdefault(sensor, ([], []))
+            times.append(ts)
+            values.append(value)
+
+        self.trace_start = rows[0][0]
+        self.duration = max(rows[-1][0] - self.trace_start, 1.0)
+        self.clock_start = clock.time()
+
+    def trace_time(self, t):
+        offset = t - self.clock_start
+        if self.loop:
+            offset %= self.duration
+        return self.trace_start + offset
+
+    def value_at(self, sensor, t):
+        series = self.series.get(sensor)
+        if series is None:
+            return None
+        times, values = series
+        index = bisect.bisect_right(times, self.trace_time(t)) - 1
+        if index < 0:
+            return None
+        return values[index]
+
+    def channel(self, sensor):
+        return TraceChannel(self, sensor)
+
+class TraceChannel:
+    """TraceReplay의 센서 하나를 값 모델(value(t))로 노출"""
+
+    def __init__(self, replay, sensor):
+        self.replay = replay
+        self.sensor = sensor
+
+    def value(self, t):
+        return self.replay.value_at(self.sensor, t)
@@ -1,22 +1,32 @@
-from collections import defaultdict
-from statistics import mean
 from typing import Dict, Optional
 import time
+from .aggregator import StreamingAggregator
+from .async_reader import AsyncSensorReader, timed_read
+from .analog_sensor import AnalogChannelGroup
+from .clock import RealClock
 
 class SensorManager:
-    def __init__(self, dht_sensor, soil_sensor, light_sensor):
+    def __init__(self, dht_sensor, soil_sensor, light_sensor, pot_id="default", reading_writer=None,
+                 aggregator=None, async_reader=None, clock=None):
         self.dht_sensor = dht_sensor
         self.soil_sensor = soil_sensor
         self.light_sensor = light_sensor
-        self.measurements = defaultdict(list)
+        self.pot_id = pot_id
+        self.reading_writer = reading_writer
+        self.aggregator = aggregator or StreamingAggregator()
+        self.async_reader = async_reader
+        self.clock = clock or RealClock()
+        # 토양/조도 센서가 같은 MCP3008을 쓰면 한 번의 스캔으로 함께 읽는다
+        self.analog_group = None
+        if AnalogChannelGroup.can_group([soil_sensor, light_sensor]):
+            self.analog_group = AnalogChannelGroup([soil_sensor, light_sensor])
         self.averages = {}
         self.retry_count = 3
         self.retry_delay = 2
         self._last_error_time = 0
         self.error_cooldown = 5
 
-    def read_sensors(self) -> Dict[str, Optional[float]]:
-        current_time = time.time()
+    def _build_data(self, dht_result, soil_value, light_value) -> Dict[str, Optional[float]]:
         data = {
             'temperature': None,
             'humidity': None,
@@ -24,46 +34,103 @@ class SensorManager:
             'light': None
         }
         
-        # DHT11 센서 읽기
-        dht_result = self.dht_sensor.read()
+        # DHT11 센서 결과
         if dht_result:
             data['temperature'], data['humidity'] = dht_result
 
-        # 토양 습도 센서 읽기
-        soil_value = self.soil_sensor.read()
+        # 토양 습도 센서 결과
         if soil_value is not None:
             data['soil_moisture'] = soil_value
 
-        # 조도 센서 읽기
-        light_value = self.light_sensor.read()
+        # 조도 센서 결과
         if light_value is not None:
             data['light'] = light_value
 
         return data
 
+    def sampling_channels(self) -> Dict[str, object]:
+        """따로 주기를 정해 읽을 수 있는 채널 이름 -> 드라이버"""
+        channels = {"climate": self.dht_sensor}
+        if self.analog_group is not None:
+            channels["analog"] = self.analog_group
+        else:
+            channels["soil"] = self.soil_sensor
+            channels["light"] = self.light_sensor
+        return channels
+
+    def decode_channel(self, name, raw) -> Dict[str, Optional[float]]:
+        if name == "climate":
+            return self._build_data(raw, None, None)
+        if name == "analog":
+            soil_value, light_value = raw or (None, None)
+            return self._build_data(None, soil_value, light_value)
+        if name == "soil":
+            return self._build_data(None, raw, None)
+        return self._build_data(None, None, raw)
+
+    async def read_channel_async(self, name):
+        """채널 하나의 드라이버만 읽어 원시 결과를 반환"""
+        if self.async_reader is None:
+            self.async_reader = AsyncSensorReader()
+        return await self.async_reader.read(self.sampling_channels()[name])
+
+    def record_channel(self, name, raw) -> Optional[Dict[str, float]]:
+        """채널 읽기 결과를 집계/저장하고 유효한 값만 반환"""
+        return self._record(self.decode_channel(name, raw))
+
+    def read_sensors(self) -> Dict[str, Optional[float]]:
+        if self.analog_group is not None:
+            soil_value, light_value = timed_read(self.analog_group)
+        else:
+            soil_value, light_value = timed_read(self.soil_sensor), timed_read(self.light_sensor)
+        return self._build_data(timed_read(self.dht_sensor), soil_value, light_value)
+
+    async def read_sensors_async(self) -> Dict[str, Optional[float]]:
+        """세 센서를 스레드 풀에서 동시에 읽는다. 느린 DHT11이 다른 센서를 막지 않음"""
+        if self.async_reader is None:
+            self.async_reader = AsyncSensorReader()
+        if self.analog_group is not None:
+            dht_result, analog_values = await self.async_reader.read_all(
+                [self.dht_sensor, self.analog_group]
+            )
+            soil_value, light_value = analog_values or (None, None)
+        else:
+            dht_result, soil_value, light_value = await self.async_reader.read_all(
+                [self.dht_sensor, self.soil_sensor, self.light_sensor]
+            )
+        return self._build_data(dht_result, soil_value, light_value)
+
     def collect_data(self) -> Optional[Dict[str, float]]:
-        data = self.read_sensors()
+        return self._record(self.read_sensors())
+
+    async def collect_data_async(self) -> Optional[Dict[str, float]]:
+        return self._record(await self.read_sensors_async())
+
+    def _record(self, data) -> Optional[Dict[str, float]]:
         valid_data = {k: v for k, v in data.items() if v is not None}
         
         if valid_data:
-            for key, value in valid_data.items():
-                self.measurements[key].append(value)
+            now = self.clock.time()
+            self.aggregator.add_many(valid_data, now)
+            if self.reading_writer is not None:
+                self.reading_writer.add_many(self.pot_id, valid_data, now)
         
         return valid_data if valid_data else None
 
     def calculate_averages(self) -> Dict[str, float]:
         """측정값 평균 계산"""
         try:
-            self.averages = {
-                sensor: mean(values) for sensor, values in self.measurements.items()
-                if values  # Only calculate if there are values
-            }
-            self.measurements.clear()  # Reset measurements after calculating averages
+            self.averages = self.aggregator.means(self.clock.time())
+            self.aggregator.roll()  # tumbling 모드일 때만 창을 비운다
             return self.averages
         except Exception as e:
             print(f"Error calculating averages: {e}")
             return {}
 
+    def get_statistics(self, sensor, window_seconds=None):
+        """평균/분산/최소/최대/EWMA/백분위수 (예: 최근 2분) - 상태를 비우지 않음"""
+        return self.aggregator.stats(sensor, window_seconds, now=self.clock.time())
+
     def close(self):
         """센서 리소스 정리"""
         try:
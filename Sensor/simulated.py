@@ -0,0 +1,145 @@
+import math
+import random
+import threading
+import time
+
+SECONDS_PER_DAY = 86400
+
+def percent_to_raw(percent, inverted=False):
+    """AnalogSensor.convert의 역변환 (0~100% -> 0~1023)"""
+    if inverted:
+        percent = 100 - percent
+    return min(max(percent, 0.0), 100.0) * 1023.0 / 100
+
+def _hour_of_day(t):
+    local = time.localtime(t)
+    return local.tm_hour + local.tm_min / 60.0 + (t % 60) / 3600.0
+
+class DiurnalCurve:
+    """하루 주기 코사인 곡선 + 가우시안 잡음 (온도/습도)"""
+
+    def __init__(self, mean, amplitude, peak_hour=14.0, noise=0.0, seed=None):
+        self.mean = mean
+        self.amplitude = amplitude
+        self.peak_hour = peak_hour
+        self.noise = noise
+        self.rng = random.Random(seed)
+
+    def value(self, t):
+        phase = 2 * math.pi * (_hour_of_day(t) - self.peak_hour) / 24.0
+        return self.mean + self.amplitude * math.cos(phase) + self.rng.gauss(0, self.noise)
+
+class DaylightCurve:
+    """일출~일몰 사이에만 밝아지는 조도 곡선 (0~100%)"""
+
+    def __init__(self, peak=80.0, night=2.0, sunrise=6.0, sunset=19.0, noise=1.0, seed=None):
+        self.peak = peak
+        self.night = night
+        self.sunrise = sunrise
+        self.sunset = sunset
+        self.noise = noise
+        self.rng = random.Random(seed)
+
+    def value(self, t):
+        hour = _hour_of_day(t)
+        level = self.night
+        if self.sunrise <= hour <= self.sunset:
+            fraction = (hour - self.sunrise) / (self.sunset - self.sunrise)
+            level += (self.peak - self.night) * math.sin(math.pi * fraction)
+        return level + self.rng.gauss(0, self.noise)
+
+class DryingSoil:
+    """물을 준 뒤 지수적으로 마르고 watering_interval 마다 다시 젖는 토양 수분 (0~100%)"""
+
+    def __init__(self, wet=70.0, dry=15.0, tau=2 * SECONDS_PER_DAY,
+                 watering_interval=3 * SECONDS_PER_DAY, noise=0.5, start=0.0, seed=None):
+        self.wet = wet
+        self.dry = dry
+        self.tau = tau
+        self.watering_interval = watering_interval
+        self.noise = noise
+        self.start = start
+        self.rng = random.Random(seed)
+
+    def value(self, t):
+        elapsed = (t - self.start) % self.watering_interval
+        level = self.dry + (self.wet - self.dry) * math.exp(-elapsed / self.tau)
+        return level + self.rng.gauss(0, self.noise)
+
+class SimulatedDHTDevice:
+    """adafruit_dht.DHT11 대역. 실제 장치처럼 RuntimeError를 연속으로 일으킨다"""
+
+    def __init__(self, clock, temperature, humidity, error_rate=0.05, max_burst=4, seed=None):
+        self.clock = clock
+        self.temperature_model = temperature
+        self.humidity_model = humidity
+        self.error_rate = error_rate
+        self.max_burst = max_burst
+        self.rng = random.Random(seed)
+        self._burst_remaining = 0
+
+    def _maybe_fail(self):
+        if self._burst_remaining == 0 and self.rng.random() < self.error_rate:
+            self._burst_remaining = self.rng.randint(1, self.max_burst)
+        if self._burst_remaining > 0:
+            self._burst_remaining -= 1
+            raise RuntimeError("Checksum did not validate. Try again.")
+
+    def _sample(self, model):
+        self._maybe_fail()
+        value = model.value(self.clock.time())
+        if value is None:
+            raise RuntimeError("A full buffer was not returned. Try again.")
+        # DHT11 해상도는 1 단위
+        return float(round(value))
+
+    @property
+    def temperature(self):
+        return self._sample(self.temperature_model)
+
+    @property
+    def humidity(self):
+        return self._sample(self.humidity_model)
+
+    def exit(self):
+        pass
+
+class SimulatedADC:
+    """MCP3008Bus 대역. 채널마다 값 모델을 연결해 scan()으로 읽는다"""
+
+    def __init__(self, clock, dropout_rate=0.01, noise_counts=1.0, seed=None):
+        self.clock = clock
+        self.dropout_rate = dropout_rate
+        self.noise_counts = noise_counts
+        self.rng = random.Random(seed)
+        self.channels = {}
+        self._lock = threading.Lock()
+
+    def set_channel(self, channel, model, inverted=False):
+        self.channels[channel] = (model, inverted)
+
+    def scan(self, channels, oversample=1):
+        with self._lock:
+            if self.rng.random() < self.dropout_rate:
+                return {channel: None for channel in channels}
+            now = self.clock.time()
+            results = {}
+            for channel in channels:
+                entry = self.channels.get(channel)
+                value = entry[0].value(now) if entry else None
+                if value is None:
+                    results[channel] = None
+                    continue
+                raw = percent_to_raw(value, entry[1])
+                total = sum(raw + self.rng.gauss(0, self.noise_counts) for _ in range(oversample))
+                results[channel] = min(max(total / oversample, 0.0), 1023.0)
+            return results
+
+    def read_channel(self, channel, oversample=1):
+        return self.scan([channel], oversample)[channel]
+
+    def release(self):
+        pass
+
+    def close(self):
+        pass
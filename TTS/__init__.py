@@ -1 +1,3 @@
-from .tts import TextToSpeech
\ No newline at end of file
+from .tts import TextToSpeech
+from .audio_cache import AudioCache
+from .player import AudioPlayer, PlaybackHandle, PRIORITY_ALERT, PRIORITY_CHAT
\ No newline at end of file
@@ -0,0 +1,118 @@
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+class AudioCache:
+    """(text, lang) 해시로 합성된 음성 파일을 디스크에 저장하는 LRU 캐시"""
+
+    def __init__(self, cache_dir="tts_cache", max_bytes=50 * 1024 * 1024, extension=".mp3"):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.extension = extension
+        self._entries = OrderedDict()  # key -> size (오래 안 쓴 순서)
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+        self._scan()
+
+    @staticmethod
+    def make_key(text, lang):
+        return hashlib.sha256(f"{lang}\0{text}".encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + self.extension)
+
+    def _scan(self):
+        """재시작 시 디스크의 파일을 마지막 접근 시간 순서로 다시 읽는다"""
+        found = []
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if name.endswith(".tmp"):
+                # 중간에 끊긴 쓰기
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+                continue
+            if not name.endswith(self.extension):
+                continue
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            found.append((stat.st_mtime, name[:-len(self.extension)], stat.st_size))
+        for _, key, size in sorted(found):
+            self._entries[key] = size
+            self._total_bytes += size
+        self._evict()
+
+    def get(self, text, lang):
+        """캐시된 MP3 bytes (없으면 None).
+
+        경로를 넘기면 재생하기 전에 다른 스레드의 put()이 파일을 지울 수 있으므로 내용을 읽어 준다
+        """
+        key = self.make_key(text, lang)
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            # mtime을 마지막 사용 시각으로 써서 재시작 후에도 LRU 순서를 유지
+            os.utime(path)
+        except OSError:
+            # 그 사이 지워짐
+            with self._lock:
+                self._total_bytes -= self._entries.pop(key, 0)
+            return None
+        return data
+
+    def put(self, text, lang, data):
+        key = self.make_key(text, lang)
+        path = self._path(key)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+        with self._lock:
+            self._total_bytes -= self._entries.pop(key, 0)
+            self._entries[key] = len(data)
+            self._total_bytes += len(data)
+            self._evict()
+        return path
+
+    def _evict(self):
+        while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+            key, size = self._entries.popitem(last=False)
+            self._total_bytes -= size
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    @property
+    def total_bytes(self):
+        return self._total_bytes
+
+    def __contains__(self, item):
+        text, lang = item
+        return self.make_key(text, lang) in self._entries
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,277 @@
+import itertools
+import os
+import queue
+import shlex
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from Metrics.instruments import PLAYBACK_SECONDS
+
+# 숫자가 작을수록 먼저 재생
+PRIORITY_ALERT = 0
+PRIORITY_CHAT = 1
+_PRIORITY_NAMES = {PRIORITY_ALERT: "alert", PRIORITY_CHAT: "chat"}
+
+class PlaybackHandle:
+    """재생 요청 하나. wait()으로 끝날 때까지 기다리거나 cancel()로 취소"""
+
+    def __init__(self, priority):
+        self.priority = priority
+        self.started_at = None
+        self.finished_at = None
+        self.cancelled = False
+        self._done = threading.Event()
+        self._stop = threading.Event()
+
+    def cancel(self):
+        self.cancelled = True
+        self._stop.set()
+
+    def wait(self, timeout=None):
+        return self._done.wait(timeout)
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+    def _finish(self):
+        self.finished_at = time.time()
+        self._done.set()
+
+class _Item:
+    __slots__ = ("audio", "handle", "gap")
+
+    def __init__(self, audio, handle, gap):
+        self.audio = audio
+        self.handle = handle
+        self.gap = gap
+
+class RemoteDecoder:
+    """mpg123/mpg321 -R (원격 제어 모드) 프로세스 하나를 계속 띄워 두고 LOAD/STOP 명령으로 재생"""
+
+    def __init__(self, command, startup_timeout=1.0):
+        self.command = command
+        self.startup_timeout = startup_timeout
+        self.process = None
+        self._ready = threading.Event()
+        self._stopped = threading.Event()
+
+    def start(self):
+        args = shlex.split(self.command) + ["-R"]
+        if os.path.basename(args[0]) == "mpg321":
+            args.append("remote")  # mpg321은 자리표시 인자가 필요
+        self.process = subprocess.Popen(
+            args, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL, text=True, bufsize=1
+        )
+        threading.Thread(target=self._read_events, daemon=True).start()
+        if not self._ready.wait(self.startup_timeout) or not self.alive:
+            self.close()
+            return False
+        self._send("SILENCE")  # 진행 상황(@F) 출력 끄기
+        return True
+
+    @property
+    def alive(self):
+        return self.process is not None and self.process.poll() is None
+
+    def _read_events(self):
+        process = self.process
+        for line in process.stdout:
+            if line.startswith("@R"):
+                self._ready.set()
+            elif line.startswith("@P 0"):
+                self._stopped.set()
+        # 프로세스 종료
+        self._stopped.set()
+
+    def _send(self, command):
+        self.process.stdin.write(command + "\n")
+        self.process.stdin.flush()
+
+    def play(self, path, stop_event):
+        self._stopped.clear()
+        self._send(f"LOAD {path}")
+        while not self._stopped.wait(0.05):
+            if stop_event.is_set():
+                self._send("STOP")
+                # STOP이 낸 "@P 0"을 여기서 받아 두어야 다음 LOAD에서 그 곡의 끝으로 잘못 읽히지 않는다.
+                # 제때 오지 않으면 나중에 도착해 다음 곡을 끊을 수 있으므로 디코더를 새로 띄우게 닫는다
+                if not self._stopped.wait(1.0):
+                    self.close()
+                return False
+        if not self.alive:
+            raise RuntimeError("audio decoder exited")
+        return True
+
+    def close(self):
+        if self.process is None:
+            return
+        try:
+            if self.alive:
+                self._send("QUIT")
+                self.process.wait(timeout=1)
+        except Exception:
+            pass
+        if self.alive:
+            self.process.kill()
+        self.process = None
+
+class AudioPlayer:
+    """재생 전용 스레드. 메모리의 오디오(bytes)나 파일 경로를 우선순위 큐로 받아 순서대로 재생"""
+
+    def __init__(self, command="mpg321", min_interval=1.0):
+        self.command = command
+        self.min_interval = min_interval
+        self._queue = queue.PriorityQueue()
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._current = None
+        self._decoder = None
+        self._running = False
+        self._thread = None
+        self._last_end = 0
+        self._workdir = None
+
+    def start(self):
+        with self._lock:
+            if self._running:
+                return self
+            self._running = True
+            # 디코더에 넘길 임시 파일은 가능하면 메모리 파일시스템에 둔다
+            shm = "/dev/shm" if os.path.isdir("/dev/shm") else None
+            self._workdir = tempfile.mkdtemp(prefix="tts-play-", dir=shm)
+            self._thread = threading.Thread(target=self._run, name="AudioPlayer", daemon=True)
+            self._thread.start()
+        return self
+
+    def play(self, audio, priority=PRIORITY_CHAT, gap=True, interrupt=False, handle=None):
+        """audio: 파일 경로(str) 또는 MP3 bytes. 즉시 PlaybackHandle을 반환"""
+        self.start()
+        handle = handle or PlaybackHandle(priority)
+        if interrupt:
+            current = self._current
+            if current is not None and current.handle.priority > priority:
+                current.handle.cancel()
+        self._queue.put((priority, next(self._seq), _Item(audio, handle, gap)))
+        return handle
+
+    def stop(self, priority=None):
+        """재생 중이거나 대기 중인 항목 취소 (barge-in). priority가 주어지면 그보다 낮은 우선순위만"""
+        current = self._current
+        if current is not None and (priority is None or current.handle.priority >= priority):
+            current.handle.cancel()
+
+        kept = []
+        while True:
+            try:
+                entry = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            item = entry[2]
+            if item is not None and (priority is None or item.handle.priority >= priority):
+                item.handle.cancel()
+                item.handle._finish()
+            else:
+                kept.append(entry)
+        for entry in kept:
+            self._queue.put(entry)
+
+    @property
+    def busy(self):
+        return self._current is not None or not self._queue.empty()
+
+    def _run(self):
+        while self._running:
+            try:
+                _, _, item = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            if item is None:
+                break
+            if item.handle.cancelled:
+                item.handle._finish()
+                continue
+
+            wait = self.min_interval - (time.time() - self._last_end)
+            if item.gap and wait > 0:
+                item.handle._stop.wait(wait)
+
+            self._current = item
+            try:
+                if not item.handle.cancelled:
+                    item.handle.started_at = time.time()
+                    with PLAYBACK_SECONDS.labels(_PRIORITY_NAMES.get(item.handle.priority, "other")).time():
+                        self._play_item(item)
+            except Exception as e:
+                print(f"Error playing audio: {e}")
+            finally:
+                self._current = None
+                self._last_end = time.time()
+                item.handle._finish()
+
+    def _play_item(self, item):
+        if not self.command:
+            return  # 출력 장치 없음 (null sink)
+
+        path = item.audio
+        temporary = False
+        if isinstance(item.audio, (bytes, bytearray)):
+            fd, path = tempfile.mkstemp(dir=self._workdir, suffix=".mp3")
+            with os.fdopen(fd, "wb") as f:
+                f.write(item.audio)
+            temporary = True
+
+        try:
+            if self._ensure_decoder():
+                try:
+                    self._decoder.play(path, item.handle._stop)
+                    return
+                except Exception as e:
+                    print(f"Audio decoder error: {e}")
+                    self._decoder.close()
+                    self._decoder = None
+            self._play_subprocess(path, item.handle._stop)
+        finally:
+            if temporary:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def _ensure_decoder(self):
+        if self._decoder is False:
+            return False  # 원격 모드를 지원하지 않는 플레이어
+        if self._decoder is not None and self._decoder.alive:
+            return True
+        decoder = RemoteDecoder(self.command)
+        try:
+            started = decoder.start()
+        except OSError:
+            started = False
+        self._decoder = decoder if started else False
+        return started
+
+    def _play_subprocess(self, path, stop_event):
+        process = subprocess.Popen(
+            shlex.split(self.command) + [path], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        while process.poll() is None:
+            if stop_event.wait(0.05):
+                process.terminate()
+                break
+        process.wait()
+
+    def close(self):
+        self.stop()
+        self._running = False
+        self._queue.put((-1, -1, None))
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=1)
+        if self._decoder:
+            self._decoder.close()
+        self._decoder = None
+        if self._workdir:
+            shutil.rmtree(self._workdir, ignore_errors=True)
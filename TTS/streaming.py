@@ -0,0 +1,108 @@
+import queue
+import re
+import threading
+from collections import deque
+
+# 문장 끝: 마침표/물음표/느낌표(뒤에 공백이나 끝) 또는 줄바꿈
+SENTENCE_END = re.compile(r"[.!?。！？]+(?=\s|$)|\n+")
+
+class SentenceChunker:
+    """토큰 스트림을 받아 완성된 문장 단위로 잘라낸다"""
+
+    def __init__(self, min_chars=8):
+        self.min_chars = min_chars
+        self._buffer = ""
+
+    def feed(self, text):
+        self._buffer += text
+        sentences = []
+        start = 0
+        for match in SENTENCE_END.finditer(self._buffer):
+            # 끝 문자가 버퍼 끝이면 다음 토큰에서 이어질 수 있으므로 보류 (예: "3.5")
+            if match.end() == len(self._buffer) and not match.group().startswith("\n"):
+                break
+            candidate = self._buffer[start:match.end()].strip()
+            if len(candidate) < self.min_chars:
+                continue
+            sentences.append(candidate)
+            start = match.end()
+        self._buffer = self._buffer[start:]
+        return sentences
+
+    def flush(self):
+        rest = self._buffer.strip()
+        self._buffer = ""
+        return [rest] if rest else []
+
+_DONE = object()
+
+class StreamingSpeaker:
+    """문장 합성과 재생을 파이프라인으로 돌린다.
+
+    합성 스레드가 다음 문장을 만드는 동안 플레이어가 앞 문장을 재생하고,
+    플레이어에 쌓인 문장 수는 play_queue_size로 제한되어 합성이 너무 앞서가지 않는다.
+    """
+
+    def __init__(self, tts, play_queue_size=2):
+        self.tts = tts
+        self.play_queue_size = play_queue_size
+        self.handles = []
+
+    @property
+    def first_audio_time(self):
+        return self.handles[0].started_at if self.handles else None
+
+    @property
+    def cancelled(self):
+        return any(handle.cancelled for handle in self.handles)
+
+    def speak(self, chunks, on_sentence=None, priority=None):
+        """chunks: 텍스트 조각 iterable (LLM 스트림). 마지막 문장이 재생 큐에 들어가면 반환"""
+        synth_queue = queue.Queue()
+        synth_thread = threading.Thread(
+            target=self._synthesize, args=(synth_queue, priority), daemon=True
+        )
+        synth_thread.start()
+
+        chunker = SentenceChunker()
+        spoken = []
+        try:
+            for chunk in chunks:
+                if self.cancelled:
+                    break
+                for sentence in chunker.feed(chunk):
+                    spoken.append(sentence)
+                    if on_sentence:
+                        on_sentence(sentence)
+                    synth_queue.put(sentence)
+            for sentence in chunker.flush():
+                spoken.append(sentence)
+                if on_sentence:
+                    on_sentence(sentence)
+                synth_queue.put(sentence)
+        finally:
+            synth_queue.put(_DONE)
+            synth_thread.join()
+        return " ".join(spoken)
+
+    def wait(self, timeout=None):
+        return all(handle.wait(timeout) for handle in self.handles)
+
+    def _synthesize(self, synth_queue, priority):
+        pending = deque()
+        while True:
+            sentence = synth_queue.get()
+            if sentence is _DONE:
+                return
+            if self.cancelled:
+                continue  # barge-in 이후 남은 문장은 버린다
+            audio = self.tts.synthesize(sentence)
+            if audio is None:
+                continue
+            while len(pending) >= self.play_queue_size:
+                pending.popleft().wait()
+            kwargs = {} if priority is None else {"priority": priority}
+            # 첫 문장만 최소 발화 간격을 지키고 이어지는 문장은 바로 재생
+            handle = self.tts.play_audio(audio, gap=not self.handles, block=False, **kwargs)
+            self.handles.append(handle)
+            pending.append(handle)
@@ -1,39 +1,156 @@
-from gtts import gTTS
-import os
-import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+import threading
+from Metrics.instruments import TTS_SYNTHESIS_SECONDS, TTS_CACHE_LOOKUPS
+from .player import AudioPlayer, PlaybackHandle, PRIORITY_ALERT, PRIORITY_CHAT
+from .streaming import StreamingSpeaker
+
+gTTS = None  # 처음 합성할 때 import (시작 시간 단축)
+
+def load_gtts():
+    global gTTS
+    if gTTS is None:
+        from gtts import gTTS as cls
+        gTTS = cls
+    return gTTS
 
 class TextToSpeech:
-    def __init__(self, lang="ko"):
+    def __init__(self, lang="ko", player_command="mpg321", audio_cache=None, player=None):
         self.lang = lang
-        self._last_speech_time = 0
-        self.min_interval = 1  # 최소 발화 간격 (초)
+        self.audio_cache = audio_cache
+        # 재생은 상주 플레이어 스레드가 맡고, 합성은 순서를 지키도록 스레드 하나에서 한다
+        self.player = player or AudioPlayer(player_command, min_interval=1)
+        self._synth_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tts")
+        self._pending = set()
+        self._pending_lock = threading.Lock()
 
-    def text_to_speech(self, text, output_file="output.mp3"):
+    @property
+    def player_command(self):
+        return self.player.command
+
+    @player_command.setter
+    def player_command(self, command):
+        self.player.command = command
+
+    @property
+    def min_interval(self):
+        # 최소 발화 간격 (초)
+        return self.player.min_interval
+
+    @min_interval.setter
+    def min_interval(self, seconds):
+        self.player.min_interval = seconds
+
+    def _render(self, text):
+        buffer = BytesIO()
+        with TTS_SYNTHESIS_SECONDS.time():
+            load_gtts()(text=text, lang=self.lang).write_to_fp(buffer)
+        return buffer.getvalue()
+
+    def synthesize(self, text):
+        """MP3 bytes를 반환 (실패 시 None)"""
         try:
-            tts = gTTS(text=text, lang=self.lang)
-            tts.save(output_file)
-            return True
+            if self.audio_cache is not None:
+                audio = self.audio_cache.get(text, self.lang)
+                TTS_CACHE_LOOKUPS.labels("miss" if audio is None else "hit").inc()
+                if audio is None:
+                    audio = self._render(text)
+                    self.audio_cache.put(text, self.lang, audio)
+                return audio
+            return self._render(text)
         except Exception as e:
             print(f"Error generating speech: {e}")
-            return False
+            return None
 
-    def play_audio(self, output_file="output.mp3"):
-        try:
-            current_time = time.time()
-            if current_time - self._last_speech_time < self.min_interval:
-                time.sleep(self.min_interval)
-            
-            os.system(f"mpg321 {output_file}")
-            self._last_speech_time = time.time()
-            return True
-        except Exception as e:
-            print(f"Error playing audio: {e}")
+    def text_to_speech(self, text, output_file="output.mp3"):
+        audio = self.synthesize(text)
+        if audio is None:
             return False
+        with open(output_file, "wb") as f:
+            f.write(audio)
+        return True
 
-    def speak(self, text, output_file="output.mp3"):
-        if self.text_to_speech(text, output_file):
-            if self.play_audio(output_file):
+    def warm_up(self, phrases, background=True):
+        """자주 쓰는 문구를 미리 합성해 캐시에 넣는다"""
+        if self.audio_cache is None:
+            return None
+
+        def render_all():
+            rendered = 0
+            for phrase in dict.fromkeys(phrases):
+                if (phrase, self.lang) in self.audio_cache:
+                    continue
                 try:
-                    os.remove(output_file)
-                except:
-                    pass
+                    self.audio_cache.put(phrase, self.lang, self._render(phrase))
+                    rendered += 1
+                except Exception as e:
+                    print(f"Error pre-rendering speech: {e}")
+                    break
+            if rendered:
+                print(f"Pre-rendered {rendered} phrases")
+
+        if not background:
+            render_all()
+            return None
+        thread = threading.Thread(target=render_all, name="TTSWarmUp", daemon=True)
+        thread.start()
+        return thread
+
+    def play_audio(self, audio, priority=PRIORITY_CHAT, gap=True, block=True, interrupt=False):
+        """audio: 파일 경로 또는 MP3 bytes. block=False면 PlaybackHandle을 바로 반환"""
+        handle = self.player.play(audio, priority=priority, gap=gap, interrupt=interrupt)
+        if block:
+            handle.wait()
+        return handle
+
+    def speak(self, text, priority=PRIORITY_CHAT, block=False, interrupt=False):
+        """합성과 재생을 백그라운드에서 처리하고 PlaybackHandle을 바로 반환"""
+        handle = PlaybackHandle(priority)
+        with self._pending_lock:
+            self._pending.add(handle)
+
+        def synthesize_and_queue():
+            try:
+                audio = None if handle.cancelled else self.synthesize(text)
+                if audio is None or handle.cancelled:
+                    handle._finish()
+                    return
+                self.player.play(audio, priority=priority, interrupt=interrupt, handle=handle)
+            finally:
+                with self._pending_lock:
+                    self._pending.discard(handle)
+
+        try:
+            self._synth_executor.submit(synthesize_and_queue)
+        except RuntimeError:
+            # 종료 중
+            handle.cancel()
+            handle._finish()
+        if block:
+            handle.wait()
+        return handle
+
+    def speak_alert(self, text, block=False):
+        return self.speak(text, priority=PRIORITY_ALERT, block=block)
+
+    def barge_in(self):
+        """사용자가 말을 시작하면 대화 응답 재생을 끊는다 (알림은 유지)"""
+        self.stop(priority=PRIORITY_CHAT)
+
+    def stop(self, priority=None):
+        """재생 중/대기 중인 음성 취소 (barge-in). priority 이하 우선순위만 취소할 수 있다"""
+        with self._pending_lock:
+            pending = list(self._pending)
+        for handle in pending:
+            if priority is None or handle.priority >= priority:
+                handle.cancel()
+        self.player.stop(priority)
+
+    def close(self):
+        self.stop()
+        self._synth_executor.shutdown(wait=False, cancel_futures=True)
+        self.player.close()
+
+    def speak_stream(self, chunks, on_sentence=None, priority=PRIORITY_CHAT):
+        """LLM 토큰 스트림을 문장 단위로 합성하면서 바로바로 재생"""
+        return StreamingSpeaker(self).speak(chunks, on_sentence, priority)
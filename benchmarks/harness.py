@@ -0,0 +1,80 @@
+import asyncio
+import os
+import resource
+import time
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return None
+    index = (len(sorted_values) - 1) * q / 100.0
+    lower = int(index)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    fraction = index - lower
+    return sorted_values[lower] * (1 - fraction) + sorted_values[upper] * fraction
+
+def peak_rss_mb():
+    # Linux에서 ru_maxrss 단위는 KB
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+def current_rss_mb():
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024.0 * 1024.0)
+    except (OSError, ValueError, IndexError):
+        return None
+
+def summarize(latencies, items=None, elapsed=None, **extra):
+    """지연 시간 목록(초)을 p50/p95/p99와 처리량으로 요약"""
+    values = sorted(latencies)
+    elapsed = elapsed if elapsed is not None else sum(values)
+    count = len(values)
+    result = {
+        "iterations": count,
+        "total_s": elapsed,
+        "mean_ms": (sum(values) / count * 1000) if count else None,
+        "p50_ms": _ms(percentile(values, 50)),
+        "p95_ms": _ms(percentile(values, 95)),
+        "p99_ms": _ms(percentile(values, 99)),
+        "max_ms": _ms(values[-1] if values else None),
+        "ops_per_s": count / elapsed if elapsed else None,
+        "peak_rss_mb": peak_rss_mb(),
+        "rss_mb": current_rss_mb(),
+    }
+    if items is not None:
+        result["items"] = items
+        result["items_per_s"] = items / elapsed if elapsed else None
+    result.update(extra)
+    return result
+
+def _ms(value):
+    return None if value is None else value * 1000
+
+def measure(fn, iterations=100, warmup=3, items_per_call=None):
+    for _ in range(warmup):
+        fn()
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - t0)
+    elapsed = time.perf_counter() - start
+    items = items_per_call * iterations if items_per_call else None
+    return summarize(latencies, items=items, elapsed=elapsed)
+
+def measure_async(coro_fn, iterations=10, warmup=1, items_per_call=None):
+    async def run():
+        for _ in range(warmup):
+            await coro_fn()
+        latencies = []
+        start = time.perf_counter()
+        for _ in range(iterations):
+            t0 = time.perf_counter()
+            await coro_fn()
+            latencies.append(time.perf_counter() - t0)
+        return latencies, time.perf_counter() - start
+
+    latencies, elapsed = asyncio.run(run())
+    items = items_per_call * iterations if items_per_call else None
+    return summarize(latencies, items=items, elapsed=elapsed)
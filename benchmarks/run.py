@@ -0,0 +1,678 @@
+"""모니터/음성/DB 경로 벤치마크
+
+    python -m benchmarks.run --output bench.json
+    python -m benchmarks.run --stages monitor,database --pots 1,8,32 --compare old.json
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import types
+
+from .harness import measure, measure_async, summarize
+from .stubs import StubOpenAIServer, StubWhisperModel, StubGTTS, FakeChatBot
+
+SENSORS = ('temperature', 'humidity', 'soil_moisture', 'light')
+PLANTS = ("스킨답서스", "몬스테라", "산세베리아")
+
+def random_sensor_data(rng):
+    return {
+        'temperature': rng.uniform(10, 35),
+        'humidity': rng.uniform(20, 90),
+        'soil_moisture': rng.uniform(5, 80),
+        'light': rng.uniform(0, 100),
+    }
+
+def bench_database(args, workdir):
+    from Database import PlantDatabase
+
+    db = PlantDatabase(os.path.join(workdir, "bench.db"))
+    db.create_tables()
+    rng = random.Random(0)
+    results = {}
+
+    data = random_sensor_data(rng)
+    results["compare_sensor_data"] = measure(
+        lambda: db.compare_sensor_data("스킨답서스", data), iterations=args.iterations * 10
+    )
+
+    for pots in args.pots:
+        names = [PLANTS[i % len(PLANTS)] for i in range(pots)]
+        batch = [random_sensor_data(rng) for _ in range(pots)]
+        results[f"compare_sensor_batch/pots={pots}"] = measure(
+            lambda: db.compare_sensor_batch(names, batch),
+            iterations=args.iterations * 10, items_per_call=pots
+        )
+
+    # 일주일치(10초 간격) 습도로 기간 요약: 롤업 테이블 vs 원본 스캔
+    now = time.time()
+    rows = [(now - 7 * 86400 + i * 10, "pot1", "humidity", rng.uniform(30, 70))
+            for i in range(7 * 8640)]
+    for i in range(0, len(rows), 1000):
+        db.insert_readings(rows[i:i + 1000])
+    week = now - 7 * 86400
+    results["history_summary/week"] = measure(
+        lambda: db.history_summary("pot1", "humidity", week), iterations=args.iterations
+    )
+    results["raw_scan/week"] = measure(
+        lambda: db.fetch_readings("pot1", "humidity", week), iterations=args.iterations
+    )
+
+    # 쓰기 스레드가 계속 저장하는 동안 여러 스레드의 조회 지연 (읽기 전용 풀)
+    import threading
+    stop = threading.Event()
+
+    def keep_writing():
+        ts = now
+        while not stop.is_set():
+            db.insert_readings([(ts + i, "pot2", SENSORS[i % 4], float(i)) for i in range(500)])
+            ts += 500
+
+    day = now - 86400
+    for readers in (1, 4):
+        writer = threading.Thread(target=keep_writing)
+        writer.start()
+        latencies = []
+
+        def read_loop():
+            for _ in range(args.iterations * 20):
+                t0 = time.perf_counter()
+                db.history_summary("pot1", "humidity", day)
+                latencies.append(time.perf_counter() - t0)
+
+        threads = [threading.Thread(target=read_loop) for _ in range(readers)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        stop.set()
+        writer.join()
+        stop.clear()
+        results[f"history_summary_while_writing/readers={readers}"] = summarize(
+            latencies, elapsed=elapsed,
+            connections=db.writer.opened + db.reader.opened,
+        )
+    db.close()
+    return results
+
+def bench_ingest(args, workdir):
+    """목표 초당 측정 수로 ReadingWriter에 넣고 실제 처리율을 본다"""
+    from Database import PlantDatabase, ReadingWriter
+
+    results = {}
+    for rate in args.rates:
+        db = PlantDatabase(os.path.join(workdir, f"ingest_{rate}.db"))
+        db.create_tables()
+        writer = ReadingWriter(db, flush_interval=0.5).start()
+        duration = args.ingest_seconds
+        total = int(rate * duration)
+        interval = 1.0 / rate
+        latencies = []
+        start = time.perf_counter()
+        for i in range(total):
+            target = start + i * interval
+            delay = target - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            t0 = time.perf_counter()
+            writer.add(f"pot{i % 8}", SENSORS[i % 4], float(i))
+            latencies.append(time.perf_counter() - t0)
+        writer.close()
+        elapsed = time.perf_counter() - start
+        results[f"reading_writer/rate={rate}"] = summarize(
+            latencies, items=writer.written, elapsed=elapsed,
+            target_per_s=rate, dropped=writer.dropped
+        )
+        db.close()
+    return results
+
+def bench_catalog(args, workdir):
+    """식물 카탈로그: 일괄 가져오기, 재시작 시 중복, 음성 발화 속 식물 이름 찾기"""
+    from Database import PlantDatabase
+
+    results = {}
+    rng = random.Random(0)
+    syllables = "가나다라마바사아자차카타파하고노도로모보소오조초코토포호리미시지키"
+    for species in (1000, 5000):
+        db = PlantDatabase(os.path.join(workdir, f"catalog_{species}.db"))
+        for _ in range(3):
+            db.create_tables()  # 재시작 세 번
+        profiles = []
+        for i in range(species):
+            name = "".join(rng.choice(syllables) for _ in range(rng.randint(3, 6))) + f"{i}"
+            profiles.append({
+                "name": name, "aliases": [name[:3] + "풀" + f"{i}"],
+                "ideal_temperature_min": 15.0, "ideal_temperature_max": 28.0,
+            })
+        start = time.perf_counter()
+        db.upsert_plants(profiles)
+        import_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        entries = len(db.catalog)
+        index_seconds = time.perf_counter() - start
+
+        # Whisper가 한 글자 틀린 발화
+        utterance = "지니 이 화분 몬스테나로 바꿔줘"
+        results[f"find_in_text/species={species}"] = measure(
+            lambda: db.catalog.find_in_text(utterance), iterations=args.iterations * 10
+        )
+        results[f"find_in_text/species={species}"].update(
+            import_ms=import_seconds * 1000, index_ms=index_seconds * 1000, entries=entries,
+            plants=len(db.fetch_all_data()), match=db.catalog.find_in_text(utterance)[0],
+        )
+        db.close()
+    return results
+
+def _build_monitor(pot_count, workdir, seed=0):
+    from Database import PlantDatabase
+    from Monitor import PlantMonitor, Pot
+    from Sensor import SensorManager, SimulatedBackend, AsyncSensorReader
+
+    backend = SimulatedBackend(seed=seed)
+    reader = AsyncSensorReader()
+    dht = backend.create_dht()
+    db = PlantDatabase(os.path.join(workdir, f"monitor_{pot_count}.db"))
+    db.create_tables()
+    pots = []
+    for i in range(pot_count):
+        pot_id = f"pot{i}"
+        manager = SensorManager(
+            dht, backend.create_soil(i % 8, pot_id), backend.create_light(7, pot_id),
+            pot_id=pot_id, async_reader=reader, clock=backend.clock
+        )
+        pots.append(Pot(pot_id, PLANTS[i % len(PLANTS)], manager))
+    # 대기 시간 없이 샘플링/평가 비용만 잰다
+    monitor = PlantMonitor(pots, db, FakeChatBot(), sample_interval=0, clock=backend.clock)
+    return monitor, reader, db
+
+def bench_monitor(args, workdir):
+    results = {}
+    for pot_count in args.pots:
+        monitor, reader, db = _build_monitor(pot_count, workdir)
+        samples = pot_count * monitor.samples_per_cycle * len(SENSORS)
+        result = measure_async(
+            monitor.monitor_cycle, iterations=args.iterations, items_per_call=samples
+        )
+        result["llm_calls"] = monitor.chatbot.calls
+        results[f"monitor_cycle/pots={pot_count}"] = result
+        reader.close()
+        db.close()
+    return results
+
+def bench_scheduler(args, workdir):
+    """시뮬레이션 시간 6시간 동안 고정 주기 vs 적응형 주기의 센서 읽기 수"""
+    from Database import PlantDatabase
+    from Monitor import PlantMonitor, Pot
+    from Sensor import SensorManager, SimulatedBackend, AsyncSensorReader
+
+    hours = 6
+    results = {}
+    for adaptive in (False, True):
+        backend = SimulatedBackend(speed=2000, seed=0)
+        reader = AsyncSensorReader()
+        db = PlantDatabase(os.path.join(workdir, f"scheduler_{adaptive}.db"))
+        db.create_tables()
+        manager = SensorManager(
+            backend.create_dht(), backend.create_soil(0, "pot0"), backend.create_light(7, "pot0"),
+            pot_id="pot0", async_reader=reader, clock=backend.clock
+        )
+        monitor = PlantMonitor(
+            [Pot("pot0", PLANTS[0], manager)], db, FakeChatBot(), clock=backend.clock, adaptive=adaptive
+        )
+        cycles = int(hours * 3600 / monitor.cycle_seconds)
+
+        async def run():
+            for _ in range(cycles):
+                await monitor.monitor_cycle()
+
+        start = time.perf_counter()
+        asyncio.run(run())
+        elapsed = time.perf_counter() - start
+        name = "adaptive" if adaptive else "fixed"
+        results[f"{name}/{hours}h"] = summarize(
+            [elapsed], items=monitor.scheduler.reads, elapsed=elapsed,
+            sensor_reads=monitor.scheduler.reads, cycles=cycles,
+            streams=monitor.scheduler.summary(),
+        )
+        reader.close()
+        db.close()
+    return results
+
+def bench_alerts(args, workdir):
+    """하루(2분 주기) 동안 임계값 근처에서 흔들리는 측정값: 매 주기 알림 vs 경보 상태 기계"""
+    from Database import PlantDatabase
+    from Monitor import PlantMonitor, Pot
+
+    db = PlantDatabase(os.path.join(workdir, "alerts.db"))
+    db.create_tables()
+    rng = random.Random(0)
+    cycle = 120
+    series = []
+    for i in range(86400 // cycle):
+        hour = i * cycle / 3600.0
+        series.append({
+            # 밤에 잠깐 최저 온도(18도) 아래로, 토양 수분은 하한(40) 근처에서 흔들리다 오후에 마른다
+            'temperature': 22.0 + 5.0 * math.cos((hour - 15) / 24 * 2 * math.pi) + rng.gauss(0, 0.4),
+            'humidity': 55.0 + rng.gauss(0, 3.0),
+            'soil_moisture': (34.0 if 13 <= hour < 17 else 41.0) + rng.gauss(0, 1.5),
+            'light': 1200.0 + rng.gauss(0, 100.0),
+        })
+
+    results = {}
+    for gated in (False, True):
+        chatbot = FakeChatBot()
+        pot = Pot("pot0", PLANTS[0], None)
+        monitor = PlantMonitor([pot], db, chatbot)
+        latencies = []
+        start = time.perf_counter()
+        for i, data in enumerate(series):
+            t0 = time.perf_counter()
+            comparisons = db.compare_sensor_batch([pot.plant_name], [data])[0]
+            if gated:
+                bounds = monitor.scheduler.plant_bounds(pot.plant_name)
+                events = monitor.alerts.update(pot.pot_id, data, comparisons, bounds, i * cycle)
+                if events:
+                    monitor.notify(pot, data, comparisons, events)
+            else:
+                # 이전 동작: 매 주기 판정대로 묻고 말한다
+                label = monitor.pot_label(pot)
+                prompt = monitor.generate_status_prompt(data, comparisons, label)
+                if prompt == monitor.all_clear_message(label):
+                    chatbot.tts.speak_alert(prompt)
+                else:
+                    chatbot.tts.speak_alert(chatbot.ask_openai(prompt))
+            latencies.append(time.perf_counter() - t0)
+        elapsed = time.perf_counter() - start
+        name = "state_machine" if gated else "every_cycle"
+        results[f"{name}/24h"] = summarize(
+            latencies, items=len(series), elapsed=elapsed,
+            llm_calls=chatbot.calls, spoken=chatbot.tts.spoken,
+        )
+    db.close()
+    return results
+
+def bench_gateway(args, workdir):
+    """localhost에서 여러 노드 -> 수집기 처리율, 수집기 장애 뒤 재전송"""
+    import socket
+    from Database import PlantDatabase
+    from Gateway import IngestCollector, NodeForwarder
+
+    def new_db(name):
+        db = PlantDatabase(os.path.join(workdir, name))
+        db.create_tables()
+        return db
+
+    def free_udp_port():
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            sock.bind(("127.0.0.1", 0))
+            return sock.getsockname()[1]
+
+    results = {}
+    per_node = 20000
+    for scheme in ("udp", "http"):
+        for nodes_count in args.nodes:
+            db = new_db(f"gateway_{scheme}_{nodes_count}.db")
+            collector = IngestCollector(
+                db, host="127.0.0.1", udp_port=0 if scheme == "udp" else None,
+                http_port=0 if scheme == "http" else None
+            ).start()
+            port = collector.udp_port if scheme == "udp" else collector.http_port
+            nodes = [
+                NodeForwarder(f"{scheme}://127.0.0.1:{port}", node_id=f"node{i}", flush_interval=0.2).start()
+                for i in range(nodes_count)
+            ]
+            start = time.perf_counter()
+            for k in range(per_node):
+                for node in nodes:
+                    node.add(f"pot{k % 4}", SENSORS[k % 4], float(k), ts=1000.0 + k)
+            for node in nodes:
+                node.close(timeout=30)
+            collector.wait_idle(timeout=30)
+            elapsed = time.perf_counter() - start
+            stats = collector.stats()
+            collector.close()
+            db.close()
+            results[f"{scheme}/nodes={nodes_count}"] = summarize(
+                [elapsed], items=stats["written"], elapsed=elapsed,
+                expected=per_node * nodes_count, frames=stats["frames"],
+                duplicates=stats["duplicates"], rejected=stats["rejected"],
+                retransmits=sum(node.retransmits for node in nodes),
+            )
+
+    # 수집기가 꺼진 동안 쌓인 프레임을 다시 켜진 뒤 모두 한 번씩만 저장하는지
+    db = new_db("gateway_outage.db")
+    port = free_udp_port()
+    node = NodeForwarder(
+        f"udp://127.0.0.1:{port}", node_id="node0", batch_size=100, flush_interval=0.1, max_backoff=0.5
+    ).start()
+    rows = 5000
+    for k in range(rows):
+        node.add("pot0", SENSORS[k % 4], float(k), ts=1000.0 + k)
+    time.sleep(1.0)
+    start = time.perf_counter()
+    collector = IngestCollector(db, host="127.0.0.1", udp_port=port).start()
+    delivered = node.flush(timeout=30)
+    collector.wait_idle(timeout=30)
+    elapsed = time.perf_counter() - start
+    node.close()
+    stats = collector.stats()
+    collector.close()
+    db.close()
+    results["udp/outage_replay"] = summarize(
+        [elapsed], items=stats["written"], elapsed=elapsed, expected=rows, delivered=delivered,
+        duplicates=stats["duplicates"], retransmits=node.retransmits,
+    )
+    return results
+
+def bench_chatbot(args, workdir):
+    import openai
+    from Chatbot import ChatBot
+
+    server = StubOpenAIServer(latency=args.llm_latency).start()
+    openai.api_base = server.url
+    os.environ["OPENAI_API_KEY"] = "bench"
+    try:
+        chatbot = ChatBot(stt=None, tts=None)
+        result = measure(
+            lambda: chatbot.ask_openai("스킨답서스의 토양 수분가 너무 낮습니다"),
+            iterations=args.iterations * 2
+        )
+        result["server_requests"] = server.requests
+        return {"ask_openai": result}
+    finally:
+        server.stop()
+
+def bench_voice_stream(args, workdir):
+    """스트리밍 응답의 첫 음성까지 시간(TTFA)과 전체 시간을 비스트리밍과 비교"""
+    import openai
+    import TTS.tts as tts_module
+    from Chatbot import ChatBot
+    from TTS import TextToSpeech
+    from TTS.streaming import StreamingSpeaker
+
+    server = StubOpenAIServer(latency=args.llm_latency).start()
+    openai.api_base = server.url
+    os.environ["OPENAI_API_KEY"] = "bench"
+    tts_module.gTTS = StubGTTS
+    tts = TextToSpeech(player_command="true")
+    tts.min_interval = 0
+    try:
+        chatbot = ChatBot(stt=None, tts=tts)
+        question = "스킨답서스 잎이 노랗게 변했어요"
+        first_audio = []
+
+        def streamed():
+            chatbot.reset_message_history()
+            start = time.time()
+            speaker = StreamingSpeaker(tts)
+            speaker.speak(chatbot.stream_openai(question))
+            speaker.wait()
+            if speaker.first_audio_time:
+                first_audio.append(speaker.first_audio_time - start)
+
+        def serial():
+            chatbot.reset_message_history()
+            tts.speak(chatbot.ask_openai(question), block=True)
+
+        streamed_result = measure(streamed, iterations=args.iterations, warmup=1)
+        ttfa = sorted(first_audio[1:]) or [0.0]
+        streamed_result["ttfa_p50_ms"] = ttfa[len(ttfa) // 2] * 1000
+        return {
+            "speak_stream": streamed_result,
+            "serial": measure(serial, iterations=args.iterations, warmup=1),
+        }
+    finally:
+        tts.close()
+        server.stop()
+
+def _make_audio(seconds=5, seed=0):
+    import numpy as np
+    rng = np.random.default_rng(seed)
+    return (rng.standard_normal(int(16000 * seconds)) * 0.01).astype("float32")
+
+def bench_stt(args, workdir):
+    from STT import SpeechToText
+
+    stt = SpeechToText(model_size=args.whisper_model or "base")
+    if args.whisper_model:
+        stt.load_model()
+    else:
+        stt.model = StubWhisperModel()
+    audio = _make_audio()
+    results = {"transcribe_audio": measure(
+        lambda: stt.transcribe_audio(audio), iterations=args.iterations, warmup=1
+    )}
+    if args.whisper_model:
+        # 같은 모델을 워커 프로세스에서 (공유 메모리로 오디오 전달)
+        from STT import WhisperWorker
+        worker = SpeechToText(worker=WhisperWorker(model_size=args.whisper_model))
+        try:
+            worker.load_model()
+            results["transcribe_worker"] = measure(
+                lambda: worker.transcribe_audio(audio), iterations=args.iterations, warmup=1
+            )
+        finally:
+            worker.close()
+    return results
+
+def bench_wake(args, workdir):
+    """상시 청취 전단: 1분 오디오(대부분 무음)에서 VAD/호출어 검출 비용과 Whisper 호출 수"""
+    import numpy as np
+    from STT.frontend import VoiceFrontEnd, TemplateKeywordSpotter
+
+    sr = 16000
+    rng = np.random.default_rng(0)
+    t = np.arange(int(sr * 0.6)) / sr
+    keyword = (0.3 * np.sin(2 * np.pi * (300 * t + 500 * t * t))).astype("float32")
+    audio = (rng.standard_normal(sr * 60) * 0.001).astype("float32")
+    for offset in (10, 30, 50):
+        audio[offset * sr:offset * sr + len(keyword)] += keyword
+
+    spotter = TemplateKeywordSpotter(path=None)
+    spotter.enroll(keyword)
+    front_end = None
+
+    def run():
+        nonlocal front_end
+        front_end = VoiceFrontEnd(spotter=spotter)
+        # 오디오 콜백과 같은 30ms 블록 단위로 넣는다
+        for i in range(0, len(audio), front_end.frame_len):
+            front_end.feed(audio[i:i + front_end.frame_len])
+        while front_end.wait_for_keyword(timeout=0) is not None:
+            pass
+
+    result = measure(run, iterations=args.iterations, warmup=1)
+    result["realtime_factor"] = result["p50_ms"] / 1000 / 60
+    result["spotter_calls"] = front_end.spotter_calls
+    # 기존 방식은 5초마다 Whisper 전체 인식
+    result["whisper_calls_before"] = 60 // 5
+    return {"frontend_60s": result}
+
+def bench_tts(args, workdir):
+    import TTS.tts as tts_module
+    from TTS import TextToSpeech
+
+    tts_module.gTTS = StubGTTS
+    tts = TextToSpeech(player_command="true")
+    tts.min_interval = 0
+    try:
+        return {"speak": measure(
+            lambda: tts.speak("스킨답서스의 모든 환경이 적정 범위 내에 있습니다.", block=True),
+            iterations=args.iterations
+        )}
+    finally:
+        tts.close()
+
+def bench_pipeline(args, workdir):
+    """IoTPlantSystem 전체: 시뮬레이션 센서 + 스텁 OpenAI + 가짜 Whisper/gTTS + 무음 출력"""
+    import openai
+    import STT.stt as stt_module
+    import TTS.tts as tts_module
+    from Core import IoTPlantSystem
+    from Sensor import SimulatedBackend
+
+    server = StubOpenAIServer(latency=args.llm_latency).start()
+    openai.api_base = server.url
+    os.environ["OPENAI_API_KEY"] = "bench"
+    tts_module.gTTS = StubGTTS
+    whisper_module = stt_module.whisper
+    worker_mode = os.environ.get("PLANT_STT_WORKER")
+    if not args.whisper_model:
+        # 스텁 모델은 워커 프로세스로 넘길 수 없으므로 같은 프로세스에서
+        os.environ["PLANT_STT_WORKER"] = "inline"
+        # 시스템 시작 시 백그라운드 warm-up이 실제 모델을 받지 않도록
+        stt_module.whisper = types.SimpleNamespace(load_model=lambda *a, **kw: StubWhisperModel())
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    system = None
+    try:
+        system = IoTPlantSystem(
+            pot_configs=[
+                {"pot_id": f"pot{i}", "plant": PLANTS[i % len(PLANTS)], "soil_channel": i % 8, "light_channel": 7}
+                for i in range(max(args.pots))
+            ],
+            sensor_backend=SimulatedBackend(seed=0),
+        )
+        if not system.running:
+            raise RuntimeError("IoTPlantSystem failed to initialize")
+        system.plant_monitor.sample_interval = 0
+        system.stt.warm_up().join()  # 시작 시 띄운 모델 준비가 끝날 때까지
+        system.tts.player_command = "true"
+        system.tts.min_interval = 0
+        audio = _make_audio()
+
+        def voice_turn():
+            text = system.stt.transcribe_audio(audio)
+            answer = system.chatbot.ask_openai(text)
+            system.tts.speak(answer, block=True)
+
+        return {
+            "monitor_cycle": measure_async(system.plant_monitor.monitor_cycle, iterations=args.iterations),
+            "voice_turn": measure(voice_turn, iterations=args.iterations),
+        }
+    finally:
+        if system is not None:
+            system.stop()
+        stt_module.whisper = whisper_module
+        if worker_mode is None:
+            os.environ.pop("PLANT_STT_WORKER", None)
+        else:
+            os.environ["PLANT_STT_WORKER"] = worker_mode
+        os.chdir(cwd)
+        server.stop()
+
+STAGES = {
+    "database": bench_database,
+    "ingest": bench_ingest,
+    "catalog": bench_catalog,
+    "monitor": bench_monitor,
+    "scheduler": bench_scheduler,
+    "alerts": bench_alerts,
+    "gateway": bench_gateway,
+    "chatbot": bench_chatbot,
+    "stt": bench_stt,
+    "wake": bench_wake,
+    "tts": bench_tts,
+    "voice_stream": bench_voice_stream,
+    "pipeline": bench_pipeline,
+}
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+def compare(current, baseline_path):
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)["results"]
+    print(f"\n{'benchmark':<45} {'p50 ms':>20} {'p95 ms':>20}")
+    for stage, cases in current.items():
+        for case, result in cases.items():
+            old = baseline.get(stage, {}).get(case)
+            if not isinstance(result, dict) or not isinstance(old, dict):
+                continue
+            cells = []
+            for key in ("p50_ms", "p95_ms"):
+                new_value, old_value = result.get(key), old.get(key)
+                if new_value is None or not old_value:
+                    cells.append(f"{'-':>20}")
+                    continue
+                change = (new_value - old_value) / old_value * 100
+                cells.append(f"{new_value:>10.2f} ({change:+6.1f}%)")
+            print(f"{stage + '/' + case:<45} {cells[0]} {cells[1]}")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="IoT-Plant benchmarks")
+    parser.add_argument("--stages", default=",".join(STAGES), help="comma separated stage names")
+    parser.add_argument("--pots", default="1,4,8,32", help="pot counts to scale over")
+    parser.add_argument("--rates", default="100,1000,5000", help="readings per second for the ingest stage")
+    parser.add_argument("--ingest-seconds", type=float, default=2.0)
+    parser.add_argument("--nodes", default="1,4,16", help="simulated sensor nodes for the gateway stage")
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="simulated OpenAI latency in seconds")
+    parser.add_argument("--whisper-model", default=None, help="load a real Whisper model (e.g. tiny) instead of the stub")
+    parser.add_argument("--output", default=None, help="write results as JSON")
+    parser.add_argument("--compare", default=None, help="baseline JSON to compare against")
+    args = parser.parse_args(argv)
+    args.stages = [stage.strip() for stage in args.stages.split(",") if stage.strip()]
+    args.pots = [int(value) for value in args.pots.split(",")]
+    args.rates = [int(value) for value in args.rates.split(",")]
+    args.nodes = [int(value) for value in args.nodes.split(",")]
+    return args
+
+def main(argv=None):
+    args = parse_args(argv)
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="plant-bench-") as workdir:
+        for stage in args.stages:
+            bench = STAGES.get(stage)
+            if bench is None:
+                print(f"Unknown stage: {stage}")
+                continue
+            print(f"[{stage}] running...")
+            try:
+                results[stage] = bench(args, workdir)
+            except ImportError as e:
+                # 선택 의존성이 없으면 건너뛴다 (예: whisper, openai)
+                results[stage] = {"skipped": f"missing dependency: {e}"}
+            except Exception as e:
+                results[stage] = {"error": f"{type(e).__name__}: {e}"}
+            for case, result in results[stage].items():
+                if isinstance(result, dict) and result.get("p50_ms") is not None:
+                    print(f"  {case:<40} p50={result['p50_ms']:.2f}ms p95={result['p95_ms']:.2f}ms "
+                          f"p99={result['p99_ms']:.2f}ms rss={result['peak_rss_mb']:.0f}MB")
+                else:
+                    print(f"  {case}: {result}")
+
+    report = {
+        "meta": {
+            "revision": git_revision(),
+            "timestamp": time.time(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "args": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"Results written to {args.output}")
+    if args.compare:
+        compare(results, args.compare)
+    return report
+
+if __name__ == "__main__":
+    main()
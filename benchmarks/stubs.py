@@ -0,0 +1,141 @@
+"""벤치마크용 로컬 대역: OpenAI 스텁 서버, 가짜 Whisper/gTTS, 가짜 챗봇"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_ANSWER = "토양이 말라 있으니 물을 충분히 주세요. 직사광선은 피해 주세요."
+
+class StubOpenAIServer:
+    """/v1/chat/completions 를 흉내내는 로컬 HTTP 서버 (stream=True 지원)"""
+
+    def __init__(self, answer=DEFAULT_ANSWER, latency=0.0, host="127.0.0.1", port=0):
+        self.answer = answer
+        self.latency = latency
+        self.requests = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                server.requests += 1
+                if server.latency:
+                    time.sleep(server.latency)
+                if body.get("stream"):
+                    self._stream(body)
+                else:
+                    self._complete(body)
+
+            def _complete(self, body):
+                payload = json.dumps({
+                    "id": "chatcmpl-stub",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": body.get("model", "stub"),
+                    "choices": [{
+                        "index": 0,
+                        "message": {"role": "assistant", "content": server.answer},
+                        "finish_reason": "stop",
+                    }],
+                    "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+                }).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def _stream(self, body):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                for token in server.answer.split(" "):
+                    chunk = {
+                        "id": "chatcmpl-stub",
+                        "object": "chat.completion.chunk",
+                        "created": int(time.time()),
+                        "model": body.get("model", "stub"),
+                        "choices": [{"index": 0, "delta": {"content": token + " "}, "finish_reason": None}],
+                    }
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.close_connection = True
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+class StubWhisperModel:
+    """whisper 모델 대역. 오디오 길이에 비례한 지연만 흉내낸다"""
+
+    def __init__(self, text="지니 오늘 물 줘야 해?", seconds_per_audio_second=0.0):
+        self.text = text
+        self.seconds_per_audio_second = seconds_per_audio_second
+
+    def transcribe(self, audio, **kwargs):
+        if self.seconds_per_audio_second and hasattr(audio, "__len__"):
+            time.sleep(len(audio) / 16000 * self.seconds_per_audio_second)
+        return {"text": self.text}
+
+class StubGTTS:
+    """gTTS 대역. 네트워크 없이 작은 MP3 프레임을 기록한다"""
+
+    FRAME = b"\xff\xfb\x90\x64" + b"\x00" * 413
+
+    def __init__(self, text, lang="ko", **kwargs):
+        self.text = text
+        self.lang = lang
+
+    def write_to_fp(self, fp):
+        # 대략 글자 수에 비례한 길이의 오디오
+        fp.write(self.FRAME * max(1, len(self.text) // 4))
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            self.write_to_fp(f)
+
+class NullTTS:
+    def __init__(self):
+        self.spoken = 0
+
+    def speak(self, text, *args, **kwargs):
+        self.spoken += 1
+
+    def speak_alert(self, text, *args, **kwargs):
+        self.speak(text)
+
+class FakeChatBot:
+    """PlantMonitor용 챗봇 대역 (API 호출 없이 즉시 응답)"""
+
+    def __init__(self, answer=DEFAULT_ANSWER, latency=0.0):
+        self.answer = answer
+        self.latency = latency
+        self.tts = NullTTS()
+        self.calls = 0
+
+    def ask_openai(self, question, *args, **kwargs):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return self.answer
@@ -0,0 +1,102 @@
+import asyncio
+import time
+
+from Monitor import PlantMonitor, Pot
+from Monitor.alerts import AlertTracker, ABOVE, BELOW, OK, RAISED, REMINDER, CLEARED
+
+BOUNDS = {"humidity": (40.0, 70.0)}
+
+def step(tracker, value, status, now):
+    return tracker.update("pot1", {"humidity": value}, {"humidity": status}, BOUNDS, now)
+
+def kinds(events):
+    return [event.kind for event in events]
+
+def test_raise_waits_for_dwell():
+    tracker = AlertTracker(raise_dwell=60, clear_dwell=180)
+    assert step(tracker, 35, BELOW, 0) == []
+    assert step(tracker, 35, BELOW, 30) == []
+    events = step(tracker, 35, BELOW, 60)
+    assert kinds(events) == [RAISED]
+    assert events[0].state == BELOW
+    assert tracker.active("pot1") == {"humidity": BELOW}
+
+def test_short_excursion_is_ignored():
+    tracker = AlertTracker(raise_dwell=60)
+    step(tracker, 35, BELOW, 0)
+    assert step(tracker, 50, OK, 30) == []
+    assert step(tracker, 35, BELOW, 70) == []  # 유지 시간을 처음부터 다시 잰다
+    assert tracker.active("pot1") == {}
+
+def test_hysteresis_holds_alarm_near_threshold():
+    tracker = AlertTracker(raise_dwell=0, clear_dwell=0)
+    assert kinds(step(tracker, 35, BELOW, 0)) == [RAISED]
+    # 최소값(40)은 넘었지만 범위 폭의 10%(3) 안쪽으로 들어오지 않았다
+    assert step(tracker, 41, OK, 10) == []
+    assert tracker.active("pot1") == {"humidity": BELOW}
+    assert kinds(step(tracker, 44, OK, 20)) == [CLEARED]
+    assert tracker.active("pot1") == {}
+
+def test_reminders_back_off():
+    tracker = AlertTracker(raise_dwell=0, reminder_interval=100, reminder_backoff=2,
+                           max_reminder_interval=1000)
+    times = []
+    for now in range(0, 800, 10):
+        if step(tracker, 80, ABOVE, now):
+            times.append(now)
+    assert times == [0, 100, 300, 700]
+    assert kinds(step(tracker, 80, ABOVE, 1500)) == [REMINDER]
+
+def test_cooldown_delays_repeat_raise():
+    tracker = AlertTracker(raise_dwell=0, clear_dwell=0, cooldown=600)
+    assert kinds(step(tracker, 35, BELOW, 0)) == [RAISED]
+    assert kinds(step(tracker, 55, OK, 10)) == [CLEARED]
+    assert step(tracker, 35, BELOW, 20) == []
+    assert kinds(step(tracker, 35, BELOW, 600)) == [RAISED]
+
+def test_no_data_keeps_state_and_reset_forgets():
+    tracker = AlertTracker(raise_dwell=0)
+    step(tracker, 35, BELOW, 0)
+    assert tracker.update("pot1", {}, {"humidity": "no_data"}, BOUNDS, 10) == []
+    assert tracker.active("pot1") == {"humidity": BELOW}
+    tracker.reset("pot1")
+    assert tracker.active("pot1") == {}
+
+class _SlowChatBot:
+    def __init__(self):
+        self.tts = self
+        self.spoken = []
+
+    def ask_openai(self, text, cache_key=None, channel="chat"):
+        time.sleep(0.3)  # OpenAI 왕복
+        return "물을 주세요"
+
+    def speak_alert(self, text):
+        self.spoken.append(text)
+
+def test_monitor_cycle_asks_llm_off_the_event_loop(monkeypatch):
+    chatbot = _SlowChatBot()
+    monitor = PlantMonitor([Pot("pot1", "스킨답서스", None)], None, chatbot, sample_interval=0)
+
+    async def no_sample():
+        pass
+    monkeypatch.setattr(monitor, "sample", no_sample)
+    monkeypatch.setattr(monitor, "evaluate", lambda: [])
+    monkeypatch.setattr(monitor, "check_alerts", lambda results: [("ask", "상태", None)])
+
+    async def run():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        await monitor.monitor_cycle()
+        task.cancel()
+        return ticks
+
+    assert asyncio.run(run()) >= 10
+    assert chatbot.spoken == ["물을 주세요"]
@@ -0,0 +1,53 @@
+import asyncio
+import subprocess
+import sys
+import textwrap
+import time
+from pathlib import Path
+
+from Sensor import AsyncSensorReader
+
+class _Driver:
+    def __init__(self, value=None, delay=0.0):
+        self.value = value
+        self.delay = delay
+        self.calls = 0
+
+    def read(self):
+        self.calls += 1
+        time.sleep(self.delay)
+        return self.value
+
+def test_timed_out_read_is_shared_not_restarted():
+    reader = AsyncSensorReader(timeout=0.05)
+    driver = _Driver(value=1, delay=0.3)
+
+    async def run():
+        assert await reader.read(driver) is None
+        assert await reader.read(driver) is None
+        return await reader.read(driver, timeout=1.0)
+
+    assert asyncio.run(run()) == 1
+    assert driver.calls == 1 and reader.timeouts == 2
+    reader.close()
+
+def test_hung_read_does_not_block_process_exit():
+    script = textwrap.dedent("""
+        import asyncio, time
+        from Core.runtime import StageExecutor
+        from Sensor import AsyncSensorReader
+
+        class Hung:
+            def read(self):
+                time.sleep(60)
+
+        reader = AsyncSensorReader(timeout=0.1, executor=StageExecutor("sensor"))
+        print(asyncio.run(reader.read(Hung())))
+        reader.close()
+    """)
+    started = time.monotonic()
+    result = subprocess.run([sys.executable, "-c", script], cwd=Path(__file__).resolve().parents[1],
+                            capture_output=True, text=True, timeout=30)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip().endswith("None")
+    assert time.monotonic() - started < 10
@@ -0,0 +1,10 @@
+from TTS.audio_cache import AudioCache
+
+def test_audio_cache_returns_bytes_and_evicts(tmp_path):
+    cache = AudioCache(str(tmp_path), max_bytes=2500)
+    cache.put("안녕", "ko", b"a" * 1000)
+    assert cache.get("안녕", "ko") == b"a" * 1000
+    cache.put("하나", "ko", b"b" * 1000)
+    cache.put("둘", "ko", b"c" * 1000)
+    assert cache.get("하나", "ko") is None or cache.get("안녕", "ko") is None
+    assert cache.total_bytes <= 2500
@@ -0,0 +1,126 @@
+import json
+import sqlite3
+
+import pytest
+
+from Database import PlantDatabase
+from Database.catalog import normalize, parse_profile
+from Database.threshold_table import THRESHOLD_COLUMNS
+from Monitor import PlantMonitor, Pot
+
+class _Manager:
+    pass
+
+@pytest.fixture
+def db():
+    plant_db = PlantDatabase(":memory:")
+    plant_db.create_tables()
+    yield plant_db
+    plant_db.close()
+
+@pytest.fixture
+def monitor(db):
+    pots = [Pot("pot1", "스킨답서스", _Manager()), Pot("pot10", "몬스테라", _Manager())]
+    return PlantMonitor(pots, db, None)
+
+def plants(monitor):
+    return {pot_id: pot.plant_name for pot_id, pot in monitor.pots.items()}
+
+def test_normalize_decomposes_hangul_and_drops_spaces():
+    assert normalize("스킨 답서스") == normalize("스킨답서스")
+    assert normalize("몬스테라") != normalize("몬스테나")
+
+def test_search_exact_alias_and_fuzzy(db):
+    assert db.catalog.search("포토스") == [("스킨답서스", 1.0)]
+    name, score = db.catalog.search("몬스테나")[0]
+    assert name == "몬스테라" and 0.75 <= score < 1.0
+    assert db.catalog.resolve("장미") is None
+
+def test_short_names_only_match_exactly(db):
+    # "포토스"(3자)와 한 글자 차이지만 짧은 별칭은 정확히 같아야 한다
+    assert db.catalog.search("포토") == []
+    assert db.catalog.find_in_text("포토 설정 바꿔") is None
+
+def test_canonical_resolves_aliases(db):
+    assert db.catalog.canonical("산세비에리아") == "산세베리아"
+    assert db.catalog.canonical("모르는 식물") is None
+
+@pytest.mark.parametrize("text", [
+    "포토 설정 바꿔",
+    "스킨케어 설정 바꿔",
+    "몬스테라 물 주는 법 바꿔 말해줘",
+    "스킨답서스 몇 번 물 줘야 돼? 설정",
+    "스킨케어로 바꿔",
+    "포토로 바꿔",
+])
+def test_handle_command_ignores_non_commands(monitor, text):
+    before = plants(monitor)
+    assert monitor.handle_command(text) is None
+    assert plants(monitor) == before
+
+def test_handle_command_exact_change(monitor):
+    reply = monitor.handle_command("pot10 산세베리아로 바꿔줘")
+    assert reply == "pot10 화분의 식물을 산세베리아로 바꿨습니다."
+    assert plants(monitor) == {"pot1": "스킨답서스", "pot10": "산세베리아"}
+
+def test_handle_command_alias_stores_canonical_name(monitor):
+    monitor.handle_command("pot10 포토스로 변경")
+    assert monitor.pots["pot10"].plant_name == "스킨답서스"
+
+def test_handle_command_fuzzy_asks_before_changing(monitor):
+    reply = monitor.handle_command("pot1 몬스테나로 바꿔줘")
+    assert reply == "pot1 화분의 식물을 몬스테라로 바꿀까요?"
+    assert monitor.pots["pot1"].plant_name == "스킨답서스"
+    assert monitor.handle_command("응") == "pot1 화분의 식물을 몬스테라로 바꿨습니다."
+    assert monitor.pots["pot1"].plant_name == "몬스테라"
+
+def test_handle_command_fuzzy_can_be_cancelled(monitor):
+    monitor.handle_command("몬스테나로 바꿔")
+    assert monitor.handle_command("아니") == "식물을 바꾸지 않았습니다."
+    assert monitor.pots["pot1"].plant_name == "스킨답서스"
+
+def test_pot_id_matches_whole_token(monitor):
+    assert monitor._pot_in_text("pot10 몬스테라로 바꿔").pot_id == "pot10"
+    assert monitor._pot_in_text("pot1 몬스테라로 바꿔").pot_id == "pot1"
+    assert monitor._pot_in_text("pot100 몬스테라로 바꿔") is None
+    assert monitor._pot_in_text("2번 화분").pot_id == "pot10"
+
+def test_create_tables_deduplicates_legacy_rows(tmp_path):
+    path = str(tmp_path / "legacy.db")
+    conn = sqlite3.connect(path)
+    # UNIQUE가 없던 예전 스키마
+    columns = ", ".join(f"{column} REAL" for column in THRESHOLD_COLUMNS)
+    conn.execute(f"CREATE TABLE plants (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, {columns})")
+    conn.executemany("INSERT INTO plants (name) VALUES (?)", [("몬스테라",), ("몬스테라",), ("스킨답서스",)])
+    conn.commit()
+    conn.close()
+
+    plant_db = PlantDatabase(path)
+    for _ in range(3):
+        plant_db.create_tables()
+    names = [row[1] for row in plant_db.fetch_all_data()]
+    plant_db.close()
+    assert sorted(names) == ["몬스테라", "산세베리아", "스킨답서스"]
+
+def test_import_csv_and_json_upsert(db, tmp_path):
+    csv_path = tmp_path / "plants.csv"
+    csv_path.write_text(
+        "name,temperature_min,temperature_max,aliases\n고무나무,16,28,인도고무나무|벵갈고무나무\n",
+        encoding="utf-8"
+    )
+    json_path = tmp_path / "plants.json"
+    json_path.write_text(json.dumps(
+        {"plants": [{"name": "고무나무", "ideal_light_min": 800}]}, ensure_ascii=False
+    ), encoding="utf-8")
+
+    assert db.import_plants(str(csv_path)) == 1
+    assert db.import_plants(str(json_path)) == 1
+    bounds = db.thresholds.bounds("고무나무")
+    # 두 번째 파일에 없는 값은 그대로 남는다
+    assert bounds["temperature"] == (16.0, 28.0)
+    assert bounds["light"][0] == 800.0
+    assert db.catalog.resolve("벵갈 고무나무") == "고무나무"
+
+def test_parse_profile_requires_name():
+    with pytest.raises(ValueError):
+        parse_profile({"temperature_min": "10"})
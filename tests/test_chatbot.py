@@ -0,0 +1,48 @@
+import pytest
+
+from Chatbot import ChatBot
+
+class _Chunk:
+    def __init__(self, content):
+        self.choices = [type("Choice", (), {"delta": {"content": content}})()]
+
+class _Client:
+    def __init__(self, parts, error=None):
+        self.ChatCompletion = self
+        self.parts = parts
+        self.error = error
+
+    def create(self, model, messages, stream=False):
+        if self.error:
+            raise self.error
+        return (_Chunk(part) for part in self.parts)
+
+@pytest.fixture
+def chatbot(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    return ChatBot(None, None)
+
+def roles(chatbot):
+    return [(turn["role"], turn["content"]) for turn in chatbot.histories["chat"].turns]
+
+def test_stream_records_full_answer(chatbot, monkeypatch):
+    monkeypatch.setattr(chatbot, "_client", lambda: _Client(["물은 ", "일주일에 한 번."]))
+    assert "".join(chatbot.stream_openai("물 언제 줘?")) == "물은 일주일에 한 번."
+    assert roles(chatbot) == [("user", "물 언제 줘?"), ("assistant", "물은 일주일에 한 번.")]
+
+def test_closed_stream_keeps_partial_answer(chatbot, monkeypatch):
+    monkeypatch.setattr(chatbot, "_client", lambda: _Client(["물은 ", "일주일에 ", "한 번."]))
+    stream = chatbot.stream_openai("물 언제 줘?")
+    next(stream)
+    stream.close()  # barge-in
+    assert roles(chatbot) == [("user", "물 언제 줘?"), ("assistant", "물은 ")]
+
+def test_failed_stream_leaves_no_dangling_user_turn(chatbot, monkeypatch):
+    monkeypatch.setattr(chatbot, "_client", lambda: _Client([], error=RuntimeError("down")))
+    stream = chatbot.stream_openai("물 언제 줘?")
+    assert next(stream).startswith("죄송합니다")
+    stream.close()
+    assert roles(chatbot) == []
+    monkeypatch.setattr(chatbot, "_client", lambda: _Client([]))
+    list(chatbot.stream_openai("빛은?"))
+    assert roles(chatbot) == []
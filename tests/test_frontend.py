@@ -0,0 +1,43 @@
+import threading
+import time
+
+import numpy as np
+
+from STT.frontend import VoiceFrontEnd
+
+RATE = 16000
+
+def tone(seconds):
+    t = np.arange(int(RATE * seconds)) / RATE
+    return (0.3 * np.sin(2 * np.pi * 200 * t)).astype(np.float32)
+
+def silence(seconds):
+    return np.zeros(int(RATE * seconds), dtype=np.float32)
+
+def play(front_end, *parts, block=0.1):
+    """실제 시간에 맞춰 조금씩 밀어 넣는다 (마이크 입력 흉내)"""
+    def run():
+        for part in parts:
+            for start in range(0, len(part), int(RATE * block)):
+                front_end.feed(part[start:start + int(RATE * block)])
+                time.sleep(block)
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
+
+def test_utterance_ending_after_timeout_is_captured():
+    front_end = VoiceFrontEnd(samplerate=RATE)
+    # 0.2초 뒤에 말을 시작해 timeout(0.5초)보다 훨씬 늦게 끝난다
+    feeder = play(front_end, silence(0.2), tone(1.5), silence(0.8))
+    segment = front_end.capture_utterance(timeout=0.5)
+    feeder.join()
+    assert segment is not None
+    assert len(segment) >= int(RATE * 1.5)
+
+def test_no_speech_returns_none_after_timeout():
+    front_end = VoiceFrontEnd(samplerate=RATE)
+    feeder = play(front_end, silence(0.6))
+    started = time.monotonic()
+    assert front_end.capture_utterance(timeout=0.3) is None
+    assert time.monotonic() - started < 0.5
+    feeder.join()
@@ -0,0 +1,126 @@
+import threading
+import time
+
+import pytest
+
+from Database import PlantDatabase
+from Gateway import IngestCollector, NodeForwarder
+from Gateway.collector import SequenceWindow
+from Gateway.protocol import (
+    ACK_DUPLICATE, ACK_OK, FrameError, decode_ack, decode_frame, encode_ack, encode_frame
+)
+
+ROWS = [(1000.0, "pot1", "humidity", 55.0), (1001.5, "pot1", "temperature", 22.5)]
+
+@pytest.fixture
+def db():
+    plant_db = PlantDatabase(":memory:")
+    plant_db.create_tables()
+    yield plant_db
+    plant_db.close()
+
+def test_frame_round_trip():
+    frame = decode_frame(encode_frame("node1", 7, 3, ROWS))
+    assert (frame.node_id, frame.epoch, frame.seq) == ("node1", 7, 3)
+    assert frame.rows == ROWS
+
+def test_corrupt_frame_is_rejected():
+    data = bytearray(encode_frame("node1", 7, 3, ROWS))
+    data[-6] ^= 0xFF
+    with pytest.raises(FrameError):
+        decode_frame(bytes(data))
+
+def test_signed_frames_and_acks():
+    data = encode_frame("node1", 7, 3, ROWS, key="secret")
+    assert decode_frame(data, "secret").rows == ROWS
+    with pytest.raises(FrameError):
+        decode_frame(data, "other")
+    with pytest.raises(FrameError):
+        decode_frame(encode_frame("node1", 7, 3, ROWS), "secret")
+    assert decode_ack(encode_ack(7, 3, key="secret"), "secret") == (7, 3, ACK_OK)
+    assert decode_ack(encode_ack(7, 3), "secret") is None
+
+def test_sequence_window():
+    window = SequenceWindow(limit=4)
+    assert window.add(0) and window.add(2)
+    assert not window.add(2)
+    assert window.add(1)
+    assert window.floor == 2 and not window.above
+
+def test_collector_acks_and_deduplicates(db):
+    collector = IngestCollector(db, udp_port=None).start()
+    data = encode_frame("node1", 7, 1, ROWS)
+    assert decode_ack(collector.receive(data)) == (7, 1, ACK_OK)
+    assert decode_ack(collector.receive(data)) == (7, 1, ACK_DUPLICATE)
+    assert collector.wait_idle(5)
+    collector.close()
+    assert collector.written == len(ROWS)
+    assert [row[0] for row in db.fetch_readings("node1/pot1", "humidity")] == [1000.0]
+
+def test_collector_requires_key_when_configured(db):
+    collector = IngestCollector(db, udp_port=None, key="secret")
+    assert collector.receive(encode_frame("node1", 7, 1, ROWS)) is None
+    assert collector.invalid == 1
+    assert collector.receive(encode_frame("node1", 7, 1, ROWS, key="secret")) is not None
+
+def test_old_epochs_and_idle_nodes_expire(db):
+    collector = IngestCollector(db, udp_port=None, window_ttl=100.0, epoch_grace=0.0)
+    collector.accept(decode_frame(encode_frame("node1", 1, 1, [])))
+    collector.accept(decode_frame(encode_frame("node1", 2, 1, [])))
+    collector._next_sweep = 0.0
+    collector.accept(decode_frame(encode_frame("node2", 1, 1, [])))
+    assert sorted(collector._windows) == [("node1", 2), ("node2", 1)]
+
+def test_failed_writes_are_spooled_and_replayed(db, tmp_path):
+    spool = str(tmp_path / "spool.jsonl")
+    collector = IngestCollector(db, udp_port=None, spool_path=spool).start()
+    insert = db.insert_readings
+
+    def failing(rows):
+        raise RuntimeError("disk full")
+    db.insert_readings = failing
+    collector.receive(encode_frame("node1", 7, 1, ROWS))
+    time.sleep(0.3)
+    collector.close()
+    assert collector.spooled == len(ROWS) and collector.dropped == 0
+
+    db.insert_readings = insert
+    replay = IngestCollector(db, udp_port=None, spool_path=spool).start()
+    deadline = time.monotonic() + 5
+    while replay.written < len(ROWS) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    replay.close()
+    assert replay.written == len(ROWS)
+
+def test_node_to_collector_over_udp(db):
+    collector = IngestCollector(db, host="127.0.0.1", udp_port=0, key="k").start()
+    node = NodeForwarder(f"udp://127.0.0.1:{collector.udp_port}", node_id="node1", key="k",
+                         batch_size=50, flush_interval=0.05).start()
+    for i in range(120):
+        node.add("pot1", "humidity", float(i), ts=1000.0 + i)
+    node.close()
+    assert collector.wait_idle(5)
+    collector.close()
+    assert node.written == 120 and node.dropped == 0
+    assert len(db.fetch_readings("node1/pot1", "humidity")) == 120
+
+def test_counters_are_exact_under_concurrent_receivers(db):
+    collector = IngestCollector(db, udp_port=None, queue_size=10000).start()
+    per_thread = 200
+
+    def send(node):
+        for seq in range(per_thread):
+            data = encode_frame(node, 1, seq, [])
+            collector.receive(data)
+            collector.receive(data)
+            collector.receive(b"garbage")
+
+    threads = [threading.Thread(target=send, args=(f"node{i}",)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert collector.wait_idle(5)
+    collector.close()
+    stats = collector.stats()
+    assert stats["frames"] == stats["duplicates"] == stats["invalid"] == 8 * per_thread
@@ -0,0 +1,23 @@
+import pytest
+
+from Sensor.analog_sensor import AnalogSensor
+from Sensor.mcp3008 import MCP3008Bus
+
+def test_shared_bus_rejects_conflicting_speed():
+    adc = MCP3008Bus.shared(5, 0)
+    try:
+        assert MCP3008Bus.shared(5, 0, max_speed_hz=adc.max_speed_hz) is adc
+        with pytest.raises(ValueError):
+            MCP3008Bus.shared(5, 0, max_speed_hz=adc.max_speed_hz // 2)
+    finally:
+        adc.release()
+        adc.release()
+    assert (5, 0) not in MCP3008Bus._shared
+
+def test_release_leaves_caller_owned_adc_open():
+    adc = MCP3008Bus(6, 0)
+    adc.spi = object()  # 열린 것으로 친다
+    sensor = AnalogSensor(0, adc=adc)
+    sensor.close()
+    adc.release()
+    assert adc.spi is not None and adc._refs == 0
@@ -0,0 +1,48 @@
+import sqlite3
+import threading
+
+import pytest
+
+from Database.pool import ConnectionPool
+
+@pytest.fixture
+def pool(tmp_path):
+    pool = ConnectionPool(str(tmp_path / "pool.db"), size=2)
+    yield pool
+    pool.close()
+
+def test_nested_checkout_reuses_connection(pool):
+    with pool.checkout() as outer:
+        with pool.checkout() as inner:
+            assert inner is outer
+    assert pool.opened == 1
+
+def test_connection_checked_out_during_close_is_closed_on_return(pool):
+    checked_out = threading.Event()
+    release = threading.Event()
+    holder = {}
+
+    def use():
+        with pool.checkout() as conn:
+            holder["conn"] = conn
+            checked_out.set()
+            release.wait(5)
+
+    thread = threading.Thread(target=use)
+    thread.start()
+    checked_out.wait(5)
+    pool.close()
+    release.set()
+    thread.join()
+    assert pool._idle.empty()
+    with pytest.raises(sqlite3.ProgrammingError):
+        holder["conn"].execute("SELECT 1")
+
+def test_checkout_after_close_raises(pool):
+    with pool.checkout():
+        pass
+    pool.close()
+    with pytest.raises(sqlite3.ProgrammingError):
+        with pool.checkout():
+            pass
+    assert pool.opened == 1
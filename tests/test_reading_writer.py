@@ -0,0 +1,13 @@
+from Database import ReadingWriter
+
+class _FailingDb:
+    def insert_readings(self, rows):
+        raise RuntimeError("locked")
+
+def test_reading_writer_drops_oldest_when_full():
+    writer = ReadingWriter(_FailingDb(), max_buffer=3)
+    for i in range(5):
+        writer.add("pot1", "humidity", i, ts=i)
+    assert writer.dropped == 2
+    assert writer.flush() == 0  # 실패한 배치는 버퍼 앞으로 돌아간다
+    assert [row[3] for row in writer._take_buffer()] == [2.0, 3.0, 4.0]
@@ -0,0 +1,22 @@
+from Sensor import ReplayBackend
+
+TRACE = """ts,sensor,value,pot_id
+0,temperature,21,
+0,humidity,50,
+0,soil_moisture,30,pot1
+0,light,20,pot1
+0,soil_moisture,70,pot2
+0,light,80,pot2
+100,light,20,pot1
+100,light,80,pot2
+"""
+
+def test_pots_on_shared_channels_replay_their_own_trace(tmp_path):
+    path = tmp_path / "trace.csv"
+    path.write_text(TRACE, encoding="utf-8")
+    backend = ReplayBackend(str(path), speed=1.0)
+    # 두 화분이 같은 MCP3008 채널 번호를 쓴다
+    soil1, light1 = backend.create_soil(0, "pot1"), backend.create_light(7, "pot1")
+    soil2, light2 = backend.create_soil(0, "pot2"), backend.create_light(7, "pot2")
+    assert round(soil1.read()) == 30 and round(soil2.read()) == 70
+    assert round(light1.read()) == 20 and round(light2.read()) == 80
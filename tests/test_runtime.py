@@ -0,0 +1,136 @@
+import asyncio
+import queue
+import threading
+import time
+
+from Core.runtime import PlantRuntime, StageExecutor
+
+class FakeMonitor:
+    pots = {}
+    sample_interval = 0.05
+    chatbot = None
+
+class FakeFrontEnd:
+    def __init__(self):
+        self.keywords = queue.Queue()
+
+    def start(self):
+        return self
+
+    def wait_for_keyword(self, timeout=None):
+        try:
+            return self.keywords.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        pass
+
+class FakeTTS:
+    def __init__(self):
+        self.playing = threading.Event()
+        self.cancelled = threading.Event()
+        self.barge_ins = 0
+
+    def barge_in(self):
+        self.barge_ins += 1
+        self.cancelled.set()
+
+class FakeChatBot:
+    """대답 재생은 barge-in으로 끊길 때까지 계속된다"""
+
+    def __init__(self, questions):
+        self.tts = FakeTTS()
+        self.questions = list(questions)
+        self.answered = []
+
+    def listen(self):
+        return self.questions.pop(0)
+
+    def respond(self, text):
+        self.tts.cancelled.clear()
+        self.answered.append(text)
+        self.tts.playing.set()
+        self.tts.cancelled.wait(10)
+        self.tts.playing.clear()
+
+def test_keyword_during_playback_barges_in():
+    front_end = FakeFrontEnd()
+    chatbot = FakeChatBot(["첫 질문", "둘째 질문"])
+    runtime = PlantRuntime(FakeMonitor(), chatbot, front_end, restart_delay=0.01)
+
+    async def scenario():
+        task = asyncio.create_task(runtime.run())
+        front_end.keywords.put(object())
+        while not chatbot.tts.playing.is_set():
+            await asyncio.sleep(0.01)
+        # 첫 대답을 재생하는 중에 호출어
+        front_end.keywords.put(object())
+        deadline = time.monotonic() + 2
+        while len(chatbot.answered) < 2 and time.monotonic() < deadline:
+            await asyncio.sleep(0.01)
+        chatbot.tts.cancelled.set()
+        runtime.request_stop()
+        await task
+
+    asyncio.run(scenario())
+    assert chatbot.answered == ["첫 질문", "둘째 질문"]
+    assert chatbot.tts.barge_ins >= 1
+
+def test_stage_executor_shutdown_does_not_wait_for_running_work():
+    executor = StageExecutor("test")
+    release = threading.Event()
+    running = executor.submit(release.wait, 5)
+    while not running.running():
+        time.sleep(0.001)
+    queued = executor.submit(lambda: None)
+    started = time.monotonic()
+    executor.shutdown(wait=False, cancel_futures=True)
+    assert time.monotonic() - started < 0.5
+    assert queued.cancelled()
+    release.set()
+    assert running.result(1) is True
+
+class CyclingMonitor:
+    """측정 창이 바로 끝나는 모니터"""
+
+    sample_interval = 0.01
+    chatbot = None
+
+    def __init__(self):
+        self.pots = {"pot1": object()}
+        self.scheduler = self
+        self.clock = self
+        self.checked = 0
+
+    def monotonic(self):
+        return time.monotonic()
+
+    async def sample(self):
+        await asyncio.sleep(0.01)
+
+    def evaluate(self):
+        return []
+
+    def check_alerts(self, results, now):
+        self.checked += 1
+        return []
+
+def test_runtime_records_monitor_cycle_latency(monkeypatch):
+    from Metrics import registry
+    from Metrics.instruments import MONITOR_CYCLE_SECONDS
+
+    monkeypatch.setattr(registry, "enabled", True)
+    before = MONITOR_CYCLE_SECONDS._unlabelled.count
+    monitor = CyclingMonitor()
+    runtime = PlantRuntime(monitor)
+
+    async def scenario():
+        task = asyncio.create_task(runtime.run())
+        while monitor.checked < 3:
+            await asyncio.sleep(0.01)
+        runtime.request_stop()
+        await task
+
+    asyncio.run(scenario())
+    assert MONITOR_CYCLE_SECONDS._unlabelled.count - before >= 3
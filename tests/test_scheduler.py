@@ -0,0 +1,86 @@
+import asyncio
+
+from Database import PlantDatabase
+from Monitor import Pot, SamplingScheduler
+from Monitor.scheduler import ALARM, FAST, HOLD, STABLE, SamplingStream, _Consumer
+from Sensor import SensorManager, SimulatedBackend, AsyncSensorReader
+
+def make_pot(backend, reader, slow_dht=None):
+    dht = backend.create_dht()
+    if slow_dht:
+        read = dht.read
+
+        def slow_read():
+            backend.clock.sleep_sync(slow_dht)
+            return read()
+        dht.read = slow_read
+    manager = SensorManager(
+        dht, backend.create_soil(0, "pot1"), backend.create_light(7, "pot1"),
+        pot_id="pot1", async_reader=reader, clock=backend.clock
+    )
+    return Pot("pot1", "스킨답서스", manager)
+
+def test_slow_dht_does_not_delay_analog_deadlines():
+    backend = SimulatedBackend(speed=20, seed=0)
+    reader = AsyncSensorReader()
+    pot = make_pot(backend, reader, slow_dht=2.5)
+    scheduler = SamplingScheduler(backend.clock, base_interval=10.0, rates={"analog": 1.0}, adaptive=False)
+    scheduler.set_pots([pot])
+
+    async def run():
+        await scheduler.run_until(backend.clock.monotonic() + 30.0)
+
+    asyncio.run(run())
+    reader.close()
+    streams = {stream["driver"]: stream for stream in scheduler.summary()}
+    analog = streams["AnalogChannelGroup"]
+    # 30초 동안 1초 간격. 2.5초짜리 DHT 읽기가 끼어도 마감을 놓치지 않는다
+    assert analog["reads"] >= 28
+    assert analog["missed"] <= 1
+    assert streams["DHT11"]["reads"] >= 2
+
+def _stream():
+    return SamplingStream(object(), base_interval=10.0, min_interval=2.0, max_interval=60.0)
+
+def test_adapt_alarm_goes_to_min_interval_and_hold_backs_off_to_base():
+    scheduler = SamplingScheduler(clock=None, backoff=2.0)
+    stream = _stream()
+    stream.interval = 60.0
+    scheduler._adapt(stream, [STABLE, ALARM])
+    assert stream.interval == 2.0
+    for expected in (4.0, 8.0, 10.0, 10.0):
+        scheduler._adapt(stream, [STABLE, HOLD])
+        assert stream.interval == expected
+
+def test_adapt_backs_off_when_stable_and_speeds_up_when_fast():
+    scheduler = SamplingScheduler(clock=None, backoff=1.5, speedup=0.5)
+    stream = _stream()
+    scheduler._adapt(stream, [STABLE])
+    assert stream.interval == 15.0
+    scheduler._adapt(stream, [FAST])
+    assert stream.interval == 7.5
+
+def test_steady_alarm_backs_off_until_band_changes():
+    backend = SimulatedBackend(speed=1, seed=0)
+    db = PlantDatabase(":memory:")
+    db.create_tables()
+    pot = make_pot(backend, None)
+    scheduler = SamplingScheduler(backend.clock, base_interval=10.0, thresholds=db.thresholds)
+    stream = _stream()
+    consumer = _Consumer(pot, "analog")
+
+    def step(value):
+        state = scheduler._assess(consumer, {"soil_moisture": value}, stream.base_interval)
+        scheduler._adapt(stream, [state])
+        return state
+
+    # 스킨답서스 토양 수분 적정 범위는 40~60. 말라 있는 화분은 처음 한 번만 최소 간격으로 읽는다
+    assert step(5.0) == ALARM and stream.interval == 2.0
+    intervals = []
+    for _ in range(4):
+        assert step(5.0) == HOLD
+        intervals.append(stream.interval)
+    assert intervals == [3.0, 4.5, 6.75, 10.0]
+    # 물을 줘서 범위 안으로 돌아오면 다시 최소 간격으로 확인한다
+    assert step(50.0) == ALARM and stream.interval == 2.0
+    db.close()
@@ -0,0 +1,27 @@
+import threading
+
+from STT.stt import SpeechToText
+
+def test_warm_up_returns_started_thread_to_concurrent_callers(monkeypatch):
+    stt = SpeechToText()
+    release = threading.Event()
+    monkeypatch.setattr(stt, "load_model", lambda: release.wait(5))
+    monkeypatch.setattr(stt, "_transcribe", lambda audio: {"text": ""})
+    threads, errors = [], []
+
+    def caller():
+        try:
+            thread = stt.warm_up()
+            threads.append(thread)
+            thread.join(0)
+        except Exception as e:
+            errors.append(e)
+
+    callers = [threading.Thread(target=caller) for _ in range(16)]
+    for thread in callers:
+        thread.start()
+    for thread in callers:
+        thread.join()
+    release.set()
+    assert errors == []
+    assert len({id(thread) for thread in threads}) == 1
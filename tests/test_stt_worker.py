@@ -0,0 +1,27 @@
+import os
+import time
+
+import pytest
+
+from STT.worker import WhisperWorker, WorkerExited
+
+def test_dead_worker_is_detected_before_timeout():
+    worker = WhisperWorker()
+    # 응답 없이 바로 죽는 워커 (메모리 부족/세그폴트 흉내)
+    worker._process = worker._ctx.Process(target=os._exit, args=(3,), daemon=True)
+    worker._responses = worker._ctx.Queue()
+    worker._process.start()
+    started = time.monotonic()
+    with pytest.raises(WorkerExited):
+        worker._get_response(30)
+    assert time.monotonic() - started < 10
+    assert worker._process.exitcode == 3
+
+def test_response_sent_before_exit_is_returned():
+    worker = WhisperWorker()
+    worker._responses = worker._ctx.Queue()
+    worker._responses.put((1, "안녕", None))
+    worker._process = worker._ctx.Process(target=os._exit, args=(0,), daemon=True)
+    worker._process.start()
+    worker._process.join()
+    assert worker._get_response(30) == (1, "안녕", None)
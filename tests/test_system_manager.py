@@ -0,0 +1,36 @@
+import pytest
+
+from Core.system_manager import IoTPlantSystem
+from Metrics import registry
+from Sensor import SimulatedBackend
+
+@pytest.fixture
+def env(monkeypatch, tmp_path):
+    # DB/캐시 파일은 임시 폴더에, 외부 연결 없이
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    for name in ("PLANT_METRICS_PORT", "PLANT_GATEWAY_URL", "PLANT_GATEWAY_LISTEN", "PLANT_CATALOG"):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setenv("PLANT_STT_WORKER", "inline")
+    return monkeypatch
+
+def test_monitoring_starts_without_api_key(env):
+    system = IoTPlantSystem(sensor_backend=SimulatedBackend(speed=100))
+    try:
+        assert system.running
+        assert system.chatbot is None
+        assert system.voice_ready.is_set()
+        assert system.plant_monitor.pots
+    finally:
+        system.stop()
+    assert not system.reading_writer._running
+
+def test_failed_init_closes_started_components(env):
+    env.setenv("PLANT_METRICS_PORT", "0")
+    env.setattr(registry, "enabled", registry.enabled)
+    # 화분 설정이 잘못되어 DB/메트릭 서버를 띄운 뒤에 실패한다
+    system = IoTPlantSystem(pot_configs=[{"pot_id": "pot1", "plant": "스킨답서스"}],
+                            sensor_backend=SimulatedBackend(speed=100))
+    assert not system.running
+    assert system.metrics_server._server is None
+    assert not system.reading_writer._running
@@ -0,0 +1,45 @@
+import pytest
+
+from Database import PlantDatabase
+
+@pytest.fixture
+def db():
+    plant_db = PlantDatabase(":memory:")
+    plant_db.create_tables()
+    yield plant_db
+    plant_db.close()
+
+def test_classify_batch(db):
+    results = db.compare_sensor_batch(
+        ["스킨답서스", "몬스테라", "모르는 식물"],
+        [
+            {"temperature": 10, "humidity": 50, "soil_moisture": 70, "light": None},
+            {"temperature": 25, "humidity": 65, "soil_moisture": 50, "light": 2000},
+            {"temperature": 25},
+        ],
+    )
+    assert results[0] == {
+        "temperature": "below_minimum", "humidity": "within_range",
+        "soil_moisture": "above_maximum", "light": "no_data",
+    }
+    assert set(results[1].values()) == {"within_range"}
+    assert results[2] is None
+
+def test_classify_checks_version_once_per_batch(db):
+    calls = []
+    version = db.plants_version
+
+    def counting():
+        calls.append(1)
+        return version()
+    db.plants_version = counting
+    db.compare_sensor_batch(["스킨답서스"] * 8, [{"temperature": 20}] * 8)
+    assert len(calls) == 1
+
+def test_reload_after_plants_change(db):
+    assert db.compare_sensor_data("스킨답서스", {"temperature": 17})["temperature"] == "below_minimum"
+    with db.get_connection() as conn:
+        with conn:
+            conn.execute("UPDATE plants SET ideal_temperature_min = 15 WHERE name = '스킨답서스'")
+    assert db.compare_sensor_data("스킨답서스", {"temperature": 17})["temperature"] == "within_range"
+    assert db.thresholds.bounds("스킨답서스")["temperature"] == (15.0, 27.0)